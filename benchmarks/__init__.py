@@ -0,0 +1,14 @@
+# benchmarks/__init__.py
+#
+# ICS 33 Fall 2023
+# Project 2: Learning to Fly
+#
+# Benchmarks that time the engine's event processing, run directly against Engine
+# without the user interface.  Run them with:
+#
+#     python -m benchmarks --sizes 1000 10000 100000 --output results.json
+#
+# The databases are built by benchmarks.fixtures with benchmarks.generate, which
+# can also be run on its own to create synthetic databases of any size:
+#
+#     python -m benchmarks.generate big.db --regions 100000 --airports 2000000
@@ -0,0 +1,108 @@
+# benchmarks/__main__.py
+#
+# ICS 33 Fall 2023
+# Project 2: Learning to Fly
+#
+# Runs the benchmarks at each requested database size and writes the results as
+# JSON, so that runs can be compared over time.
+
+import argparse
+import json
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from p2app.engine.profiles import DEFAULT_PROFILE, PROFILES
+from .fixtures import build_database
+from .runner import Benchmark
+
+
+
+def main(argv: list[str] | None = None) -> int:
+    arguments = _parse_arguments(argv)
+    workdir = Path(arguments.workdir or tempfile.mkdtemp(prefix = 'p2app-benchmarks-'))
+    workdir.mkdir(parents = True, exist_ok = True)
+    results = []
+
+    for size in arguments.sizes:
+        database = build_database(
+            workdir / f'benchmark-{size}.db', size, arguments.all_tables, arguments.seed)
+
+        benchmark = Benchmark(
+            database, arguments.iterations, arguments.seed, profile = arguments.profile,
+            cache_size = arguments.cache_size)
+
+        for summary in benchmark.run():
+            summary = {'size': size, **summary}
+            results.append(summary)
+            _print_summary(summary)
+
+    report = {
+        'metadata': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'profile': arguments.profile,
+            'cache_size': arguments.cache_size,
+            'iterations': arguments.iterations,
+            'seed': arguments.seed,
+            'all_tables': arguments.all_tables
+        },
+        'results': results
+    }
+
+    if arguments.output:
+        Path(arguments.output).write_text(json.dumps(report, indent = 2))
+    else:
+        json.dump(report, sys.stdout, indent = 2)
+        print()
+
+    return 0
+
+
+def _print_summary(summary: dict):
+    print(
+        f'{summary["size"]:>10} {summary["operation"]:<46} '
+        f'p50 {summary["p50_ms"]:9.3f} ms  p95 {summary["p95_ms"]:9.3f} ms  '
+        f'p99 {summary["p99_ms"]:9.3f} ms  {summary["events_per_second"]:10.1f} events/s',
+        file = sys.stderr)
+
+
+def _parse_arguments(argv: list[str] | None):
+    parser = argparse.ArgumentParser(
+        prog = 'python -m benchmarks',
+        description = 'Times engine events against databases of several sizes.')
+
+    parser.add_argument(
+        '--sizes', type = int, nargs = '+', default = [1000, 10000, 100000],
+        help = 'the numbers of regions in the databases to benchmark')
+
+    parser.add_argument(
+        '--all-tables', action = 'store_true',
+        help = 'also fill the airport, runway, frequency, and navigation aid tables, in '
+               'proportion to the regions')
+
+    parser.add_argument(
+        '--iterations', type = int, default = 200, help = 'the number of events per operation')
+
+    parser.add_argument('--seed', type = int, default = 0, help = 'the seed for choosing records')
+    parser.add_argument(
+        '--profile', choices = sorted(PROFILES), default = DEFAULT_PROFILE,
+        help = 'the connection profile the engine opens each database with')
+
+    parser.add_argument(
+        '--cache-size', type = int, default = 0,
+        help = 'the number of records the engine caches per table (0 measures every load '
+               'against the database)')
+
+    parser.add_argument('--workdir', help = 'where to build the benchmark databases')
+    parser.add_argument('--output', help = 'the file to write the JSON results to')
+    return parser.parse_args(argv)
+
+
+
+if __name__ == '__main__':
+    sys.exit(main())
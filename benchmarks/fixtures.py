@@ -0,0 +1,33 @@
+# benchmarks/fixtures.py
+#
+# ICS 33 Fall 2023
+# Project 2: Learning to Fly
+#
+# Databases of a chosen size for the benchmarks to run against, built by
+# benchmarks.generate.  A database's size is its number of regions, and its other
+# tables are filled in the same proportions to its regions as in the real data.
+
+from pathlib import Path
+from .generate import DEFAULT_COUNTS, generate_database
+
+
+
+def build_database(path: Path, regions: int, all_tables: bool = False, seed: int = 0) -> Path:
+    """Creates a database with the given number of regions, replacing any file
+    already at the path.  The airport, runway, frequency, and navigation aid tables,
+    which the benchmarks never touch, are left empty unless all_tables is true."""
+    path = Path(path)
+    generate_database(path, **_counts(regions, all_tables), seed = seed)
+    return path
+
+
+def _counts(regions: int, all_tables: bool) -> dict:
+    scale = regions / DEFAULT_COUNTS['regions']
+    counts = {
+        table: round(count * scale) if all_tables else 0
+        for table, count in DEFAULT_COUNTS.items()
+    }
+
+    counts['countries'] = min(DEFAULT_COUNTS['countries'], regions)
+    counts['regions'] = regions
+    return counts
@@ -0,0 +1,395 @@
+# benchmarks/generate.py
+#
+# ICS 33 Fall 2023
+# Project 2: Learning to Fly
+#
+# A generator of synthetic databases that follow schema.sql, at whatever scale is
+# needed for benchmarks and load tests.  Every table is filled, foreign keys always
+# refer to rows that exist, and codes have the same formats as the real data (and
+# pass the engine's validation), so the engine treats generated records exactly as
+# it would real ones.
+#
+# Children are spread over their parents with a Zipf-like skew: with a skew of 0,
+# every country gets about the same number of regions (and every region the same
+# number of airports, and so on), while larger skews pile them onto the first few,
+# as in the real data, where a handful of countries own most of the airports.
+#
+#     python -m benchmarks.generate big.db --regions 100000 --airports 2000000
+
+import argparse
+import itertools
+import random
+import sqlite3
+import string
+import sys
+import time
+from array import array
+from pathlib import Path
+from p2app.engine.profiles import apply_profile
+
+
+
+SCHEMA_PATH = Path(__file__).resolve().parent.parent / 'schema.sql'
+
+# The number of rows inserted in each transaction.
+DEFAULT_BATCH_SIZE = 100000
+
+# The row counts of each table in the real airport.db, which are the defaults.
+DEFAULT_COUNTS = {
+    'countries': 250,
+    'regions': 4000,
+    'airports': 75000,
+    'runways': 45000,
+    'frequencies': 30000,
+    'navaids': 11000
+}
+
+_CONTINENTS = [
+    ('AF', 'Africa'), ('AN', 'Antarctica'), ('AS', 'Asia'), ('EU', 'Europe'),
+    ('NA', 'North America'), ('OC', 'Oceania'), ('SA', 'South America')]
+
+_COUNTRY_CODES = [''.join(letters) for letters in itertools.product(string.ascii_uppercase, repeat = 2)]
+
+_AIRPORT_TYPES = [
+    ('small_airport', 55), ('heliport', 20), ('closed', 10), ('medium_airport', 8),
+    ('seaplane_base', 5), ('large_airport', 1.5), ('balloonport', 0.5)]
+
+_SURFACES = [('ASP', 40), ('TURF', 25), ('CON', 15), ('GRVL', 10), ('DIRT', 5), ('WATER', 5)]
+
+_FREQUENCY_TYPES = [('UNIC', 30), ('CTAF', 20), ('TWR', 15), ('GND', 12), ('ATIS', 10), ('APP', 8), ('DEP', 5)]
+
+# Each type of navigation aid, with its share of the total and the range of its
+# frequency in kHz and the step between frequencies.
+_NAVAID_TYPES = [
+    ('NDB', 40, 190, 1750, 1), ('VOR-DME', 20, 108000, 117950, 50), ('VOR', 12, 108000, 117950, 50),
+    ('DME', 12, 108000, 117950, 50), ('VORTAC', 8, 108000, 117950, 50), ('NDB-DME', 4, 190, 1750, 1),
+    ('TACAN', 4, 108000, 117950, 50)]
+
+_BASE36 = string.digits + string.ascii_uppercase
+
+
+
+def generate_database(
+        path: Path, countries: int = DEFAULT_COUNTS['countries'],
+        regions: int = DEFAULT_COUNTS['regions'], airports: int = DEFAULT_COUNTS['airports'],
+        runways: int = DEFAULT_COUNTS['runways'], frequencies: int = DEFAULT_COUNTS['frequencies'],
+        navaids: int = DEFAULT_COUNTS['navaids'], skew: float = 1.0, seed: int = 0,
+        batch_size: int = DEFAULT_BATCH_SIZE, progress = None) -> dict:
+    """Creates a database with the given number of rows in each table, replacing any
+    file already at the path, and returns the number of rows in each table.  If
+    given, progress is called as progress(table, rows) after each transaction."""
+    if not 1 <= countries <= len(_COUNTRY_CODES):
+        raise ValueError(f'countries must be between 1 and {len(_COUNTRY_CODES)}')
+    if regions < 1 and airports > 0:
+        raise ValueError('airports need at least one region')
+    if airports < 1 and (runways > 0 or frequencies > 0):
+        raise ValueError('runways and frequencies need at least one airport')
+
+    path = Path(path)
+    path.unlink(missing_ok = True)
+    generator = _Generator(random.Random(seed), skew)
+    connection = sqlite3.connect(path)
+
+    try:
+        connection.executescript(SCHEMA_PATH.read_text())
+        apply_profile(connection, 'bulk-load')
+
+        # A database being generated is simply generated again if anything fails, so
+        # it needs no rollback journal at all, and its foreign keys are correct by
+        # construction, so they are not checked row by row.
+        connection.execute('PRAGMA journal_mode = OFF')
+        connection.execute('PRAGMA foreign_keys = OFF')
+        written = {}
+
+        def insert(table, statement, rows):
+            written[table] = _insert_in_batches(connection, table, statement, rows, batch_size, progress)
+
+        insert('continent', 'INSERT INTO continent VALUES (?, ?, ?)', generator.continents())
+        insert('country', 'INSERT INTO country VALUES (?, ?, ?, ?, ?, ?)', generator.countries(countries))
+        insert('region', 'INSERT INTO region VALUES (?, ?, ?, ?, ?, ?, ?, ?)', generator.regions(regions))
+        insert(
+            'airport', f'INSERT INTO airport VALUES ({", ".join("?" * 18)})',
+            generator.airports(airports))
+
+        insert('runway', f'INSERT INTO runway VALUES ({", ".join("?" * 19)})', generator.runways(runways))
+        insert(
+            'airport_frequency', 'INSERT INTO airport_frequency VALUES (?, ?, ?, ?, ?)',
+            generator.frequencies(frequencies))
+
+        insert(
+            'navigation_aid', f'INSERT INTO navigation_aid VALUES ({", ".join("?" * 20)})',
+            generator.navaids(navaids))
+
+        connection.execute('PRAGMA journal_mode = DELETE')
+        return written
+    finally:
+        connection.close()
+
+
+def _insert_in_batches(connection, table: str, statement: str, rows, batch_size: int,
+                       progress) -> int:
+    written = 0
+
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+
+        if not batch:
+            return written
+
+        with connection:
+            connection.executemany(statement, batch)
+
+        written += len(batch)
+
+        if progress:
+            progress(table, written)
+
+
+
+class _Generator:
+    def __init__(self, rng: random.Random, skew: float):
+        self._random = rng
+        self._skew = skew
+        self._words = [_word(rng) for _ in range(4096)]
+        self._country_codes = []
+        self._country_continents = []
+        self._country_centres = []
+        self._region_countries = array('l')
+        self._airport_positions = array('d')
+        self._airport_count = 0
+
+
+    def continents(self):
+        for number, (code, name) in enumerate(_CONTINENTS, start = 1):
+            yield number, code, name
+
+
+    def countries(self, count: int):
+        # Two-letter codes are dealt out in a shuffled order, so that the countries
+        # with the most regions are not always the alphabetically first ones.
+        codes = self._random.sample(_COUNTRY_CODES, count)
+        self._country_codes = codes
+
+        for number, code in enumerate(codes, start = 1):
+            continent_id = self._random.randint(1, len(_CONTINENTS))
+            self._country_continents.append(continent_id)
+            self._country_centres.append(
+                (self._random.uniform(-60, 70), self._random.uniform(-180, 180)))
+
+            yield (number, code, f'{self._word()} {code}', continent_id,
+                   f'https://en.wikipedia.org/wiki/{code}', f'{code.lower()} {self._word().lower()}')
+
+
+    def regions(self, count: int):
+        # Local codes are numbered in base 36 within each country, so that codes stay
+        # three characters long until a country has more than 46,656 regions.
+        per_country = [0] * len(self._country_codes)
+
+        for number, country_index in enumerate(self._skewed(len(self._country_codes), count), start = 1):
+            per_country[country_index] += 1
+            local_code = _base36(per_country[country_index]).rjust(3, '0')
+            country_code = self._country_codes[country_index]
+            self._region_countries.append(country_index)
+
+            yield (number, f'{country_code}-{local_code}', local_code,
+                   f'{self._word()} Region', self._country_continents[country_index],
+                   country_index + 1, None, None)
+
+
+    def airports(self, count: int):
+        # Idents are four-letter, ICAO-style codes until those run out, and then
+        # the country's code followed by a number, as OurAirports does for small
+        # fields; the first airports with scheduled service get three-letter IATA codes.
+        types = _choices(self._random, _AIRPORT_TYPES)
+        iata_codes = (''.join(letters) for letters in itertools.product(string.ascii_uppercase, repeat = 3))
+        icao_limit = 26 ** 4
+
+        for number, region_index in enumerate(self._skewed(len(self._region_countries), count), start = 1):
+            country_index = self._region_countries[region_index]
+            country_code = self._country_codes[country_index]
+            latitude, longitude = self._near(*self._country_centres[country_index], 5.0)
+            airport_type = next(types)
+            scheduled = 1 if airport_type in ('large_airport', 'medium_airport') else 0
+
+            if number <= icao_limit:
+                ident = _letters(number - 1, 4)
+                gps_code = ident
+            else:
+                ident = f'{country_code}-{number}'
+                gps_code = None
+
+            iata_code = next(iata_codes, None) if scheduled else None
+            name = f'{self._word()} {"Heliport" if airport_type == "heliport" else "Airport"}'
+            self._airport_positions.extend((latitude, longitude))
+            self._airport_count += 1
+
+            yield (number, ident, airport_type, name, latitude, longitude,
+                   self._between(-50, 12000), str(self._country_continents[country_index]),
+                   country_index + 1, region_index + 1, self._word(), scheduled, gps_code,
+                   iata_code, None, None, None, None)
+
+
+    def runways(self, count: int):
+        surfaces = _choices(self._random, _SURFACES)
+
+        for number, airport_index in enumerate(self._skewed(self._airport_count, count), start = 1):
+            latitude, longitude = self._airport_position(airport_index)
+            heading = self._between(1, 18)
+            end_latitude, end_longitude = self._near(latitude, longitude, 0.02)
+
+            yield (number, airport_index + 1, self._between(800, 13000),
+                   self._between(40, 200), next(surfaces), self._between(0, 1), 0,
+                   f'{heading:02d}', latitude, longitude, None, heading * 10.0, None,
+                   f'{heading + 18:02d}', end_latitude, end_longitude, None, heading * 10.0 + 180,
+                   None)
+
+
+    def frequencies(self, count: int):
+        types = _choices(self._random, _FREQUENCY_TYPES)
+
+        for number, airport_index in enumerate(self._skewed(self._airport_count, count), start = 1):
+            frequency_type = next(types)
+            frequency = round(118.0 + self._between(0, 759) * 0.025, 3)
+            yield number, airport_index + 1, frequency_type, f'{frequency_type} frequency', frequency
+
+
+    def navaids(self, count: int):
+        types = _choices(self._random, [(entry[0], entry[1]) for entry in _NAVAID_TYPES])
+        ranges = {entry[0]: entry[2:] for entry in _NAVAID_TYPES}
+        airport_count = self._airport_count
+
+        for number in range(1, count + 1):
+            navaid_type = next(types)
+            lowest, highest, step = ranges[navaid_type]
+            frequency = lowest + self._between(0, (highest - lowest) // step) * step
+            ident = _letters(number - 1, 3)
+
+            if airport_count:
+                airport_index = self._between(0, airport_count - 1)
+                latitude, longitude = self._near(*self._airport_position(airport_index), 0.5)
+                airport_id = airport_index + 1 if self._random.random() < 0.5 else None
+                country_code = self._country_codes[
+                    self._region_countries[self._between(0, len(self._region_countries) - 1)]]
+            else:
+                country_index = self._between(0, len(self._country_codes) - 1)
+                latitude, longitude = self._near(*self._country_centres[country_index], 5.0)
+                airport_id = None
+                country_code = self._country_codes[country_index]
+
+            name = self._word()
+            yield (number, f'{name}_{navaid_type}_{country_code}', ident, name, navaid_type, frequency,
+                   latitude, longitude, self._between(0, 8000), country_code, None, None,
+                   None, None, None, None, None, 'BOTH', 'MEDIUM', airport_id)
+
+
+    def _skewed(self, parents: int, count: int):
+        # Yields count parent indexes, drawn with probabilities proportional to
+        # 1 / rank ** skew, a few thousand at a time.
+        if parents == 0 or count == 0:
+            return
+
+        weights = itertools.accumulate(1 / (rank ** self._skew) for rank in range(1, parents + 1))
+        cumulative = list(weights)
+        population = range(parents)
+        remaining = count
+
+        while remaining > 0:
+            chunk = min(remaining, 8192)
+            yield from self._random.choices(population, cum_weights = cumulative, k = chunk)
+            remaining -= chunk
+
+
+    def _near(self, latitude: float, longitude: float, spread: float) -> tuple[float, float]:
+        random_value = self._random.random
+        latitude = max(-90.0, min(90.0, latitude + (2 * random_value() - 1) * spread))
+        longitude = (longitude + (2 * random_value() - 1) * spread + 180) % 360 - 180
+        return latitude, longitude
+
+
+    def _between(self, lowest: int, highest: int) -> int:
+        # Much faster than randint, which matters at tens of millions of rows; the
+        # tiny bias of scaling random() is of no consequence here.
+        return lowest + int(self._random.random() * (highest - lowest + 1))
+
+
+    def _word(self) -> str:
+        return self._words[int(self._random.random() * len(self._words))]
+
+
+    def _airport_position(self, airport_index: int) -> tuple[float, float]:
+        return self._airport_positions[2 * airport_index], self._airport_positions[2 * airport_index + 1]
+
+
+
+def _choices(rng: random.Random, weighted: list[tuple]):
+    values = [entry[0] for entry in weighted]
+    weights = [entry[1] for entry in weighted]
+
+    while True:
+        yield from rng.choices(values, weights = weights, k = 4096)
+
+
+def _base36(number: int) -> str:
+    digits = ''
+
+    while number:
+        number, digit = divmod(number, 36)
+        digits = _BASE36[digit] + digits
+
+    return digits or '0'
+
+
+def _letters(number: int, length: int) -> str:
+    letters = ''
+
+    for _ in range(length):
+        number, letter = divmod(number, 26)
+        letters = string.ascii_uppercase[letter] + letters
+
+    return letters
+
+
+def _word(rng: random.Random) -> str:
+    syllables = ('ka', 'lo', 'ra', 'mi', 'ten', 'sa', 'vor', 'an', 'del', 'ni', 'po', 'qu', 'ber', 'ton')
+    return ''.join(rng.choice(syllables) for _ in range(rng.randint(2, 3))).capitalize()
+
+
+def _print_progress(table: str, rows: int):
+    print(f'{table}: {rows} rows', file = sys.stderr)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog = 'python -m benchmarks.generate',
+        description = 'Generates a synthetic database that follows schema.sql.')
+
+    parser.add_argument('path', type = Path, help = 'the database file to create (replaced if it exists)')
+
+    for option, default in DEFAULT_COUNTS.items():
+        parser.add_argument(f'--{option}', type = int, default = default, help = f'(default: {default})')
+
+    parser.add_argument(
+        '--skew', type = float, default = 1.0,
+        help = 'how unevenly children are spread over their parents; 0 is even (default: 1.0)')
+
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--batch-size', type = int, default = DEFAULT_BATCH_SIZE,
+                        help = 'rows inserted per transaction')
+
+    arguments = parser.parse_args(argv)
+    start = time.perf_counter()
+
+    written = generate_database(
+        arguments.path, arguments.countries, arguments.regions, arguments.airports,
+        arguments.runways, arguments.frequencies, arguments.navaids, arguments.skew,
+        arguments.seed, arguments.batch_size, _print_progress)
+
+    elapsed = time.perf_counter() - start
+    total = sum(written.values())
+    print(f'{total} rows in {elapsed:.1f} s ({total / elapsed:,.0f} rows/s)', file = sys.stderr)
+    return 0
+
+
+
+if __name__ == '__main__':
+    sys.exit(main())
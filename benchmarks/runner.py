@@ -0,0 +1,184 @@
+# benchmarks/runner.py
+#
+# ICS 33 Fall 2023
+# Project 2: Learning to Fly
+#
+# Times each kind of engine event against databases of several sizes: searches by
+# every combination of search fields, loads by id, saves of new records, and edits.
+
+import itertools
+import random
+import sqlite3
+import time
+from pathlib import Path
+from p2app.engine import Engine
+from p2app.events import *
+from .stats import summarize
+
+
+
+# Each table's search fields, in the order its search event takes them.
+_SEARCH_FIELDS = {
+    'continent': ['continent_code', 'name'],
+    'country': ['country_code', 'name'],
+    'region': ['region_code', 'local_code', 'name']
+}
+
+_SEARCH_EVENTS = {
+    'continent': StartContinentSearchEvent,
+    'country': StartCountrySearchEvent,
+    'region': StartRegionSearchEvent
+}
+
+_LOAD_EVENTS = {
+    'continent': LoadContinentEvent,
+    'country': LoadCountryEvent,
+    'region': LoadRegionEvent
+}
+
+_RECORD_TYPES = {
+    'continent': (Continent, SaveNewContinentEvent, SaveContinentEvent),
+    'country': (Country, SaveNewCountryEvent, SaveCountryEvent),
+    'region': (Region, SaveNewRegionEvent, SaveRegionEvent)
+}
+
+_FAILURE_EVENTS = (ErrorEvent, SaveContinentFailedEvent, SaveCountryFailedEvent,
+                   SaveRegionFailedEvent)
+
+
+
+class Benchmark:
+    def __init__(self, database: Path, iterations: int, seed: int = 0, **engine_options):
+        self._database = Path(database)
+        self._iterations = iterations
+        self._random = random.Random(seed)
+        self._engine_options = engine_options
+
+
+    def run(self) -> list[dict]:
+        """Runs every operation against the database, returning one summary each"""
+        samples = self._sample_records()
+        engine = Engine(**self._engine_options)
+        _consume(engine, OpenDatabaseEvent(self._database))
+
+        try:
+            return [
+                self._time(engine, operation, events)
+                for operation, events in self._operations(samples)
+            ]
+        finally:
+            _consume(engine, CloseDatabaseEvent())
+
+
+    def _operations(self, samples: dict):
+        for table, fields in _SEARCH_FIELDS.items():
+            for count in range(1, len(fields) + 1):
+                for combination in itertools.combinations(fields, count):
+                    yield (f'search_{table}_by_{"_".join(combination)}',
+                           [_search_event(table, record, combination) for record in samples[table]])
+
+        for table, load_event in _LOAD_EVENTS.items():
+            yield f'load_{table}', [load_event(record[0]) for record in samples[table]]
+
+        for table, (record_type, save_new_event, save_event) in _RECORD_TYPES.items():
+            yield f'save_new_{table}', [
+                save_new_event(record_type(*record)) for record in self._new_records(table)]
+
+            yield f'edit_{table}', [
+                save_event(_edited(record_type, record, number))
+                for number, record in enumerate(samples[table])]
+
+
+    def _time(self, engine: Engine, operation: str, events: list) -> dict:
+        latencies = []
+        result_events = 0
+        failures = 0
+
+        for event in events:
+            start = time.perf_counter()
+            results = _consume(engine, event)
+            latencies.append(time.perf_counter() - start)
+            result_events += len(results)
+            failures += sum(isinstance(result, _FAILURE_EVENTS) for result in results)
+
+        return {
+            'operation': operation,
+            **summarize(latencies),
+            'result_events': result_events,
+            'failures': failures
+        }
+
+
+    def _sample_records(self) -> dict:
+        samples = {}
+
+        with sqlite3.connect(self._database) as connection:
+            for table, (record_type, _, _) in _RECORD_TYPES.items():
+                samples[table] = self._random_records(connection, table, record_type)
+
+            self._used_codes = {
+                table: {row[0] for row in connection.execute(f'SELECT {table}_code FROM {table}')}
+                for table in ('continent', 'country')
+            }
+
+            self._some_country = connection.execute(
+                'SELECT country_id, continent_id FROM country LIMIT 1').fetchone()
+
+        connection.close()
+        return samples
+
+
+    def _random_records(self, connection, table: str, record_type) -> list[tuple]:
+        # Picks ids at random between the lowest and highest, taking the next record
+        # whenever one falls in a gap, so that no table is ever read in full.
+        key = record_type._fields[0]
+        lowest, highest = connection.execute(f'SELECT min({key}), max({key}) FROM {table}').fetchone()
+        query = f'SELECT {", ".join(record_type._fields)} FROM {table} WHERE {key} >= ? ' \
+                f'ORDER BY {key} LIMIT 1'
+
+        return [
+            connection.execute(query, (self._random.randint(lowest, highest),)).fetchone()
+            for _ in range(self._iterations)
+        ]
+
+
+    def _new_records(self, table: str) -> list[tuple]:
+        if table == 'region':
+            country_id, continent_id = self._some_country
+            return [
+                (None, f'ZZ-B{number}', f'B{number}', f'Benchmark {number}', continent_id,
+                 country_id, None, None)
+                for number in range(self._iterations)
+            ]
+
+        codes = [
+            code for code in (
+                ''.join(letters) for letters in itertools.product('ABCDEFGHIJKLMNOPQRSTUVWXYZ', repeat = 2))
+            if code not in self._used_codes[table]
+        ][:self._iterations]
+
+        if table == 'continent':
+            return [(None, code, f'Benchmark {code}') for code in codes]
+
+        return [
+            (None, code, f'Benchmark {code}', self._some_country[1],
+             f'https://en.wikipedia.org/wiki/Benchmark_{code}', None)
+            for code in codes
+        ]
+
+
+
+def _search_event(table: str, record: tuple, combination: tuple):
+    values = dict(zip(_RECORD_TYPES[table][0]._fields, record))
+    return _SEARCH_EVENTS[table](
+        *(values[field] if field in combination else None for field in _SEARCH_FIELDS[table]))
+
+
+def _edited(record_type, record: tuple, number: int):
+    fields = dict(zip(record_type._fields, record))
+    fields['name'] = f'Edited {number}'
+    return record_type(**fields)
+
+
+def _consume(engine: Engine, event) -> list:
+    return list(engine.process_event(event))
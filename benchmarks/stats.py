@@ -0,0 +1,34 @@
+# benchmarks/stats.py
+#
+# ICS 33 Fall 2023
+# Project 2: Learning to Fly
+#
+# Summaries of the latencies measured by a benchmark.
+
+import math
+
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """Returns the nearest-rank percentile of an already sorted list of values"""
+    if not sorted_values:
+        return math.nan
+
+    rank = math.ceil(percent / 100 * len(sorted_values))
+    return sorted_values[max(rank, 1) - 1]
+
+
+def summarize(latencies: list[float]) -> dict:
+    """Summarizes a list of latencies, in seconds, as milliseconds at the 50th, 95th,
+    and 99th percentiles, along with the mean and the rate of events per second"""
+    ordered = sorted(latencies)
+    total = sum(ordered)
+
+    return {
+        'iterations': len(ordered),
+        'p50_ms': percentile(ordered, 50) * 1000,
+        'p95_ms': percentile(ordered, 95) * 1000,
+        'p99_ms': percentile(ordered, 99) * 1000,
+        'mean_ms': total / len(ordered) * 1000 if ordered else math.nan,
+        'events_per_second': len(ordered) / total if total else math.nan
+    }
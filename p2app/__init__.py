@@ -9,4 +9,13 @@
 
 from .engine import Engine
 from .events import EventBus
-from .views import MainView
+
+
+def __getattr__(name):
+    # The views are imported only when asked for, so that the engine can be used
+    # without tkinter (see p2app/cli.py).
+    if name == 'MainView':
+        from .views import MainView
+        return MainView
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,192 @@
+# p2app/cli.py
+#
+# ICS 33 Fall 2023
+# Project 2: Learning to Fly
+#
+# A command-line runner that drives the engine without the user interface, so that
+# it can be used from scripts and on servers that have no display.  Nothing here
+# imports tkinter.
+#
+# Events are given as JSON objects, one per line in a script file (or standard
+# input) or one per --event argument, naming the event type and its arguments:
+#
+#     {"event": "StartRegionSearchEvent", "region_code": null, "local_code": null, "name": "Alaska"}
+#     {"event": "SaveNewContinentEvent", "continent": {"continent_id": null, "continent_code": "XX", "name": "X"}}
+#     {"event": "ExportTableEvent", "table": "airport", "path": "airports.jsonl"}
+#
+# Every event the engine sends back is printed as a JSON object of the same shape.
+#
+#     python -m p2app.cli airport.db --script events.jsonl
+#     python -m p2app.cli airport.db --event '{"event": "ExportTableEvent", ...}'
+
+import argparse
+import inspect
+import json
+import sys
+from pathlib import Path
+from p2app import events
+from p2app.engine import Engine
+from p2app.events import *
+
+
+
+# The types of records that appear as arguments of events, which are given as JSON
+# objects with one property per field.
+_RECORD_TYPES = (Continent, Country, Region, Airport, RunwaySummary, AirportSelection,
+                 NavigationAid)
+
+
+
+def main(argv: list[str] | None = None) -> int:
+    arguments = _parse_arguments(argv)
+
+    # The whole script is decoded before any event runs, so that a mistake in it never
+    # leaves the database open, or an in-memory working copy unsaved, partway through.
+    try:
+        requests = [decode_event(json.loads(text)) for text in arguments.event]
+
+        if arguments.script:
+            requests.extend(read_script(arguments.script))
+    except (OSError, ValueError, TypeError) as e:
+        print(json.dumps(encode_event(ErrorEvent(f'Invalid script: {e}'))))
+        return 2
+
+    if arguments.database:
+        requests.insert(0, OpenDatabaseEvent(
+            arguments.database, arguments.profile, arguments.in_memory))
+
+        requests.append(CloseDatabaseEvent())
+
+    engine = Engine()
+    failed = False
+
+    for request in requests:
+        failed |= run_event(engine, request)
+
+    return 1 if failed else 0
+
+
+def run_event(engine: Engine, event) -> bool:
+    """Sends one event to the engine and prints each resulting event as a JSON line,
+    returning True if any of them reported a failure"""
+    failed = False
+
+    for result in engine.process_event(event):
+        print(json.dumps(encode_event(result)))
+        failed |= _is_failure(result)
+
+    return failed
+
+
+def read_script(script: str):
+    """Yields the events in a JSONL script, read from standard input if it is '-'"""
+    source = sys.stdin if script == '-' else open(script, encoding = 'utf-8')
+
+    try:
+        for line in source:
+            if line.strip():
+                yield decode_event(json.loads(line))
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+
+def decode_event(data: dict):
+    """Builds an event from a JSON object naming its type and arguments, converting
+    arguments to the types its constructor is annotated with"""
+    data = dict(data)
+    event_name = data.pop('event', None)
+    event_type = getattr(events, event_name, None) if isinstance(event_name, str) else None
+
+    if not inspect.isclass(event_type):
+        raise ValueError(f'unknown event type {event_name!r}')
+
+    parameters = inspect.signature(event_type).parameters
+    arguments = {
+        name: _decode_value(value, parameters[name].annotation if name in parameters else None)
+        for name, value in data.items()
+    }
+
+    return event_type(**arguments)
+
+
+def encode_event(event) -> dict:
+    """Turns an event into a JSON-ready object naming its type and its values"""
+    encoded = {'event': type(event).__name__}
+
+    for name, value in vars(event).items():
+        encoded[name.lstrip('_')] = _encode_value(value)
+
+    return encoded
+
+
+def _decode_value(value, annotation):
+    if value is None:
+        return None
+    elif isinstance(value, dict) and 'event' in value:
+        return decode_event(value)
+    elif isinstance(value, dict):
+        for record_type in _RECORD_TYPES:
+            if _annotation_includes(annotation, record_type):
+                return record_type(**value)
+    elif isinstance(value, str) and _annotation_includes(annotation, Path):
+        return Path(value)
+
+    return value
+
+
+def _annotation_includes(annotation, expected_type) -> bool:
+    return annotation is expected_type or expected_type in getattr(annotation, '__args__', ())
+
+
+def _encode_value(value):
+    if isinstance(value, _RECORD_TYPES):
+        return value._asdict()
+    elif isinstance(value, (list, tuple)):
+        return [_encode_value(item) for item in value]
+    elif isinstance(value, dict):
+        return {str(key): _encode_value(item) for key, item in value.items()}
+    elif isinstance(value, Path):
+        return str(value)
+    elif isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    elif hasattr(value, '__dict__'):
+        return encode_event(value)
+    else:
+        return repr(value)
+
+
+def _is_failure(event) -> bool:
+    return isinstance(event, (ErrorEvent, DatabaseOpenFailedEvent, SaveContinentFailedEvent,
+                              SaveCountryFailedEvent, SaveRegionFailedEvent))
+
+
+def _parse_arguments(argv: list[str] | None):
+    parser = argparse.ArgumentParser(
+        prog = 'python -m p2app.cli',
+        description = 'Runs engine events without the user interface, printing the '
+                      'events sent back as JSON lines.')
+
+    parser.add_argument(
+        'database', nargs = '?', type = Path,
+        help = 'the database to open before, and close after, running the events')
+
+    parser.add_argument('--profile', help = 'the connection profile to open the database with')
+    parser.add_argument(
+        '--in-memory', action = 'store_true',
+        help = 'work on an in-memory copy of the database, saved back when it is closed')
+
+    parser.add_argument(
+        '-e', '--event', action = 'append', default = [],
+        help = 'an event to run, as a JSON object; may be given more than once')
+
+    parser.add_argument(
+        '-s', '--script',
+        help = 'a file of events to run, one JSON object per line, or - for standard input')
+
+    return parser.parse_args(argv)
+
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,259 @@
+from p2app.events import *
+import json
+import sqlite3
+from . import fulltext, runways, spatial
+from .cache import DEFAULT_CACHE_SIZE, RecordCache
+from .geo import CoordinateStore, require_numpy
+from .paging import DEFAULT_CHUNK_SIZE, search_query, fetch_chunks
+
+class AirportsEvents:
+    """The processing of airport-related events by the engine"""
+
+    TABLE = 'airport'
+    ID_COLUMN = 'airport_id'
+    SEARCH_COLUMNS = ['airport_ident', 'iata_code', 'gps_code', 'name']
+    SEARCH_SELECT = """
+    SELECT airport_id, airport_ident, type, name, latitude_deg, longitude_deg, elevation_ft,
+    continent_id, country_id, region_id, municipality, scheduled_service, gps_code, iata_code,
+    local_code, home_link, wikipedia_link, keywords
+    FROM airport
+    """
+    LOAD_QUERY = """
+    SELECT airport_id, airport_ident, type, name, latitude_deg, longitude_deg, elevation_ft,
+    continent_id, country_id, region_id, municipality, scheduled_service, gps_code, iata_code,
+    local_code, home_link, wikipedia_link, keywords
+    FROM airport
+    WHERE airport_id = ?
+    """
+    LOAD_MANY_QUERY = """
+    SELECT airport_id, airport_ident, type, name, latitude_deg, longitude_deg, elevation_ft,
+    continent_id, country_id, region_id, municipality, scheduled_service, gps_code, iata_code,
+    local_code, home_link, wikipedia_link, keywords
+    FROM airport
+    WHERE airport_id IN (SELECT value FROM json_each(?))
+    """
+    QUALIFIED_COLUMNS = """
+    t.airport_id, t.airport_ident, t.type, t.name, t.latitude_deg, t.longitude_deg, t.elevation_ft,
+    t.continent_id, t.country_id, t.region_id, t.municipality, t.scheduled_service, t.gps_code,
+    t.iata_code, t.local_code, t.home_link, t.wikipedia_link, t.keywords
+    """
+
+    def __init__(self, connection, chunk_size: int = DEFAULT_CHUNK_SIZE, batch_results: bool = True,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        self.connect = connection
+        self.chunk_size = chunk_size
+        self.batch_results = batch_results
+        self.cache = RecordCache(cache_size)
+        self.coordinates = CoordinateStore(connection)
+
+    def event_handlers(self) -> dict:
+        """Maps each airport-related event type to the method that handles it"""
+        return {
+            StartAirportSearchEvent: self.process_search,
+            StartAirportTextSearchEvent: self.process_text_search,
+            StartAirportAreaSearchEvent: self.process_area_search,
+            StartNearestAirportSearchEvent: self.process_nearest,
+            StartNearestAirportBatchSearchEvent: self.process_nearest_batch,
+            LoadAirportEvent: self.process_load,
+            LoadAirportDetailsEvent: self.process_load_details
+        }
+
+    def process_search(self, event: StartAirportSearchEvent):
+        """Handles an airport search by ident, IATA code, GPS code, and name, streaming
+        the matches as they are fetched"""
+        airports_get = self.search_airports(event.airport_ident(), event.iata_code(),
+                                            event.gps_code(), event.name(), event.limit(),
+                                            event.after_id())
+        yield from self.stream_results(airports_get, event.after_id() is None)
+
+    def process_text_search(self, event: StartAirportTextSearchEvent):
+        """Handles a search by words or word prefixes in the names and keywords, with
+        the best matches sent first"""
+        yield from self.stream_results(self.text_search_airports(event.text(), event.limit()))
+
+    def process_area_search(self, event: StartAirportAreaSearchEvent):
+        """Handles a search for the airports within a box on the map, such as the area
+        shown in a map window"""
+        airports_get = self.area_search_airports(event.min_latitude(), event.min_longitude(),
+                                                 event.max_latitude(), event.max_longitude(),
+                                                 event.limit(), event.after_id())
+        yield from self.stream_results(airports_get, event.after_id() is None)
+
+    def process_nearest(self, event: StartNearestAirportSearchEvent):
+        """Handles a request for the airports nearest a point"""
+        yield from self.stream_nearest([(event.latitude(), event.longitude())], event.count())
+
+    def process_nearest_batch(self, event: StartNearestAirportBatchSearchEvent):
+        """Handles a request for the airports nearest each of many points, sending back
+        one event per point, in the order the points were given"""
+        yield from self.stream_nearest(event.points(), event.count())
+
+    def process_load(self, event: LoadAirportEvent):
+        """Handles a request to load one airport"""
+        airport_loaded = self.load_airport(event.airport_id())
+        if isinstance(airport_loaded, tuple):
+            yield AirportLoadedEvent(Airport(*airport_loaded))
+        elif airport_loaded is None:
+            yield ErrorEvent(f'No airport with id {event.airport_id()}')
+        else:
+            yield ErrorEvent(airport_loaded)
+
+    def process_load_details(self, event: LoadAirportDetailsEvent):
+        """Handles a request to load one airport along with a summary of its runways"""
+        details = self.load_airport_details(event.airport_id())
+        if isinstance(details, tuple):
+            airport, summary = details
+            yield AirportDetailsLoadedEvent(Airport(*airport), RunwaySummary(*summary))
+        elif details is None:
+            yield ErrorEvent(f'No airport with id {event.airport_id()}')
+        else:
+            yield ErrorEvent(details)
+
+    def stream_results(self, airports_get: sqlite3.Cursor|str, report_none: bool = True):
+        """Sends the rows of an executed search back as they are fetched, one batch
+        event per chunk unless batching is turned off"""
+        if isinstance(airports_get, str):
+            yield ErrorEvent(airports_get)
+            return
+        found = False
+        try:
+            for rows in fetch_chunks(airports_get, self.chunk_size):
+                found = True
+                airports = [Airport(*airport) for airport in rows]
+                if self.batch_results:
+                    yield AirportSearchResultBatchEvent(airports)
+                else:
+                    for airport_obj in airports:
+                        yield AirportSearchResultEvent(airport_obj)
+        except sqlite3.Error as e:
+            yield ErrorEvent(f'Database error: {e}')
+            return
+        if not found and report_none:
+            yield ErrorEvent('No result matches')
+
+    def stream_nearest(self, points: list, count: int):
+        """Finds the count airports nearest each point, a chunk of points at a time,
+        and sends back one NearestAirportsEvent per point"""
+        invalid = require_numpy() or validate_nearest(points, count)
+        if invalid:
+            yield ErrorEvent(invalid)
+            return
+        latitudes = [point[0] for point in points]
+        longitudes = [point[1] for point in points]
+        point_index = 0
+        try:
+            for ids, distances in self.coordinates.nearest(latitudes, longitudes, count):
+                records = self.load_airports(ids.ravel().tolist())
+                for row_ids, row_distances in zip(ids.tolist(), distances.tolist()):
+                    yield NearestAirportsEvent(latitudes[point_index], longitudes[point_index],
+                                               [Airport(*records[i]) for i in row_ids],
+                                               row_distances)
+                    point_index += 1
+        except sqlite3.Error as e:
+            yield ErrorEvent(f'Database error: {e}')
+
+    def search_airports(self, airport_ident: str, iata_code: str, gps_code: str, name: str,
+                        limit: int | None = None, after_id: int | None = None) -> sqlite3.Cursor|str:
+        """Queries the SQLite database for airports based on ident, IATA code, GPS code,
+        and name, returning the executed cursor so the rows can be streamed"""
+        try:
+            criteria = {
+                'airport_ident': airport_ident,
+                'iata_code': iata_code,
+                'gps_code': gps_code,
+                'name': name
+            }
+            query, parameters = search_query(self.SEARCH_SELECT, criteria, self.ID_COLUMN, limit,
+                                             after_id)
+            return self.connect.execute(query, parameters)
+        except sqlite3.Error as e:
+            return f'Database error: {e}'
+
+    def text_search_airports(self, text: str, limit: int | None = None) -> sqlite3.Cursor|str:
+        """Queries the full-text index for airports whose name or keywords contain
+        every word of the text (or words beginning with them), building the index
+        first if it does not exist yet, and returns the executed cursor ordered by rank.
+        When the index cannot be built, every row is scanned instead and the rows come in
+        id order."""
+        if fulltext.prefix_query(text or '') is None:
+            return 'No result matches'
+        try:
+            query, parameters = fulltext.text_query(
+                self.connect, 'airport', self.QUALIFIED_COLUMNS, text, limit)
+            return self.connect.execute(query, parameters)
+        except sqlite3.Error as e:
+            return f'Database error: {e}'
+
+    def area_search_airports(self, min_latitude: float, min_longitude: float, max_latitude: float,
+                             max_longitude: float, limit: int | None = None,
+                             after_id: int | None = None) -> sqlite3.Cursor|str:
+        """Queries the spatial index for the airports within a box on the map, building
+        the index first if it does not exist yet (or scanning the table if it cannot be
+        built), and returns the executed cursor in id order.  A box whose west edge lies
+        east of its east edge crosses the antimeridian."""
+        invalid = validate_area(min_latitude, min_longitude, max_latitude, max_longitude)
+        if invalid:
+            return invalid
+        try:
+            indexed = spatial.build_index(self.connect, 'airport')
+            query, parameters = spatial.area_query('airport', self.QUALIFIED_COLUMNS,
+                                                   min_latitude, min_longitude, max_latitude,
+                                                   max_longitude, limit, after_id, indexed=indexed)
+            return self.connect.execute(query, parameters)
+        except sqlite3.Error as e:
+            return f'Database error: {e}'
+
+    def load_airport(self, airport_id: int) -> tuple|str|None:
+        cached = self.cache.get(airport_id)
+        if cached is not None:
+            return cached
+        try:
+            result = self.connect.execute(self.LOAD_QUERY, (airport_id, )).fetchone()
+            if result is not None:
+                self.cache.put(airport_id, result)
+            return result
+        except sqlite3.Error as e:
+            return f'Database error: {e}'
+
+    def load_airport_details(self, airport_id: int) -> tuple|str|None:
+        """Loads an airport and the summary of its runways, building the runway summary
+        table first if it does not exist yet and can be built"""
+        airport = self.load_airport(airport_id)
+        if not isinstance(airport, tuple):
+            return airport
+        try:
+            runways.build_summary(self.connect)
+            return airport, runways.load_summary(self.connect, airport_id)
+        except sqlite3.Error as e:
+            return f'Database error: {e}'
+
+    def load_airports(self, airport_ids: list[int]) -> dict:
+        """Loads the airports with the given ids in one statement, returning them keyed
+        by id"""
+        cursor = self.connect.execute(self.LOAD_MANY_QUERY, (json.dumps(list(set(airport_ids))),))
+        return {row[0]: row for row in cursor.fetchall()}
+
+def validate_nearest(points: list, count: int) -> str | None:
+    """Checks the points and count of a nearest-airport search, returning the reason
+    they are invalid, or None if they are valid"""
+    if not isinstance(count, int) or count < 1:
+        return 'Invalid search: the number of airports must be at least 1'
+    for point in points:
+        if len(point) != 2 or any(not isinstance(value, (int, float)) for value in point):
+            return f'Invalid point {point!r}: give a latitude and longitude in degrees'
+        if not (-90 <= point[0] <= 90 and -180 <= point[1] <= 180):
+            return f'Invalid point {point!r}: latitude or longitude out of range'
+    return None
+
+def validate_area(min_latitude: float, min_longitude: float, max_latitude: float,
+                  max_longitude: float) -> str | None:
+    """Checks that a box on the map has valid coordinates, returning the reason it is
+    invalid, or None if it is valid"""
+    if any(not isinstance(value, (int, float))
+           for value in (min_latitude, min_longitude, max_latitude, max_longitude)):
+        return 'Invalid area: every edge must be given in degrees'
+    if not -90 <= min_latitude <= max_latitude <= 90:
+        return 'Invalid area: latitudes must lie between -90 and 90, south edge first'
+    if not (-180 <= min_longitude <= 180 and -180 <= max_longitude <= 180):
+        return 'Invalid area: longitudes must lie between -180 and 180'
+    return None
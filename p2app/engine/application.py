@@ -1,36 +1,83 @@
 from p2app.events import *
 import sqlite3
+from contextlib import closing
 from pathlib import Path
+from .profiles import PROFILES, DEFAULT_PROFILE, apply_profile
+from .tracing import TracingConnection
+
+# The number of pages copied in each step of a backup, between calls to the
+# progress callback.
+_BACKUP_PAGES_PER_STEP = 1024
 
 class ApplicationEvents:
     """The processing of application-level events from the engine"""
-    def __init__(self):
-        """Initializes the application events processing"""
+    def __init__(self, default_profile: str = DEFAULT_PROFILE, copy_progress=None):
+        """Initializes the application events processing.  If given, copy_progress is
+        called as copy_progress(status, remaining, total) after each step of copying
+        an in-memory working copy to or from its file."""
         self.connect = None
+        self.default_profile = default_profile
+        self.copy_progress = copy_progress
+        self.profile = None
+        self.pragmas = {}
+        self.path = None
+        self.in_memory = False
+        self._saved_changes = 0
 
     def process_application(self, event: object):
         """Handles the events that will be sent when receiving particular event call"""
         if isinstance(event, QuitInitiatedEvent):
+            if self.connect and self.has_unsaved_changes():
+                saved = self.save_working_copy()
+                if not isinstance(saved, bool):
+                    yield ErrorEvent(f'{saved} (the application has not been closed)')
+                    return
+                yield WorkingCopySavedEvent(self.path)
             yield EndApplicationEvent()
         if isinstance(event, OpenDatabaseEvent):
             event_path = event.path()
-            opened = self.connect_database(event_path)
+            opened = self.connect_database(event_path, event.profile() or self.default_profile,
+                                           event.in_memory())
             if isinstance(opened, bool):
-                yield DatabaseOpenedEvent(event_path)
+                yield DatabaseOpenedEvent(event_path, self.in_memory)
+                yield DatabaseTunedEvent(self.profile, self.pragmas)
             else:
                 yield DatabaseOpenFailedEvent(opened)
+        if isinstance(event, SaveWorkingCopyEvent):
+            saved = self.save_working_copy()
+            if isinstance(saved, bool):
+                yield WorkingCopySavedEvent(self.path)
+            else:
+                yield ErrorEvent(saved)
         if isinstance(event, CloseDatabaseEvent):
             if self.connect:
+                if self.has_unsaved_changes():
+                    saved = self.save_working_copy()
+                    if not isinstance(saved, bool):
+                        yield ErrorEvent(f'{saved} (the database has been left open)')
+                        return
+                    yield WorkingCopySavedEvent(self.path)
                 self.connect.close()
                 self.connect = None
+                self.profile = None
+                self.pragmas = {}
+                self.path = None
+                self.in_memory = False
             yield DatabaseClosedEvent()
 
-    def connect_database(self, event_path: Path) ->bool|str:
-        """Connects to SQL data"""
+    def connect_database(self, event_path: Path, profile: str = DEFAULT_PROFILE,
+                         in_memory: bool = False) ->bool|str:
+        """Connects to SQL data and applies the named connection profile.  If in_memory
+        is True, the database is copied into memory first and the engine works on
+        that copy until it is saved back to the file."""
+        if profile not in PROFILES:
+            return f'Failed to open the database: Unknown connection profile {profile!r}'
         try:
-            self.connect = sqlite3.connect(event_path)
+            if in_memory:
+                self.connect = self.load_working_copy(event_path)
+            else:
+                self.connect = sqlite3.connect(event_path, factory=TracingConnection)
             cursor = self.connect.cursor()
-            cursor.execute("PRAGMA foreign_keys = ON;")
             tables = ['continent', 'country', 'region']
             for table in tables:
                 cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?",
@@ -39,6 +86,44 @@ class ApplicationEvents:
                     self.connect.close()
                     self.connect = None
                     return 'Failed to open the database: Invalid database'
+            self.pragmas = apply_profile(self.connect, profile)
+            self.profile = profile
+            self.path = event_path
+            self.in_memory = in_memory
+            self._saved_changes = self.connect.total_changes
             return True
         except sqlite3.Error as e:
+            if self.connect:
+                self.connect.close()
+                self.connect = None
             return f'Database error: {e}'
+
+    def load_working_copy(self, event_path: Path) -> sqlite3.Connection:
+        """Copies the database file into a new in-memory database using the backup API"""
+        source_uri = f'{Path(event_path).resolve().as_uri()}?mode=ro'
+        memory = sqlite3.connect(':memory:', factory=TracingConnection)
+        try:
+            with closing(sqlite3.connect(source_uri, uri=True)) as source:
+                source.backup(memory, pages=_BACKUP_PAGES_PER_STEP, progress=self.copy_progress)
+        except sqlite3.Error:
+            memory.close()
+            raise
+        return memory
+
+    def has_unsaved_changes(self) -> bool:
+        """Checks whether the in-memory working copy was changed since it was last saved"""
+        return self.in_memory and self.connect.total_changes != self._saved_changes
+
+    def save_working_copy(self) -> bool|str:
+        """Writes the in-memory working copy back over the database file"""
+        if not self.in_memory:
+            return 'Failed to save: the database is not open as an in-memory working copy'
+        try:
+            self.connect.commit()
+            with closing(sqlite3.connect(self.path)) as target:
+                self.connect.backup(target, pages=_BACKUP_PAGES_PER_STEP,
+                                    progress=self.copy_progress)
+            self._saved_changes = self.connect.total_changes
+            return True
+        except sqlite3.Error as e:
+            return f'Failed to save the working copy: {e}'
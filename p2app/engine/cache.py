@@ -0,0 +1,50 @@
+from collections import OrderedDict
+
+DEFAULT_CACHE_SIZE = 1024
+
+
+class RecordCache:
+    """A bounded cache of records keyed by id, which evicts the least recently used
+    record once it is full and counts its hits and misses"""
+    def __init__(self, capacity: int = DEFAULT_CACHE_SIZE):
+        """Initializes an empty cache holding at most capacity records"""
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._records = OrderedDict()
+
+    def get(self, record_id: int) -> tuple | None:
+        """Returns the cached record with the given id, or None if it is not cached"""
+        record = self._records.get(record_id)
+        if record is None:
+            self.misses += 1
+            return None
+        self._records.move_to_end(record_id)
+        self.hits += 1
+        return record
+
+    def put(self, record_id: int, record: tuple):
+        """Caches a record, replacing any older copy with the same id"""
+        if self.capacity <= 0:
+            return
+        self._records[record_id] = record
+        self._records.move_to_end(record_id)
+        if len(self._records) > self.capacity:
+            self._records.popitem(last=False)
+
+    def invalidate(self, record_id: int):
+        """Removes the record with the given id, if it is cached"""
+        self._records.pop(record_id, None)
+
+    def clear(self):
+        """Removes every cached record"""
+        self._records.clear()
+
+    def stats(self) -> dict:
+        """Returns the cache's counters"""
+        return {
+            'size': len(self._records),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses
+        }
@@ -1,96 +1,131 @@
 from p2app.events import *
 import sqlite3
+from .cache import DEFAULT_CACHE_SIZE, RecordCache
+from .paging import DEFAULT_CHUNK_SIZE, search_query, fetch_chunks
+from .references import ReferenceIds
+from .saving import insert_query, update_query
+from .session import EditSession
 
 class ContinentsEvents:
     """The processing of continent-related events by the engine"""
-    def __init__(self, connection):
-        """Initializes the processor"""
+
+    TABLE = 'continent'
+    ID_COLUMN = 'continent_id'
+    RECORD_COLUMNS = ['continent_id', 'continent_code', 'name']
+    SEARCH_COLUMNS = ['continent_code', 'name']
+    SEARCH_SELECT = """
+    SELECT continent_id, continent_code, name FROM continent
+    """
+    LOAD_QUERY = """
+    SELECT continent_id, continent_code, name FROM continent
+    WHERE continent_id = ?
+    """
+
+    def __init__(self, connection, chunk_size: int = DEFAULT_CHUNK_SIZE, batch_results: bool = True,
+                 cache_size: int = DEFAULT_CACHE_SIZE, session: EditSession | None = None,
+                 references: ReferenceIds | None = None):
+        """Initializes the processor, whose saves join the given edit session and check
+        their continent and country ids against the given reference sets"""
         self.connect = connection
+        self.chunk_size = chunk_size
+        self.batch_results = batch_results
+        self.cache = RecordCache(cache_size)
+        self.session = session or EditSession(connection)
+        self.references = references or ReferenceIds(connection)
 
-    def process_continents_events(self, event):
-        """
-        Handles the events that will be sent in the continent view
-        when receiving particular event call
-        """
-        if isinstance(event, StartContinentSearchEvent):
-            continents_get = self.search_continents(event.continent_code(), event.name())
-            if isinstance(continents_get, list):
-                for continent_data in continents_get:
-                    continent_obj = Continent(*continent_data)
-                    yield ContinentSearchResultEvent(continent_obj)
-            else:
-                yield ErrorEvent(continents_get)
-        elif isinstance(event, LoadContinentEvent):
-            continent_load = self.load_continents(event.continent_id())
-            if isinstance(continent_load, tuple):
-                continent_load_obj = Continent(*continent_load)
-                yield ContinentLoadedEvent(continent_load_obj)
-            else:
-                yield ErrorEvent(continent_load)
-        elif isinstance(event, SaveNewContinentEvent):
-            continent_add = self.save_new_continent(event.continent().continent_code, event.continent().name)
-            if isinstance(continent_add, tuple):
-                 continent_add_obj = Continent(*continent_add)
-                 yield ContinentSavedEvent(continent_add_obj)
-            else:
-                yield SaveContinentFailedEvent(continent_add)
-        elif isinstance(event, SaveContinentEvent):
-            loaded_continent = self.load_continents(event.continent().continent_id)
-            loaded_continent_obj = Continent(*loaded_continent)
-            continent_edit = self.edit_continent(loaded_continent_obj.continent_code,
-                                                    loaded_continent_obj.name,
-                                                    event.continent().continent_code,
-                                                    event.continent().name)
-            if  isinstance(continent_edit, tuple):
-                continent_edit_obj = Continent(*continent_edit)
-                yield ContinentSavedEvent(continent_edit_obj)
-            else:
-                yield SaveContinentFailedEvent(continent_edit)
+    def event_handlers(self) -> dict:
+        """Maps each continent-related event type to the method that handles it"""
+        return {
+            StartContinentSearchEvent: self.process_search,
+            LoadContinentEvent: self.process_load,
+            SaveNewContinentEvent: self.process_save_new,
+            SaveContinentEvent: self.process_save
+        }
+
+    def process_search(self, event: StartContinentSearchEvent):
+        """Handles a continent search sent by the continent view, streaming the matches
+        as they are fetched, one batch event per chunk unless batching is turned off"""
+        continents_get = self.search_continents(event.continent_code(), event.name(),
+                                                event.limit(), event.after_id())
+        if isinstance(continents_get, str):
+            yield ErrorEvent(continents_get)
+            return
+        found = False
+        try:
+            for rows in fetch_chunks(continents_get, self.chunk_size):
+                found = True
+                continents = [Continent(*continent_data) for continent_data in rows]
+                if self.batch_results:
+                    yield ContinentSearchResultBatchEvent(continents)
+                else:
+                    for continent_obj in continents:
+                        yield ContinentSearchResultEvent(continent_obj)
+        except sqlite3.Error as e:
+            yield ErrorEvent(f'Database error: {e}')
+            return
+        if not found and event.after_id() is None:
+            yield ErrorEvent('No result matches')
+
+    def process_load(self, event: LoadContinentEvent):
+        """Handles a request to load one continent for editing"""
+        continent_load = self.load_continents(event.continent_id())
+        if isinstance(continent_load, tuple):
+            continent_load_obj = Continent(*continent_load)
+            yield ContinentLoadedEvent(continent_load_obj)
+        else:
+            yield ErrorEvent(continent_load)
+
+    def process_save_new(self, event: SaveNewContinentEvent):
+        """Handles a request to save a newly created continent"""
+        continent_add = self.save_new_continent(event.continent().continent_code, event.continent().name)
+        if isinstance(continent_add, tuple):
+            self.cache.put(continent_add[0], continent_add)
+            continent_add_obj = Continent(*continent_add)
+            yield ContinentSavedEvent(continent_add_obj)
+        else:
+            yield SaveContinentFailedEvent(continent_add)
+
+    def process_save(self, event: SaveContinentEvent):
+        """Handles a request to save changes to an existing continent"""
+        continent_edit = self.edit_continent(event.continent().continent_id,
+                                             event.continent().continent_code,
+                                             event.continent().name)
+        if isinstance(continent_edit, tuple):
+            self.cache.put(continent_edit[0], continent_edit)
+            continent_edit_obj = Continent(*continent_edit)
+            yield ContinentSavedEvent(continent_edit_obj)
+        else:
+            self.cache.invalidate(event.continent().continent_id)
+            yield SaveContinentFailedEvent(continent_edit)
 
-    def search_continents(self, continent_code: str, name: str) -> list|str:
-        """Queries the SQLite database for continents based on code and name"""
+    def search_continents(self, continent_code: str, name: str, limit: int | None = None,
+                          after_id: int | None = None) -> sqlite3.Cursor|str:
+        """Queries the SQLite database for continents based on code and name,
+        returning the executed cursor so the rows can be streamed"""
         cursor = self.connect.cursor()
-        cursor.execute("PRAGMA foreign_keys = ON;")
         try:
-            result = []
-            if continent_code and name:
-                query = """
-            SELECT continent_id, continent_code, name FROM continent
-            WHERE continent_code = ? AND name = ?
-            """
-                cursor.execute(query, (continent_code, name))
-                result = cursor.fetchall()
-            elif continent_code:
-                query = """
-            SELECT continent_id, continent_code, name FROM continent
-            WHERE continent_code = ?
-            """
-                cursor.execute(query, (continent_code,))
-                result = cursor.fetchall()
-            elif name:
-                query = """
-                    SELECT continent_id, continent_code, name FROM continent
-                    WHERE name = ?
-                    """
-                cursor.execute(query, (name,))
-                result = cursor.fetchall()
-            if not result:
-                return 'No result matches'
-            return result
+            criteria = {
+                'continent_code': continent_code,
+                'name': name
+            }
+            query, parameters = search_query(self.SEARCH_SELECT, criteria, self.ID_COLUMN, limit,
+                                             after_id)
+            cursor.execute(query, parameters)
+            return cursor
         except sqlite3.Error as e:
             return f'Database error: {e}'
 
     def load_continents(self, continent_id: int) ->tuple|str:
         """Queries the SQLite database for continents based on the id"""
+        cached = self.cache.get(continent_id)
+        if cached is not None:
+            return cached
         cursor = self.connect.cursor()
-        cursor.execute("PRAGMA foreign_keys = ON;")
         try:
-            query = """
-            SELECT continent_id, continent_code, name FROM continent
-            WHERE continent_id = ?
-            """
-            cursor.execute(query, (continent_id, ))
+            cursor.execute(self.LOAD_QUERY, (continent_id, ))
             result = cursor.fetchone()
+            if result is not None:
+                self.cache.put(continent_id, result)
             return result
         except sqlite3.Error as e:
             return f'Database error: {e}'
@@ -100,71 +135,48 @@ class ContinentsEvents:
         Add new continent into the database,
         return False if it does not follow convention or already exist
         """
-        cursor = self.connect.cursor()
-        cursor.execute("PRAGMA foreign_keys = ON;")
         try:
-            if not continent_code.isupper() or len(continent_code) != 2:
-                return ('Failed to save the new continent information: Invalid continent code(should be two'
-                        ' capital letters)')
-            query = """
-            INSERT INTO continent (continent_code, name)
-            VALUES(?, ?)
-            """
-            cursor.execute(query, (continent_code, name))
-            self.connect.commit()
-            new_id = cursor.lastrowid
-            select_query = """
-            SELECT continent_id, continent_code, name FROM continent
-            WHERE continent_id = ?
-            """
-            cursor.execute(select_query, (new_id,))
-            result = cursor.fetchone()
+            invalid = validate_new_continent(continent_code)
+            if invalid:
+                return invalid
+            query, parameters = insert_query(self.TABLE, {
+                'continent_code': continent_code,
+                'name': name
+            }, self.RECORD_COLUMNS)
+            with self.session.saving():
+                result = self.connect.execute(query, parameters).fetchone()
+            self.references.add(self.TABLE, result[0])
             return result
         except sqlite3.Error as e:
             return f'Database error: {e}'
 
-    def edit_continent(self, continent_code: str, name: str, new_continent_code: str, new_name: str) ->tuple|str:
+    def edit_continent(self, continent_id: int, new_continent_code: str, new_name: str) ->tuple|str:
         """
         Update the current information of continent,
         return False if not follow convention
         """
-        cursor = self.connect.cursor()
-        cursor.execute("PRAGMA foreign_keys = ON;")
         try:
-            if new_continent_code and new_name:
-                if not new_continent_code.isupper() or len(new_continent_code) != 2:
-                    return ('Failed to save the new continent information: Invalid continent code(should be two'
-                            ' capital letters)')
-                query = """
-                        UPDATE continent
-                        SET continent_code = ?, name = ?
-                        WHERE continent_code = ? AND name = ? 
-                        """
-                cursor.execute(query, (new_continent_code, new_name, continent_code, name))
             if new_continent_code:
                 if not new_continent_code.isupper() or len(new_continent_code) != 2:
                     return ('Failed to save the new continent information: Invalid continent code(should be two'
                             ' capital letters)')
-                query = """
-                UPDATE continent
-                SET continent_code = ?
-                WHERE continent_code = ? AND name = ?
-                """
-                cursor.execute(query, (new_continent_code, continent_code, name))
-            if new_name:
-                query = """
-                UPDATE continent
-                SET name = ?
-                WHERE continent_code = ? AND name = ?
-                """
-                cursor.execute(query, (new_name, continent_code, name))
-            self.connect.commit()
-            get_update = """
-            SELECT continent_id, continent_code, name FROM continent
-            WHERE continent_code = ? AND name = ?
-            """
-            cursor.execute(get_update, (new_continent_code or continent_code, new_name or name))
-            change = cursor.fetchone()
+            query, parameters = update_query(self.TABLE, self.ID_COLUMN, continent_id, {
+                'continent_code': new_continent_code or None,
+                'name': new_name or None
+            }, self.RECORD_COLUMNS)
+            with self.session.saving():
+                change = self.connect.execute(query, parameters).fetchone()
+            if change is None:
+                return f'Failed to save the continent information: No continent with id {continent_id}'
             return change
         except sqlite3.Error as e:
             return f'Database error: {e}'
+
+
+def validate_new_continent(continent_code: str) -> str | None:
+    """Checks a new continent against the engine's rules, returning the reason it is
+    invalid, or None if it is valid"""
+    if not continent_code or not continent_code.isupper() or len(continent_code) != 2:
+        return ('Failed to save the new continent information: Invalid continent code(should be two'
+                ' capital letters)')
+    return None
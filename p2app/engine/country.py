@@ -1,96 +1,175 @@
 from p2app.events import *
 import sqlite3
+from . import fulltext
+from .cache import DEFAULT_CACHE_SIZE, RecordCache
+from .paging import DEFAULT_CHUNK_SIZE, search_query, fetch_chunks
+from .references import ReferenceIds
+from .saving import insert_query, update_query
+from .session import EditSession
 
 class CountriesEvents:
     """The processing of country-related events by the engine"""
-    def __init__(self, connection):
-        """Initializes the processor"""
+
+    TABLE = 'country'
+    ID_COLUMN = 'country_id'
+    RECORD_COLUMNS = ['country_id', 'country_code', 'name', 'continent_id', 'wikipedia_link',
+                      'keywords']
+    SEARCH_COLUMNS = ['country_code', 'name']
+    SEARCH_SELECT = """
+    SELECT country_id, country_code, name, continent_id, wikipedia_link, keywords FROM country
+    """
+    LOAD_QUERY = """
+    SELECT country_id, country_code, name, continent_id, wikipedia_link, keywords FROM country
+    WHERE country_id = ?
+    """
+
+    def __init__(self, connection, chunk_size: int = DEFAULT_CHUNK_SIZE, batch_results: bool = True,
+                 cache_size: int = DEFAULT_CACHE_SIZE, session: EditSession | None = None,
+                 references: ReferenceIds | None = None):
+        """Initializes the processor, whose saves join the given edit session and check
+        their continent and country ids against the given reference sets"""
         self.connect = connection
+        self.chunk_size = chunk_size
+        self.batch_results = batch_results
+        self.cache = RecordCache(cache_size)
+        self.session = session or EditSession(connection)
+        self.references = references or ReferenceIds(connection)
 
-    def process_countries_events(self, event):
-        """Handles the events that will be sent in the country view
-        when receiving particular event call
-        """
-        if isinstance(event, StartCountrySearchEvent):
-            countries_get = self.search_countries(event.country_code(), event.name())
-            if isinstance(countries_get, list):
-                for country_data in countries_get:
-                    country_obj = Country(*country_data)
-                    yield CountrySearchResultEvent(country_obj)
-            else:
-                yield ErrorEvent(countries_get)
-        elif isinstance(event, LoadCountryEvent):
-            country_load = self.load_countries(event.country_id())
-            if isinstance(country_load, tuple):
-                country_load_obj = Country(*country_load)
-                yield CountryLoadedEvent(country_load_obj)
-            else:
-                yield ErrorEvent(country_load)
-        elif isinstance(event, SaveNewCountryEvent):
-            country_add = self.save_new_country(event.country().country_code, event.country().name,
-                                                event.country().continent_id, event.country().wikipedia_link,
-                                                event.country().keywords)
-            if isinstance(country_add, tuple):
-                country_add_obj = Country(*country_add)
-                yield CountrySavedEvent(country_add_obj)
-            else:
-                yield SaveCountryFailedEvent(country_add)
-        elif isinstance(event, SaveCountryEvent):
-            loaded_country = self.load_countries(event.country().country_id)
-            loaded_country_obj = Country(*loaded_country)
-            country_edit = self.edit_country(loaded_country_obj.country_code, event.country().country_code,
-                                             event.country().name, event.country().continent_id,
-                                             event.country().wikipedia_link, event.country().keywords)
-            if isinstance(country_edit, tuple):
-                country_edit_obj = Country(*country_edit)
-                yield CountrySavedEvent(country_edit_obj)
-            else:
-                yield SaveCountryFailedEvent(country_edit)
+    def event_handlers(self) -> dict:
+        """Maps each country-related event type to the method that handles it"""
+        return {
+            StartCountrySearchEvent: self.process_search,
+            StartCountryTextSearchEvent: self.process_text_search,
+            LoadCountryEvent: self.process_load,
+            SaveNewCountryEvent: self.process_save_new,
+            SaveCountryEvent: self.process_save
+        }
 
-    def search_countries(self, country_code: str, name: str) ->list|str:
-        """Queries the SQLite database for countries based on code and name"""
+    def process_search(self, event: StartCountrySearchEvent):
+        """Handles a country search sent by the country view, streaming the matches
+        as they are fetched, one batch event per chunk unless batching is turned off"""
+        countries_get = self.search_countries(event.country_code(), event.name(),
+                                              event.limit(), event.after_id())
+        if isinstance(countries_get, str):
+            yield ErrorEvent(countries_get)
+            return
+        found = False
+        try:
+            for rows in fetch_chunks(countries_get, self.chunk_size):
+                found = True
+                countries = [Country(*country_data) for country_data in rows]
+                if self.batch_results:
+                    yield CountrySearchResultBatchEvent(countries)
+                else:
+                    for country_obj in countries:
+                        yield CountrySearchResultEvent(country_obj)
+        except sqlite3.Error as e:
+            yield ErrorEvent(f'Database error: {e}')
+            return
+        if not found and event.after_id() is None:
+            yield ErrorEvent('No result matches')
+
+    def process_text_search(self, event: StartCountryTextSearchEvent):
+        """Handles a search by words or word prefixes in the names and keywords, with
+        the best matches sent first"""
+        countries_get = self.text_search_countries(event.text(), event.limit())
+        if isinstance(countries_get, str):
+            yield ErrorEvent(countries_get)
+            return
+        found = False
+        try:
+            for rows in fetch_chunks(countries_get, self.chunk_size):
+                found = True
+                countries = [Country(*country_data) for country_data in rows]
+                if self.batch_results:
+                    yield CountrySearchResultBatchEvent(countries)
+                else:
+                    for country_obj in countries:
+                        yield CountrySearchResultEvent(country_obj)
+        except sqlite3.Error as e:
+            yield ErrorEvent(f'Database error: {e}')
+            return
+        if not found:
+            yield ErrorEvent('No result matches')
+
+    def process_load(self, event: LoadCountryEvent):
+        """Handles a request to load one country for editing"""
+        country_load = self.load_countries(event.country_id())
+        if isinstance(country_load, tuple):
+            country_load_obj = Country(*country_load)
+            yield CountryLoadedEvent(country_load_obj)
+        else:
+            yield ErrorEvent(country_load)
+
+    def process_save_new(self, event: SaveNewCountryEvent):
+        """Handles a request to save a newly created country"""
+        country_add = self.save_new_country(event.country().country_code, event.country().name,
+                                            event.country().continent_id, event.country().wikipedia_link,
+                                            event.country().keywords)
+        if isinstance(country_add, tuple):
+            self.cache.put(country_add[0], country_add)
+            country_add_obj = Country(*country_add)
+            yield CountrySavedEvent(country_add_obj)
+        else:
+            yield SaveCountryFailedEvent(country_add)
+
+    def process_save(self, event: SaveCountryEvent):
+        """Handles a request to save changes to an existing country"""
+        country_edit = self.edit_country(event.country().country_id, event.country().country_code,
+                                         event.country().name, event.country().continent_id,
+                                         event.country().wikipedia_link, event.country().keywords)
+        if isinstance(country_edit, tuple):
+            self.cache.put(country_edit[0], country_edit)
+            country_edit_obj = Country(*country_edit)
+            yield CountrySavedEvent(country_edit_obj)
+        else:
+            self.cache.invalidate(event.country().country_id)
+            yield SaveCountryFailedEvent(country_edit)
+
+    def search_countries(self, country_code: str, name: str, limit: int | None = None,
+                         after_id: int | None = None) -> sqlite3.Cursor|str:
+        """Queries the SQLite database for countries based on code and name,
+        returning the executed cursor so the rows can be streamed"""
         cursor = self.connect.cursor()
-        cursor.execute("PRAGMA foreign_keys = ON;")
         try:
-            result = []
-            if country_code and name:
-                query = """
-            SELECT country_id, country_code, name, continent_id, wikipedia_link, keywords FROM country
-            WHERE country_code = ? AND name = ?
-            """
-                cursor.execute(query, (country_code, name))
-                result = cursor.fetchall()
-            elif country_code:
-                query = """
-            SELECT country_id, country_code, name, continent_id, wikipedia_link, keywords FROM country
-            WHERE country_code = ?
-            """
-                cursor.execute(query, (country_code,))
-                result = cursor.fetchall()
-            elif name:
-                query = """
-            SELECT country_id, country_code, name, continent_id, wikipedia_link, keywords FROM country
-            WHERE name = ?
-                """
-                cursor.execute(query, (name,))
-                result = cursor.fetchall()
-            if not result:
-                return 'No result matches'
-            return result
+            criteria = {
+                'country_code': country_code,
+                'name': name
+            }
+            query, parameters = search_query(self.SEARCH_SELECT, criteria, self.ID_COLUMN, limit,
+                                             after_id)
+            cursor.execute(query, parameters)
+            return cursor
+        except sqlite3.Error as e:
+            return f'Database error: {e}'
+
+    def text_search_countries(self, text: str, limit: int | None = None) -> sqlite3.Cursor|str:
+        """Queries the full-text index for countries whose name or keywords contain every
+        word of the text (or words beginning with them), building the index first if
+        it does not exist yet, and returns the executed cursor ordered by rank.  When the
+        index cannot be built, every row is scanned instead and the rows come in id
+        order."""
+        if fulltext.prefix_query(text or '') is None:
+            return 'No result matches'
+        try:
+            query, parameters = fulltext.text_query(self.connect, 'country', """
+            t.country_id, t.country_code, t.name, t.continent_id, t.wikipedia_link, t.keywords
+            """, text, limit)
+            return self.connect.execute(query, parameters)
         except sqlite3.Error as e:
             return f'Database error: {e}'
 
     def load_countries(self, country_id: int) ->tuple|str:
         """Queries the SQLite database for continents based on the id"""
+        cached = self.cache.get(country_id)
+        if cached is not None:
+            return cached
         cursor = self.connect.cursor()
-        cursor.execute("PRAGMA foreign_keys = ON;")
         try:
-            query = """
-            SELECT country_id, country_code, name, continent_id, wikipedia_link, keywords FROM country
-            WHERE country_id = ?
-            """
-            cursor.execute(query, (country_id, ))
+            cursor.execute(self.LOAD_QUERY, (country_id, ))
             result = cursor.fetchone()
+            if result is not None:
+                self.cache.put(country_id, result)
             return result
         except sqlite3.Error as e:
             return f'Database error: {e}'
@@ -101,40 +180,33 @@ class CountriesEvents:
         Add new  country into the database,
         if it already exists or does not follow convention return False
         """
-        cursor = self.connect.cursor()
-        cursor.execute("PRAGMA foreign_keys = ON;")
         try:
-            if not country_code.isupper() or len(country_code) != 2:
-                return ('Failed to save the new country information: Invalid country code'
-                        '(should be two capital letters)')
-            if wikipedia_link:
-                if 'https://en.wikipedia.org/wiki/' not in wikipedia_link:
-                    return 'Failed to save the new country information: Invalid web link'
-            query = """
-            INSERT INTO country (country_code, name, continent_id, wikipedia_link, keywords)
-            VALUES(?, ?, ?, ?, ?)
-            """
-            cursor.execute(query, (country_code, name, continent_id, wikipedia_link, keywords))
-            self.connect.commit()
-            new_id = cursor.lastrowid
-            select_query = """
-            SELECT country_id, country_code, name, continent_id, wikipedia_link, keywords FROM country
-            WHERE country_id = ?
-            """
-            cursor.execute(select_query, (new_id,))
-            result = cursor.fetchone()
+            invalid = validate_new_country(country_code, wikipedia_link)
+            if invalid:
+                return invalid
+            missing = self.references.missing(continent_id=continent_id)
+            if missing:
+                return f'Failed to save the new country information: {missing}'
+            query, parameters = insert_query(self.TABLE, {
+                'country_code': country_code,
+                'name': name,
+                'continent_id': continent_id,
+                'wikipedia_link': wikipedia_link,
+                'keywords': keywords
+            }, self.RECORD_COLUMNS)
+            with self.session.saving():
+                result = self.connect.execute(query, parameters).fetchone()
+            self.references.add(self.TABLE, result[0])
             return result
         except sqlite3.Error as e:
             return f'Database error: {e}'
 
-    def edit_country(self, country_code: str, new_country_code: str, new_name: str,
+    def edit_country(self, country_id: int, new_country_code: str, new_name: str,
                      new_continent_id: int, new_wikipedia_link: str, new_keywords: str) ->tuple|str:
         """
         Update the current information of continent,
         return False if not follow convention
         """
-        cursor = self.connect.cursor()
-        cursor.execute("PRAGMA foreign_keys = ON;")
         try:
             if new_country_code:
                 if not new_country_code.isupper() or len(new_country_code) != 2:
@@ -143,33 +215,31 @@ class CountriesEvents:
             if new_wikipedia_link:
                 if 'https://en.wikipedia.org/wiki/' not in new_wikipedia_link:
                     return 'Failed to save the new country information: Invalid web link'
-            data_changed = []
-            columns = []
-            changed_pair = {
+            missing = self.references.missing(continent_id=new_continent_id)
+            if missing:
+                return f'Failed to update country information: {missing}'
+            query, parameters = update_query(self.TABLE, self.ID_COLUMN, country_id, {
                 'country_code': new_country_code,
                 'name': new_name,
                 'continent_id': new_continent_id,
                 'wikipedia_link': new_wikipedia_link,
                 'keywords': new_keywords
-            }
-            for column, data in changed_pair.items():
-                if data is not None:
-                    columns.append(f'{column} = ?')
-                    data_changed.append(data)
-            data_changed.append(country_code)
-            query = """
-            UPDATE country 
-            SET {}
-            WHERE country_code = ?  
-            """.format(",".join(columns))
-            cursor.execute(query, tuple(data_changed))
-            self.connect.commit()
-            select_new_query = """
-            SELECT country_id, country_code, name, continent_id, wikipedia_link, keywords FROM country
-            where country_code = ?
-            """
-            cursor.execute(select_new_query, (new_country_code or country_code, ))
-            change = cursor.fetchone()
+            }, self.RECORD_COLUMNS)
+            with self.session.saving():
+                change = self.connect.execute(query, parameters).fetchone()
+            if change is None:
+                return f'Failed to update country information: No country with id {country_id}'
             return change
         except sqlite3.Error as e:
             return f'Database error: {e}'
+
+def validate_new_country(country_code: str, wikipedia_link: str) -> str | None:
+    """Checks a new country against the engine's rules, returning the reason it is
+    invalid, or None if it is valid"""
+    if not country_code or not country_code.isupper() or len(country_code) != 2:
+        return ('Failed to save the new country information: Invalid country code'
+                '(should be two capital letters)')
+    if wikipedia_link:
+        if 'https://en.wikipedia.org/wiki/' not in wikipedia_link:
+            return 'Failed to save the new country information: Invalid web link'
+    return None
@@ -0,0 +1,141 @@
+from p2app.events import *
+import json
+import sqlite3
+from pathlib import Path
+from .geo import DEFAULT_MAX_CELLS, distance_blocks, numpy, require_numpy
+from .paging import DEFAULT_CHUNK_SIZE
+
+class DistanceEvents:
+    """The processing of airport distance events by the engine"""
+    def __init__(self, connection, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 max_cells: int = DEFAULT_MAX_CELLS):
+        """Initializes the processor, which sends distances back chunk_size triples at a
+        time and computes at most max_cells distances at once"""
+        self.connect = connection
+        self.chunk_size = chunk_size
+        self.max_cells = max_cells
+
+    def event_handlers(self) -> dict:
+        """Maps each distance event type to the method that handles it"""
+        return {
+            StartAirportDistancesEvent: self.process_distances,
+            WriteAirportDistancesEvent: self.process_write_distances
+        }
+
+    def process_distances(self, event: StartAirportDistancesEvent):
+        """Handles a request for the distances between two sets of airports, streaming
+        them as (from airport id, to airport id, kilometers) triples, leaving out those
+        farther apart than max_km if it is given"""
+        airports = self.load_pair(event.from_airports(), event.to_airports())
+        if isinstance(airports, str):
+            yield ErrorEvent(airports)
+            return
+        (from_ids, from_latitudes, from_longitudes), (to_ids, to_latitudes, to_longitudes) = airports
+        max_km = event.max_km()
+        found = False
+        for start, block in distance_blocks(from_latitudes, from_longitudes, to_latitudes,
+                                            to_longitudes, self.max_cells):
+            if max_km is None:
+                rows, columns = numpy.divmod(numpy.arange(block.size), block.shape[1])
+            else:
+                rows, columns = numpy.nonzero(block <= max_km)
+            for chunk in range(0, len(rows), self.chunk_size):
+                chunk_rows = rows[chunk:chunk + self.chunk_size]
+                chunk_columns = columns[chunk:chunk + self.chunk_size]
+                found = True
+                yield AirportDistanceBatchEvent(list(zip(
+                    from_ids[chunk_rows + start].tolist(), to_ids[chunk_columns].tolist(),
+                    block[chunk_rows, chunk_columns].tolist())))
+        if not found:
+            yield ErrorEvent('No result matches')
+
+    def process_write_distances(self, event: WriteAirportDistancesEvent):
+        """Handles a request to write the distances between two sets of airports to a
+        .npy file, as a matrix with one row per airport of the first set and one column
+        per airport of the second.  The file is memory-mapped and filled a block of rows
+        at a time, so the matrix never has to fit in memory.  The airport ids of the
+        rows and columns are written alongside it, to a .ids.npz file."""
+        airports = self.load_pair(event.from_airports(), event.to_airports())
+        if isinstance(airports, str):
+            yield ErrorEvent(airports)
+            return
+        (from_ids, from_latitudes, from_longitudes), (to_ids, to_latitudes, to_longitudes) = airports
+        path = Path(event.path())
+        ids_path = path.with_suffix('.ids.npz')
+        try:
+            matrix = numpy.lib.format.open_memmap(path, mode='w+', dtype=numpy.float32,
+                                                  shape=(len(from_ids), len(to_ids)))
+            for start, block in distance_blocks(from_latitudes, from_longitudes, to_latitudes,
+                                                to_longitudes, self.max_cells):
+                matrix[start:start + len(block)] = block
+            matrix.flush()
+            del matrix
+            numpy.savez(ids_path, from_ids=from_ids, to_ids=to_ids)
+        except OSError as e:
+            yield ErrorEvent(f'Failed to write distances to {path}: {e}')
+            return
+        yield AirportDistancesWrittenEvent(path, ids_path, len(from_ids), len(to_ids))
+
+    def load_pair(self, from_airports: AirportSelection, to_airports: AirportSelection) -> tuple|str:
+        """Loads the ids and coordinates (in radians) of both sets of airports"""
+        unavailable = require_numpy()
+        if unavailable:
+            return unavailable
+        loaded = []
+        for selection in (from_airports, to_airports):
+            airports = self.load_selection(selection)
+            if isinstance(airports, str):
+                return airports
+            loaded.append(airports)
+        return tuple(loaded)
+
+    def load_selection(self, selection: AirportSelection) -> tuple|str:
+        """Loads the ids, latitudes, and longitudes of the airports in a region, in a
+        country, or with the given idents (or those meeting all of the criteria that
+        are given), as arrays in id order with the coordinates in radians"""
+        invalid = validate_selection(selection)
+        if invalid:
+            return invalid
+        conditions = []
+        parameters = []
+        if selection.region_id is not None:
+            conditions.append('region_id = ?')
+            parameters.append(selection.region_id)
+        if selection.country_id is not None:
+            conditions.append('country_id = ?')
+            parameters.append(selection.country_id)
+        if selection.airport_idents is not None:
+            conditions.append('airport_ident IN (SELECT value FROM json_each(?))')
+            parameters.append(json.dumps(list(selection.airport_idents)))
+        query = f"""
+        SELECT airport_id, airport_ident, latitude_deg, longitude_deg
+        FROM airport
+        WHERE {' AND '.join(conditions)}
+        ORDER BY airport_id
+        """
+        try:
+            rows = self.connect.execute(query, parameters).fetchall()
+        except sqlite3.Error as e:
+            return f'Database error: {e}'
+        if selection.airport_idents is not None and selection.region_id is None \
+                and selection.country_id is None:
+            found = {row[1] for row in rows}
+            missing = [ident for ident in selection.airport_idents if ident not in found]
+            if missing:
+                return f'No airport with ident {missing[0]}'
+        if not rows:
+            return f'No airports match {selection}'
+        ids = numpy.array([row[0] for row in rows], dtype=numpy.int64)
+        latitudes = numpy.radians(numpy.array([row[2] for row in rows], dtype=numpy.float64))
+        longitudes = numpy.radians(numpy.array([row[3] for row in rows], dtype=numpy.float64))
+        return ids, latitudes, longitudes
+
+def validate_selection(selection) -> str | None:
+    """Checks that a selection of airports names at least one criterion, returning the
+    reason it is invalid, or None if it is valid"""
+    if not isinstance(selection, AirportSelection):
+        return f'Invalid airport selection {selection!r}'
+    if selection.region_id is None and selection.country_id is None \
+            and selection.airport_idents is None:
+        return 'Invalid airport selection: give a region, a country, or a list of idents'
+    return None
@@ -0,0 +1,135 @@
+from p2app.events import *
+import csv
+import json
+import sqlite3
+from pathlib import Path
+from .paging import DEFAULT_CHUNK_SIZE, fetch_chunks
+
+# The tables that can be exported whole.  Where the events package has a namedtuple
+# for a table's records, its fields give the exported columns and their order;
+# otherwise every column is exported in the order the table declares them.
+EXPORTABLE_TABLES = {
+    'continent': Continent,
+    'country': Country,
+    'region': Region,
+    'airport': Airport,
+    'airport_frequency': None,
+    'runway': None,
+    'navigation_aid': None
+}
+
+FILE_FORMATS = ('csv', 'jsonl')
+
+class ExportEvents:
+    """The processing of export events by the engine"""
+    def __init__(self, connection, processors: list, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """Initializes the processor, which runs searches through the given continent,
+        country, region and airport processors and fetches chunk_size rows at a time"""
+        self.connect = connection
+        self.processors = {processor.TABLE: processor for processor in processors}
+        self.chunk_size = chunk_size
+
+    def event_handlers(self) -> dict:
+        """Maps each export event type to the method that handles it"""
+        return {
+            ExportTableEvent: self.process_export_table,
+            ExportSearchEvent: self.process_export_search
+        }
+
+    def process_export_table(self, event: ExportTableEvent):
+        """Handles a request to write every row of a table to a file"""
+        table = event.table()
+        if table not in EXPORTABLE_TABLES:
+            yield ErrorEvent(f'Failed to export: cannot export table {table!r}')
+            return
+        record_type = EXPORTABLE_TABLES[table]
+        if record_type:
+            query = f'SELECT {", ".join(record_type._fields)} FROM {table} ORDER BY rowid'
+        else:
+            query = f'SELECT * FROM {table} ORDER BY rowid'
+        try:
+            cursor = self.connect.execute(query)
+        except sqlite3.Error as e:
+            yield ErrorEvent(f'Database error: {e}')
+            return
+        yield self.export(cursor, event.path(), event.file_format())
+
+    def process_export_search(self, event: ExportSearchEvent):
+        """Handles a request to write the results of a search to a file instead of
+        sending them to the user interface"""
+        cursor = self.search_cursor(event.search())
+        if isinstance(cursor, str):
+            yield ErrorEvent(cursor)
+            return
+        yield self.export(cursor, event.path(), event.file_format())
+
+    def search_cursor(self, search) -> sqlite3.Cursor|str:
+        """Runs a search event through the processor that would normally handle it and
+        returns the executed cursor"""
+        if isinstance(search, StartContinentSearchEvent):
+            return self.processors['continent'].search_continents(
+                search.continent_code(), search.name(), search.limit(), search.after_id())
+        if isinstance(search, StartCountrySearchEvent):
+            return self.processors['country'].search_countries(
+                search.country_code(), search.name(), search.limit(), search.after_id())
+        if isinstance(search, StartCountryTextSearchEvent):
+            return self.processors['country'].text_search_countries(search.text(), search.limit())
+        if isinstance(search, StartRegionSearchEvent):
+            return self.processors['region'].search_regions(
+                search.region_code(), search.local_code(), search.name(), search.limit(),
+                search.after_id())
+        if isinstance(search, StartRegionTextSearchEvent):
+            return self.processors['region'].text_search_regions(search.text(), search.limit())
+        if isinstance(search, StartAirportSearchEvent):
+            return self.processors['airport'].search_airports(
+                search.airport_ident(), search.iata_code(), search.gps_code(), search.name(),
+                search.limit(), search.after_id())
+        if isinstance(search, StartAirportTextSearchEvent):
+            return self.processors['airport'].text_search_airports(search.text(), search.limit())
+        if isinstance(search, StartAirportAreaSearchEvent):
+            return self.processors['airport'].area_search_airports(
+                search.min_latitude(), search.min_longitude(), search.max_latitude(),
+                search.max_longitude(), search.limit(), search.after_id())
+        return f'Failed to export: cannot export the results of {type(search).__name__}'
+
+    def export(self, cursor: sqlite3.Cursor, path: Path, file_format: str | None = None):
+        """Writes the rows of an executed cursor to a CSV or JSONL file, one chunk at a
+        time, and returns the event reporting the outcome.  The format is taken from
+        the file's suffix unless it is given."""
+        file_format = file_format or _format_of(path)
+        if file_format not in FILE_FORMATS:
+            return ErrorEvent(f'Failed to export: unknown file format {file_format!r}')
+        columns = [description[0] for description in cursor.description]
+        rows = 0
+        try:
+            with open(path, 'w', newline='', encoding='utf-8') as target:
+                write_rows = _csv_writer(target, columns) if file_format == 'csv' \
+                    else _jsonl_writer(target, columns)
+                for chunk in fetch_chunks(cursor, self.chunk_size):
+                    write_rows(chunk)
+                    rows += len(chunk)
+            return DataExportedEvent(path, rows)
+        except OSError as e:
+            return ErrorEvent(f'Failed to export to {path}: {e}')
+        except sqlite3.Error as e:
+            return ErrorEvent(f'Database error: {e}')
+
+
+def _format_of(path: Path) -> str:
+    """Guesses a file's format from its suffix, defaulting to CSV"""
+    suffix = Path(path).suffix.lower().lstrip('.')
+    return 'jsonl' if suffix in ('jsonl', 'ndjson') else 'csv'
+
+
+def _csv_writer(target, columns: list):
+    """Writes the header of a CSV file and returns a function writing a chunk of rows"""
+    writer = csv.writer(target)
+    writer.writerow(columns)
+    return writer.writerows
+
+
+def _jsonl_writer(target, columns: list):
+    """Returns a function writing a chunk of rows as one JSON object per line"""
+    def write_rows(rows):
+        target.writelines(json.dumps(dict(zip(columns, row))) + '\n' for row in rows)
+    return write_rows
@@ -0,0 +1,133 @@
+import sqlite3
+from .profiles import is_query_only
+from .scripts import run_script
+
+# The tables that can be searched by words or word prefixes, each mapped to its
+# primary key and the text columns that are indexed.  The indexes are FTS5
+# external-content tables, so they store only the index itself and read the text
+# back from the original tables.
+INDEXED_TABLES = {
+    'country': ('country_id', ['name', 'keywords']),
+    'region': ('region_id', ['name', 'keywords']),
+    'airport': ('airport_id', ['name', 'keywords'])
+}
+
+# Matches in the name column rank higher than matches in keywords.
+_COLUMN_WEIGHTS = {
+    'name': 10.0,
+    'keywords': 1.0
+}
+
+
+def index_name(table: str) -> str:
+    """Returns the name of the full-text index over the given table"""
+    return f'{table}_fts'
+
+
+def has_index(connection: sqlite3.Connection, table: str) -> bool:
+    """Checks whether the full-text index over the given table has been built"""
+    cursor = connection.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+                                (index_name(table),))
+    return cursor.fetchone() is not None
+
+
+def build_index(connection: sqlite3.Connection, table: str) -> bool:
+    """Creates the full-text index over the given table, fills it from the existing
+    rows, and adds triggers that keep it in sync with later inserts, updates, and
+    deletes, returning whether the index can be searched.  It cannot be built while
+    a transaction is open or on a connection that may only query the database."""
+    if has_index(connection, table):
+        return True
+    if connection.in_transaction or is_query_only(connection):
+        return False
+    key, columns = INDEXED_TABLES[table]
+    fts = index_name(table)
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+    run_script(connection, f"""
+    BEGIN;
+    CREATE VIRTUAL TABLE {fts} USING fts5(
+        {column_list}, content='{table}', content_rowid='{key}'
+    );
+    CREATE TRIGGER {fts}_after_insert AFTER INSERT ON {table} BEGIN
+        INSERT INTO {fts} (rowid, {column_list}) VALUES (new.{key}, {new_values});
+    END;
+    CREATE TRIGGER {fts}_after_delete AFTER DELETE ON {table} BEGIN
+        INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', old.{key}, {old_values});
+    END;
+    CREATE TRIGGER {fts}_after_update AFTER UPDATE ON {table} BEGIN
+        INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', old.{key}, {old_values});
+        INSERT INTO {fts} (rowid, {column_list}) VALUES (new.{key}, {new_values});
+    END;
+    INSERT INTO {fts} ({fts}) VALUES ('rebuild');
+    COMMIT;
+    """)
+    return True
+
+
+def prefix_query(text: str) -> str | None:
+    """Turns what the user typed into an FTS5 query in which every word must appear,
+    either in full or as the beginning of a longer word"""
+    words = text.split()
+    if not words:
+        return None
+    return ' '.join('"{}"*'.format(word.replace('"', '""')) for word in words)
+
+
+def search_query(table: str, select_columns: str, limit: int | None = None) -> str:
+    """Builds a ranked full-text search over the given table, whose parameters are the
+    FTS5 query (and the limit, if there is one).  select_columns are qualified with
+    the alias t, which stands for the original table."""
+    key, columns = INDEXED_TABLES[table]
+    fts = index_name(table)
+    weights = ', '.join(str(_COLUMN_WEIGHTS.get(column, 1.0)) for column in columns)
+    query = f"""
+    SELECT {select_columns}
+    FROM {fts} JOIN {table} AS t ON t.{key} = {fts}.rowid
+    WHERE {fts} MATCH ?
+    ORDER BY bm25({fts}, {weights})
+    """
+    if limit is not None:
+        query += 'LIMIT ?\n'
+    return query
+
+
+def like_query(table: str, select_columns: str, text: str,
+               limit: int | None = None) -> tuple[str, tuple]:
+    """Builds a search over the given table, without the full-text index, for rows
+    whose indexed columns contain every word of the text, returning the query and its
+    parameters.  It scans the whole table and matches words anywhere, not only at
+    their beginnings, so it stands in for search_query only when the index cannot be
+    built.  select_columns are qualified with the alias t."""
+    key, columns = INDEXED_TABLES[table]
+    any_column = '(' + ' OR '.join(f"t.{column} LIKE ? ESCAPE '\\'" for column in columns) + ')'
+    conditions = []
+    parameters = []
+    for word in text.split():
+        escaped = word.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        conditions.append(any_column)
+        parameters.extend([f'%{escaped}%'] * len(columns))
+    query = f"""
+    SELECT {select_columns}
+    FROM {table} AS t
+    WHERE {' AND '.join(conditions)}
+    ORDER BY t.{key}
+    """
+    if limit is not None:
+        query += 'LIMIT ?\n'
+        parameters.append(limit)
+    return query, tuple(parameters)
+
+
+def text_query(connection: sqlite3.Connection, table: str, select_columns: str, text: str,
+               limit: int | None = None) -> tuple[str, tuple]:
+    """Builds a search over the given table for rows whose indexed columns contain
+    every word of the text (or words beginning with them), returning the query and its
+    parameters.  The full-text index is built first if it does not exist yet; if it
+    cannot be, the search falls back to like_query."""
+    if not build_index(connection, table):
+        return like_query(table, select_columns, text, limit)
+    query = search_query(table, select_columns, limit)
+    match = prefix_query(text)
+    return query, (match, limit) if limit is not None else (match,)
@@ -0,0 +1,205 @@
+import math
+from .profiles import is_query_only
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+EARTH_RADIUS_KM = 6371.0088
+
+# The most distances computed at once: a chunk of query points is measured against
+# every stored point, so the number of query points per chunk is this divided by
+# the number of stored points (about 32 MB for each float64 array of distances).
+DEFAULT_MAX_CELLS = 1 << 22
+
+
+def require_numpy() -> str | None:
+    """Returns why the vectorized geographic operations are unavailable, or None if
+    NumPy is installed"""
+    if numpy is None:
+        return 'This operation needs NumPy, which is not installed'
+    return None
+
+
+class CoordinateStore:
+    """The ids and coordinates of every row of a table, held in contiguous NumPy
+    arrays (with the coordinates in radians, and as unit vectors from the center of
+    the Earth) so that distances to all of them can be compared at once.  The arrays
+    are loaded on first use and reloaded after the table may have changed, whether
+    by another connection, as PRAGMA data_version reveals, or by this one, as
+    temporary triggers on the table record.  A connection that may only query the
+    database can neither change the table nor create the triggers, so for it the
+    count of rows it has changed stands in for them."""
+    def __init__(self, connection, table: str = 'airport', key: str = 'airport_id',
+                 latitude: str = 'latitude_deg', longitude: str = 'longitude_deg'):
+        """Initializes an empty store over the given table and columns"""
+        self.connect = connection
+        self.table = table
+        self.query = f'SELECT {key}, {latitude}, {longitude} FROM {table} ORDER BY {key}'
+        self.watched_columns = f'{key}, {latitude}, {longitude}'
+        self.ids = None
+        self.latitudes = None
+        self.longitudes = None
+        self.cos_latitudes = None
+        self.vectors = None
+        self._version = None
+        self._query_only = False
+
+    def __len__(self) -> int:
+        return 0 if self.ids is None else len(self.ids)
+
+    def refresh(self):
+        """Loads the arrays if they have not been loaded yet or may be stale"""
+        version = (self.connect.execute('PRAGMA data_version').fetchone()[0],
+                   self._table_version())
+        if version != self._version:
+            self.reload()
+            self._version = version
+
+    def _table_version(self):
+        """Returns a value that this connection changes whenever it inserts, deletes,
+        or moves a row of the table.  The temporary triggers that change it are created
+        on first use; they belong to this connection alone and never touch the file.
+        A random value, rather than a count, stays distinct even when a transaction
+        that changed it is rolled back and another change follows."""
+        versions = f'{self.table}_coordinates_version'
+        if self._version is None:
+            self._query_only = is_query_only(self.connect)
+            if not self._query_only:
+                # Each statement is run on its own, since executescript would commit a
+                # transaction the engine has open, and none of them is an INSERT, which
+                # would make the sqlite3 module open one.
+                self.connect.execute(
+                    f'CREATE TEMP TABLE IF NOT EXISTS {versions} AS SELECT 0 AS version')
+                for trigger, event in (('after_insert', 'INSERT'), ('after_delete', 'DELETE'),
+                                       ('after_update', f'UPDATE OF {self.watched_columns}')):
+                    self.connect.execute(f"""
+                    CREATE TEMP TRIGGER IF NOT EXISTS {versions}_{trigger}
+                    AFTER {event} ON main.{self.table} BEGIN
+                        UPDATE {versions} SET version = random();
+                    END
+                    """)
+        if self._query_only:
+            return self.connect.total_changes
+        return self.connect.execute(f'SELECT version FROM {versions}').fetchone()[0]
+
+    def reload(self):
+        """Loads the arrays from the database"""
+        rows = self.connect.execute(self.query).fetchall()
+        table = numpy.array(rows, dtype=numpy.float64).reshape(len(rows), 3)
+        self.ids = table[:, 0].astype(numpy.int64)
+        self.latitudes = numpy.ascontiguousarray(numpy.radians(table[:, 1]))
+        self.longitudes = numpy.ascontiguousarray(numpy.radians(table[:, 2]))
+        self.cos_latitudes = numpy.cos(self.latitudes)
+        self.vectors = unit_vectors(self.latitudes, self.longitudes, self.cos_latitudes).T.copy()
+
+    def nearest(self, latitudes, longitudes, count: int, max_cells: int = DEFAULT_MAX_CELLS):
+        """Finds the count stored points nearest each query point, given in degrees,
+        yielding for each chunk of query points an array of their ids and an array of
+        their distances in kilometers, one row per query point, nearest first"""
+        self.refresh()
+        latitudes = numpy.radians(numpy.asarray(latitudes, dtype=numpy.float64).reshape(-1))
+        longitudes = numpy.radians(numpy.asarray(longitudes, dtype=numpy.float64).reshape(-1))
+        size = len(self)
+        count = min(count, size)
+        chunk_size = max(1, max_cells // max(size, 1))
+        for start in range(0, len(latitudes), chunk_size):
+            chunk_latitudes = latitudes[start:start + chunk_size]
+            chunk_longitudes = longitudes[start:start + chunk_size]
+            # The nearer two points are, the larger the dot product of their unit
+            # vectors, so one matrix product ranks every stored point for the whole
+            # chunk.  argpartition then gathers the count largest of each row in
+            # linear time, and only those are measured exactly and sorted.
+            closeness = unit_vectors(chunk_latitudes, chunk_longitudes) @ self.vectors
+            if count < size:
+                nearest = numpy.argpartition(closeness, size - count, axis=1)[:, size - count:]
+            else:
+                nearest = numpy.broadcast_to(numpy.arange(size), closeness.shape).copy()
+            distances = haversine_km(chunk_latitudes[:, None], chunk_longitudes[:, None],
+                                     self.latitudes[nearest], self.longitudes[nearest],
+                                     self.cos_latitudes[nearest])
+            order = numpy.argsort(distances, axis=1)
+            nearest = numpy.take_along_axis(nearest, order, axis=1)
+            yield self.ids[nearest], numpy.take_along_axis(distances, order, axis=1)
+
+
+def great_circle_km(latitude: float, longitude: float, other_latitude: float,
+                    other_longitude: float) -> float:
+    """Computes the great-circle distance in kilometers between two points given in
+    degrees, without needing NumPy"""
+    latitude, longitude, other_latitude, other_longitude = map(
+        math.radians, (latitude, longitude, other_latitude, other_longitude))
+    a = math.sin((other_latitude - latitude) / 2) ** 2 + \
+        math.cos(latitude) * math.cos(other_latitude) * math.sin((other_longitude - longitude) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> tuple:
+    """Returns the smallest box on the map, as (min latitude, min longitude, max
+    latitude, max longitude) in degrees, holding every point within radius_km of a
+    point.  A box that crosses the antimeridian has its west edge east of its east
+    edge; one reaching a pole spans every longitude."""
+    angle = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_latitude = latitude - angle
+    max_latitude = latitude + angle
+    if min_latitude <= -90 or max_latitude >= 90:
+        return max(min_latitude, -90.0), -180.0, min(max_latitude, 90.0), 180.0
+    # The circle reaches farthest east and west where meridians touch it, which is
+    # nearer the pole than its center.
+    spread = math.degrees(math.asin(min(1.0, math.sin(radius_km / EARTH_RADIUS_KM)
+                                        / math.cos(math.radians(latitude)))))
+    min_longitude = (longitude - spread + 180) % 360 - 180
+    max_longitude = (longitude + spread + 180) % 360 - 180
+    return min_latitude, min_longitude, max_latitude, max_longitude
+
+
+def distance_blocks(latitudes, longitudes, other_latitudes, other_longitudes,
+                    max_cells: int = DEFAULT_MAX_CELLS):
+    """Computes the great-circle distances in kilometers between every point of one
+    set and every point of another, all given in radians, a block of rows at a time
+    so that no more than max_cells distances are held at once.  Yields each block's
+    first row number along with the block."""
+    cos_other_latitudes = numpy.cos(other_latitudes)
+    block_size = max(1, max_cells // max(len(other_latitudes), 1))
+    for start in range(0, len(latitudes), block_size):
+        yield start, haversine_km(latitudes[start:start + block_size, None],
+                                  longitudes[start:start + block_size, None],
+                                  other_latitudes, other_longitudes, cos_other_latitudes)
+
+
+def unit_vectors(latitudes, longitudes, cos_latitudes=None):
+    """Turns points given in radians into unit vectors from the center of the Earth,
+    stacked along a new last axis"""
+    if cos_latitudes is None:
+        cos_latitudes = numpy.cos(latitudes)
+    return numpy.stack([cos_latitudes * numpy.cos(longitudes),
+                        cos_latitudes * numpy.sin(longitudes),
+                        numpy.sin(latitudes)], axis=-1)
+
+
+def haversine_km(latitudes, longitudes, other_latitudes, other_longitudes,
+                 cos_other_latitudes=None):
+    """Computes great-circle distances in kilometers between points given in radians,
+    broadcasting the arrays against each other.  The cosines of the other latitudes
+    may be passed in when they are already known."""
+    if cos_other_latitudes is None:
+        cos_other_latitudes = numpy.cos(other_latitudes)
+    # The work is done in place, so that a large broadcast needs only two arrays of
+    # its full size.
+    a = numpy.asarray(numpy.subtract(other_latitudes, latitudes))
+    a *= 0.5
+    numpy.sin(a, out=a)
+    a *= a
+    b = numpy.asarray(numpy.subtract(other_longitudes, longitudes))
+    b *= 0.5
+    numpy.sin(b, out=b)
+    b *= b
+    b *= numpy.cos(latitudes)
+    b *= cos_other_latitudes
+    a += b
+    numpy.clip(a, 0.0, 1.0, out=a)
+    numpy.sqrt(a, out=a)
+    numpy.arcsin(a, out=a)
+    a *= 2 * EARTH_RADIUS_KM
+    return a
@@ -0,0 +1,237 @@
+from p2app.events import *
+import csv
+import sqlite3
+from pathlib import Path
+from .continent import validate_new_continent
+from .country import validate_new_country
+from .region import validate_new_region
+
+DEFAULT_BATCH_SIZE = 10000
+
+_INSERTS = {
+    'continent': """
+    INSERT INTO continent (continent_id, continent_code, name)
+    VALUES (?, ?, ?)
+    """,
+    'country': """
+    INSERT INTO country (country_id, country_code, name, continent_id, wikipedia_link, keywords)
+    VALUES (?, ?, ?, ?, ?, ?)
+    """,
+    'region': """
+    INSERT INTO region (region_id, region_code, local_code, name, continent_id, country_id,
+    wikipedia_link, keywords)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+}
+
+class ImportEvents:
+    """The processing of bulk CSV import events by the engine"""
+    def __init__(self, connection, batch_size: int = DEFAULT_BATCH_SIZE, progress=None,
+                 references=None):
+        """Initializes the processor, which inserts batch_size rows per transaction.  If
+        given, progress is called as progress(table, rows_read, imported, rejected) after
+        each transaction, alongside the ImportProgressEvent sent to the user interface.
+        The reference id sets, if given, are reloaded once new ids have been imported."""
+        self.connect = connection
+        self.batch_size = batch_size
+        self.progress = progress
+        self.references = references
+
+    def event_handlers(self) -> dict:
+        """Maps each import event type to the method that handles it"""
+        return {
+            ImportCsvEvent: self.process_import
+        }
+
+    def process_import(self, event: ImportCsvEvent):
+        """Streams an OurAirports-format CSV file into a table, validating each row with
+        the same rules as saving a new record, and writing the rows that cannot be
+        imported to a reject file along with the reason"""
+        table = event.table()
+        if table not in _INSERTS:
+            yield ErrorEvent(f'Failed to import: cannot import into table {table!r}')
+            return
+        reject_path = Path(event.reject_path() or Path(event.path()).with_suffix('.rejects.csv'))
+        rows_read = 0
+        imported = 0
+        try:
+            make_values = self._row_converter(table)
+            with open(event.path(), newline='', encoding='utf-8-sig') as source, \
+                    _RejectFile(reject_path) as rejects:
+                reader = csv.DictReader(source)
+                batch = []
+                for row in reader:
+                    rows_read += 1
+                    values = make_values(row)
+                    if isinstance(values, str):
+                        rejects.write(reader.fieldnames, row, values)
+                    else:
+                        batch.append((row, values))
+                    if len(batch) >= self.batch_size:
+                        imported += self.insert_batch(table, batch, reader.fieldnames, rejects)
+                        batch = []
+                        yield self._report_progress(table, rows_read, imported, rejects.count)
+                if batch:
+                    imported += self.insert_batch(table, batch, reader.fieldnames, rejects)
+                yield self._report_progress(table, rows_read, imported, rejects.count)
+            if self.references and imported:
+                self.references.reload()
+            yield CsvImportedEvent(table, imported, rejects.count, reject_path if rejects.count else None)
+        except (OSError, csv.Error) as e:
+            yield ErrorEvent(f'Failed to import {event.path()}: {e}')
+        except sqlite3.Error as e:
+            yield ErrorEvent(f'Database error: {e}')
+
+    def insert_batch(self, table: str, batch: list, fieldnames: list, rejects) -> int:
+        """Inserts a batch of rows in one transaction with executemany.  If any row
+        violates a constraint, the batch is retried one row at a time, each under
+        its own savepoint, so that only the offending rows are rejected.  Returns the
+        number of rows inserted."""
+        statement = _INSERTS[table]
+        cursor = self.connect.cursor()
+        cursor.execute('BEGIN')
+        try:
+            try:
+                cursor.execute('SAVEPOINT import_batch')
+                cursor.executemany(statement, [values for _, values in batch])
+                cursor.execute('RELEASE import_batch')
+                inserted = len(batch)
+            except sqlite3.IntegrityError:
+                cursor.execute('ROLLBACK TO import_batch')
+                cursor.execute('RELEASE import_batch')
+                inserted = 0
+                for row, values in batch:
+                    cursor.execute('SAVEPOINT import_row')
+                    try:
+                        cursor.execute(statement, values)
+                        cursor.execute('RELEASE import_row')
+                        inserted += 1
+                    except sqlite3.IntegrityError as e:
+                        cursor.execute('ROLLBACK TO import_row')
+                        cursor.execute('RELEASE import_row')
+                        rejects.write(fieldnames, row, f'Database error: {e}')
+            self.connect.commit()
+            return inserted
+        except sqlite3.Error:
+            self.connect.rollback()
+            raise
+
+    def _report_progress(self, table: str, rows_read: int, imported: int,
+                         rejected: int) -> ImportProgressEvent:
+        """Calls the progress callback, if any, and returns the matching progress event"""
+        if self.progress:
+            self.progress(table, rows_read, imported, rejected)
+        return ImportProgressEvent(table, rows_read, imported, rejected)
+
+    def _row_converter(self, table: str):
+        """Returns a function that turns one CSV row into the values to insert into the
+        given table, or into the reason the row is rejected"""
+        if table == 'continent':
+            return _continent_values
+        continent_ids = self._code_map('continent')
+        if table == 'country':
+            return lambda row: _country_values(row, continent_ids)
+        country_ids = self._code_map('country')
+        return lambda row: _region_values(row, continent_ids, country_ids)
+
+    def _code_map(self, table: str) -> dict:
+        """Maps each code in a table to its id"""
+        cursor = self.connect.execute(f'SELECT {table}_code, {table}_id FROM {table}')
+        return dict(cursor.fetchall())
+
+
+class _RejectFile:
+    """A CSV file of rejected rows, which is only created once there is a row to write.
+    Any reject file left by an earlier import is removed when this one starts, so that
+    it never seems to belong to an import that rejected nothing."""
+    def __init__(self, path: Path):
+        """Initializes the reject file without creating it"""
+        self.path = path
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    def __enter__(self):
+        self.path.unlink(missing_ok=True)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._file:
+            self._file.close()
+
+    def write(self, fieldnames: list, row: dict, reason: str):
+        """Writes a rejected row, followed by the reason it was rejected"""
+        if self._writer is None:
+            self._file = open(self.path, 'w', newline='', encoding='utf-8')
+            self._writer = csv.DictWriter(self._file, fieldnames=[*fieldnames, 'reason'],
+                                          extrasaction='ignore')
+            self._writer.writeheader()
+        self._writer.writerow({**row, 'reason': reason})
+        self.count += 1
+
+
+def _continent_values(row: dict) -> tuple|str:
+    """Converts a row of a continents CSV file (id, code, name)"""
+    record_id = _optional_id(row)
+    code = _text(row, 'code')
+    name = _text(row, 'name')
+    invalid = validate_new_continent(code) or _missing_name(name)
+    if isinstance(record_id, str) or invalid:
+        return invalid or record_id
+    return record_id, code, name
+
+
+def _country_values(row: dict, continent_ids: dict) -> tuple|str:
+    """Converts a row of an OurAirports countries.csv file"""
+    record_id = _optional_id(row)
+    code = _text(row, 'code')
+    name = _text(row, 'name')
+    wikipedia_link = _text(row, 'wikipedia_link')
+    invalid = validate_new_country(code, wikipedia_link) or _missing_name(name)
+    if isinstance(record_id, str) or invalid:
+        return invalid or record_id
+    continent_id = continent_ids.get(_text(row, 'continent'))
+    if continent_id is None:
+        return f'Unknown continent {_text(row, "continent")!r}'
+    return record_id, code, name, continent_id, wikipedia_link, _text(row, 'keywords')
+
+
+def _region_values(row: dict, continent_ids: dict, country_ids: dict) -> tuple|str:
+    """Converts a row of an OurAirports regions.csv file"""
+    record_id = _optional_id(row)
+    code = _text(row, 'code')
+    local_code = _text(row, 'local_code')
+    name = _text(row, 'name')
+    invalid = validate_new_region(code, local_code) or _missing_name(name)
+    if isinstance(record_id, str) or invalid:
+        return invalid or record_id
+    continent_id = continent_ids.get(_text(row, 'continent'))
+    if continent_id is None:
+        return f'Unknown continent {_text(row, "continent")!r}'
+    country_id = country_ids.get(_text(row, 'iso_country'))
+    if country_id is None:
+        return f'Unknown country {_text(row, "iso_country")!r}'
+    return (record_id, code, local_code, name, continent_id, country_id,
+            _text(row, 'wikipedia_link'), _text(row, 'keywords'))
+
+
+def _text(row: dict, column: str) -> str | None:
+    """Returns a column's value with surrounding whitespace removed, or None if it is empty"""
+    value = (row.get(column) or '').strip()
+    return value if value else None
+
+
+def _optional_id(row: dict) -> int | None | str:
+    """Returns the row's id, None if it has none, or the reason it is invalid"""
+    value = _text(row, 'id')
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return f'Invalid id {value!r}'
+
+
+def _missing_name(name: str | None) -> str | None:
+    """Rejects rows without a name"""
+    return None if name else 'Missing name'
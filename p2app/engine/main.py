@@ -8,10 +8,30 @@
 # This is the outermost layer of the part of the program that you'll need to build,
 # which means that YOU WILL DEFINITELY NEED TO MAKE CHANGES TO THIS FILE.
 
+from pathlib import Path
+from p2app.events import *
+from .airport import AirportsEvents
 from .application import ApplicationEvents
-from .continent import ContinentsEventsrt
+from .cache import DEFAULT_CACHE_SIZE
+from .continent import ContinentsEvents
 from .country import CountriesEvents
+from .distances import DistanceEvents
+from .exporter import ExportEvents
+from .importer import DEFAULT_BATCH_SIZE, ImportEvents
+from .maintenance import MaintenanceEvents
+from .navaid import NavaidsEvents
+from .paging import DEFAULT_CHUNK_SIZE
+from .profiles import DEFAULT_PROFILE
+from .references import ReferenceIds
 from .region import RegionsEvents
+from .session import EditSession, SessionEvents
+from .tracing import DEFAULT_SLOW_QUERY_MS, SqlTracer
+
+# Events that manage transactions of their own, or close the connection, which would
+# commit, break, or silently discard an open edit session, so they are refused until
+# the session is committed or rolled back.
+_OUTSIDE_SESSION_EVENTS = (CloseDatabaseEvent, QuitInitiatedEvent, SaveWorkingCopyEvent,
+                           OptimizeDatabaseEvent, ImportCsvEvent)
 
 class Engine:
     """An object that represents the application's engine, whose main role is to
@@ -20,32 +40,146 @@ class Engine:
     unaware of any details of how the engine is implemented.
     """
 
-    def __init__(self):
-        """Initializes the engine"""
-        self.app_engine = ApplicationEvents()
-        self.app_events = ['QuitInitiatedEvent', 'OpenDatabaseEvent', 'CloseDatabaseEvent']
-        self.continent_event = ['StartContinentSearchEvent', 'LoadContinentEvent', 'SaveNewContinentEvent',
-                                'SaveContinentEvent']
-        self.country_event = ['StartCountrySearchEvent', 'LoadCountryEvent', 'SaveNewCountryEvent',
-                              'SaveCountryEvent']
-        self.region_event = ['StartRegionSearchEvent', 'LoadRegionEvent', 'SaveNewRegionEvent',
-                             'SaveRegionEvent']
+    def __init__(self, profile: str = DEFAULT_PROFILE, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 batch_results: bool = True, cache_size: int = DEFAULT_CACHE_SIZE,
+                 copy_progress=None, import_batch_size: int = DEFAULT_BATCH_SIZE,
+                 import_progress=None, slow_query_ms: float = DEFAULT_SLOW_QUERY_MS,
+                 slow_query_log: Path | None = None):
+        """Initializes the engine, which tunes each database it opens with the given
+        connection profile unless the OpenDatabaseEvent names another one, and fetches
+        search results from SQLite chunk_size rows at a time.  Each chunk is sent back
+        as one batch event, or as one event per row if batch_results is False.  Up to
+        cache_size loaded records of each kind are kept in memory, and copy_progress is
+        called while an in-memory working copy is copied to or from its file.  CSV
+        imports insert import_batch_size rows per transaction, calling import_progress
+        after each one.  While SQL tracing is turned on, statements taking at least
+        slow_query_ms are written to slow_query_log, which defaults to a file next to
+        the database."""
+        self.app_engine = ApplicationEvents(profile, copy_progress)
+        self.chunk_size = chunk_size
+        self.batch_results = batch_results
+        self.cache_size = cache_size
+        self.import_batch_size = import_batch_size
+        self.import_progress = import_progress
+        self._connection = None
+        self._processors = []
+        self._handlers = {}
+        self._session = None
+        self._sql_trace = False
+        self.slow_query_ms = slow_query_ms
+        self.slow_query_log = slow_query_log
+        self._tracer = None
+        self._bind_processors(None)
 
     def process_event(self, event):
         """A generator function that processes one event sent from the user interface,
         yielding zero or more events in response."""
+        handler = self._handlers.get(type(event))
+        if handler is None:
+            yield ErrorEvent(self._unhandled_reason(event))
+            return
+        if self._session and self._session.is_open and isinstance(event, _OUTSIDE_SESSION_EVENTS):
+            yield ErrorEvent(f'Cannot process {type(event).__name__}: commit or roll back the '
+                             'open edit session first')
+            return
+        yield from handler(event)
+
+    def _process_application(self, event):
+        """Handles an application-level event, rebinding the processors as soon as the
+        database connection is opened or closed"""
+        for result_event in self.app_engine.process_application(event):
+            if self.app_engine.connect is not self._connection:
+                self._bind_processors(self.app_engine.connect)
+            yield result_event
+
+    def _bind_processors(self, connection):
+        """Creates the processors for a newly opened (or closed) connection and rebuilds
+        the table mapping each event type to the bound method that handles it"""
+        self._connection = connection
+        self._handlers = {
+            QuitInitiatedEvent: self._process_application,
+            OpenDatabaseEvent: self._process_application,
+            CloseDatabaseEvent: self._process_application,
+            SaveWorkingCopyEvent: self._process_application,
+            EnableSqlTraceEvent: self._enable_sql_trace,
+            DisableSqlTraceEvent: self._disable_sql_trace
+        }
+        self._tracer = None
+        if connection is not None and self._sql_trace:
+            self._start_tracer()
+        if connection is None:
+            self._processors = []
+            self._session = None
+        else:
+            self._session = EditSession(connection)
+            references = ReferenceIds(connection)
+            records = [
+                ContinentsEvents(connection, self.chunk_size, self.batch_results, self.cache_size,
+                                 self._session, references),
+                CountriesEvents(connection, self.chunk_size, self.batch_results, self.cache_size,
+                                self._session, references),
+                RegionsEvents(connection, self.chunk_size, self.batch_results, self.cache_size,
+                              self._session, references),
+                AirportsEvents(connection, self.chunk_size, self.batch_results, self.cache_size)]
+            self._processors = [
+                *records,
+                SessionEvents(self._session, records, references),
+                MaintenanceEvents(connection, records),
+                ExportEvents(connection, records, self.chunk_size),
+                DistanceEvents(connection, self.chunk_size),
+                NavaidsEvents(connection, self.chunk_size, self.batch_results),
+                ImportEvents(connection, self.import_batch_size, self.import_progress, references)]
+            self._handlers[ReportCacheStatsEvent] = self._report_cache_stats
+        for processor in self._processors:
+            self._handlers.update(processor.event_handlers())
+
+    def _report_cache_stats(self, event):
+        """Reports the hit and miss counters of each processor's record cache"""
+        stats = {}
+        for processor in self._processors:
+            if hasattr(processor, 'cache'):
+                stats[processor.TABLE] = processor.cache.stats()
+        yield CacheStatsEvent(stats)
+
+    def _enable_sql_trace(self, event: EnableSqlTraceEvent):
+        """Turns on SQL tracing, now for the open database and later for any database
+        that is opened, optionally with a new slow-query threshold"""
+        if event.threshold_ms() is not None:
+            self.slow_query_ms = event.threshold_ms()
+        self._sql_trace = True
+        if self._tracer:
+            self._tracer.disable()
+        if self._connection is not None:
+            self._start_tracer()
+        yield self._sql_trace_changed()
+
+    def _disable_sql_trace(self, event: DisableSqlTraceEvent):
+        """Turns off SQL tracing"""
+        self._sql_trace = False
+        if self._tracer:
+            self._tracer.disable()
+            self._tracer = None
+        yield self._sql_trace_changed()
+
+    def _start_tracer(self):
+        self._tracer = SqlTracer(self._connection, self.slow_query_ms, self._slow_query_log_path())
+        self._tracer.enable()
+
+    def _slow_query_log_path(self) -> Path | None:
+        """Returns where slow queries are logged: the configured file, or one named
+        after the open database"""
+        if self.slow_query_log is not None:
+            return Path(self.slow_query_log)
+        if self.app_engine.path is None:
+            return None
+        return Path(self.app_engine.path).with_suffix('.slow-queries.log')
+
+    def _sql_trace_changed(self) -> SqlTraceChangedEvent:
+        return SqlTraceChangedEvent(self._sql_trace, self.slow_query_ms,
+                                    self._tracer.slow_log_path if self._tracer else None)
 
-        # This is a way to write a generator function that always yields zero values.
-        # You'll want to remove this and replace it with your own code, once you start
-        # writing your engine, but this at least allows the program to run.
-        if event.__class__.__name__ in self.app_events:
-            yield from self.app_engine.process_application(event)
-        elif event.__class__.__name__ in self.continent_event:
-            continent_engine = ContinentsEvents(self.app_engine.connect)
-            yield from continent_engine.process_continents_events(event)
-        elif event.__class__.__name__ in self.country_event:
-            country_engine = CountriesEvents(self.app_engine.connect)
-            yield from country_engine.process_countries_events(event)
-        elif event.__class__.__name__ in self.region_event:
-            region_engine = RegionsEvents(self.app_engine.connect)
-            yield from region_engine.process_regions_event(event)
+    def _unhandled_reason(self, event) -> str:
+        """Explains why an event has no handler"""
+        if self._connection is None:
+            return f'Cannot process {type(event).__name__}: no database is open'
+        return f'Cannot process {type(event).__name__}: unsupported event'
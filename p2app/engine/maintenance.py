@@ -0,0 +1,114 @@
+from p2app.events import *
+import sqlite3
+from datetime import datetime, timezone
+from itertools import combinations
+from .paging import search_query
+
+# The secondary indexes that the engine's searches and loads rely on, as
+# (index name, table, columns).  Indexes over tables that are not in the database
+# are skipped.
+RECOMMENDED_INDEXES = [
+    ('region_local_code_idx', 'region', ['local_code']),
+    ('region_name_idx', 'region', ['name']),
+    ('region_country_id_idx', 'region', ['country_id']),
+    ('country_name_idx', 'country', ['name']),
+    ('airport_region_id_idx', 'airport', ['region_id']),
+    ('airport_country_id_idx', 'airport', ['country_id']),
+    ('airport_iata_code_idx', 'airport', ['iata_code']),
+    ('airport_gps_code_idx', 'airport', ['gps_code']),
+    ('airport_name_idx', 'airport', ['name']),
+    ('runway_airport_id_idx', 'runway', ['airport_id']),
+    ('navigation_aid_type_frequency_idx', 'navigation_aid', ['type', 'frequency_khz'])
+]
+
+_LOG_TABLE = """
+CREATE TABLE IF NOT EXISTS index_advisor_log (
+    index_advisor_log_id INTEGER NOT NULL PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    index_name TEXT NOT NULL,
+    statement TEXT NOT NULL
+) STRICT
+"""
+
+class MaintenanceEvents:
+    """The processing of database maintenance events by the engine"""
+    def __init__(self, connection, processors: list):
+        """Initializes the processor, which examines the statements used by the given
+        processors"""
+        self.connect = connection
+        self.processors = processors
+
+    def event_handlers(self) -> dict:
+        """Maps each maintenance event type to the method that handles it"""
+        return {
+            OptimizeDatabaseEvent: self.process_optimize
+        }
+
+    def process_optimize(self, event: OptimizeDatabaseEvent):
+        """Reports the query plan of each of the engine's statements, creating the
+        recommended indexes first if asked to"""
+        try:
+            scans_before = [label for label, plan in self.explain_all() if is_scan(plan)]
+            created = self.create_recommended_indexes() if event.create_indexes() else []
+            scans_after = []
+            for label, plan in self.explain_all():
+                if is_scan(plan):
+                    scans_after.append(label)
+                yield QueryPlanEvent(label, plan, is_scan(plan))
+            yield DatabaseOptimizedEvent(created, scans_before, scans_after)
+        except sqlite3.Error as e:
+            if self.connect.in_transaction:
+                self.connect.rollback()
+            yield ErrorEvent(f'Database error: {e}')
+
+    def engine_statements(self):
+        """Generates a label and the SQL of every search (by each combination of its
+        fields) and load statement that the processors run"""
+        for processor in self.processors:
+            table = processor.TABLE
+            columns = processor.SEARCH_COLUMNS
+            for size in range(1, len(columns) + 1):
+                for fields in combinations(columns, size):
+                    query, _ = search_query(processor.SEARCH_SELECT, dict.fromkeys(fields, ''),
+                                            processor.ID_COLUMN)
+                    yield f'search {table} by {", ".join(fields)}', query
+            yield f'load {table} by id', processor.LOAD_QUERY
+
+    def explain_all(self) -> list[tuple[str, list[str]]]:
+        """Runs EXPLAIN QUERY PLAN on every engine statement"""
+        return [(label, self.explain(query)) for label, query in self.engine_statements()]
+
+    def explain(self, query: str) -> list[str]:
+        """Returns the steps of the query plan that SQLite chooses for a statement"""
+        parameters = (None,) * query.count('?')
+        cursor = self.connect.execute(f'EXPLAIN QUERY PLAN {query}', parameters)
+        return [row[3] for row in cursor.fetchall()]
+
+    def create_recommended_indexes(self) -> list[str]:
+        """Creates whichever recommended indexes do not exist yet, recording each one
+        in the index_advisor_log table, and returns their names"""
+        cursor = self.connect.cursor()
+        created = []
+        cursor.execute(_LOG_TABLE)
+        for index_name, table, columns in RECOMMENDED_INDEXES:
+            cursor.execute("SELECT type, name FROM sqlite_master WHERE name IN (?, ?)",
+                           (table, index_name))
+            existing = {row[0] for row in cursor.fetchall()}
+            if 'table' not in existing or 'index' in existing:
+                continue
+            statement = f'CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({", ".join(columns)})'
+            cursor.execute(statement)
+            cursor.execute("""
+            INSERT INTO index_advisor_log (created_at, index_name, statement)
+            VALUES (?, ?, ?)
+            """, (datetime.now(timezone.utc).isoformat(), index_name, statement))
+            created.append(index_name)
+        self.connect.commit()
+        if created:
+            cursor.execute('PRAGMA optimize')
+        return created
+
+
+def is_scan(plan: list[str]) -> bool:
+    """Checks whether a query plan reads a whole table rather than seeking an index"""
+    return any(step.startswith('SCAN') and 'VIRTUAL TABLE' not in step for step in plan)
@@ -0,0 +1,210 @@
+from p2app.events import *
+import sqlite3
+from . import spatial
+from .geo import bounding_box, great_circle_km
+from .profiles import is_query_only
+from .paging import DEFAULT_CHUNK_SIZE, fetch_chunks
+
+# The composite index that searches by type and frequency band seek into, created
+# the first time navigation aids are searched.
+TYPE_FREQUENCY_INDEX = """
+CREATE INDEX IF NOT EXISTS navigation_aid_type_frequency_idx
+ON navigation_aid (type, frequency_khz)
+"""
+
+class NavaidsEvents:
+    """The processing of navigation-aid events by the engine"""
+
+    TABLE = 'navigation_aid'
+    ID_COLUMN = 'navigation_aid_id'
+    QUALIFIED_COLUMNS = """
+    t.navigation_aid_id, t.filename, t.ident, t.name, t.type, t.frequency_khz, t.latitude_deg,
+    t.longitude_deg, t.elevation_ft, t.iso_country, t.dme_frequency_khz, t.dme_channel,
+    t.dme_latitude_deg, t.dme_longitude_deg, t.dme_elevation_ft, t.adjusted_variation_deg,
+    t.magnetic_variation_deg, t.usage_type, t.power, t.airport_id
+    """
+    AIRPORT_LOCATION_QUERY = """
+    SELECT latitude_deg, longitude_deg
+    FROM airport
+    WHERE airport_id = ?
+    """
+
+    def __init__(self, connection, chunk_size: int = DEFAULT_CHUNK_SIZE, batch_results: bool = True):
+        self.connect = connection
+        self.chunk_size = chunk_size
+        self.batch_results = batch_results
+        self._has_index = False
+
+    def event_handlers(self) -> dict:
+        """Maps each navigation-aid event type to the method that handles it"""
+        return {
+            StartNavaidSearchEvent: self.process_search
+        }
+
+    def process_search(self, event: StartNavaidSearchEvent):
+        """Handles a search for navigation aids of a type, within a band of frequencies,
+        and within radius_km of a point or an airport, where each criterion is optional.
+        Those near a point are sent back nearest first along with their distances;
+        the others are streamed by type and frequency as they are fetched."""
+        invalid = validate_navaid_search(event)
+        if invalid:
+            yield ErrorEvent(invalid)
+            return
+        if event.radius_km() is None:
+            navaids_get = self.search_navaids(event.navaid_type(), event.min_frequency_khz(),
+                                              event.max_frequency_khz(), event.limit())
+            if isinstance(navaids_get, str):
+                yield ErrorEvent(navaids_get)
+                return
+            yield from self.stream_results(fetch_chunks(navaids_get, self.chunk_size))
+            return
+        center = self.search_center(event.latitude(), event.longitude(), event.airport_id())
+        if isinstance(center, str):
+            yield ErrorEvent(center)
+            return
+        nearby = self.search_navaids_near(event.navaid_type(), event.min_frequency_khz(),
+                                          event.max_frequency_khz(), center[0], center[1],
+                                          event.radius_km(), event.limit())
+        if isinstance(nearby, str):
+            yield ErrorEvent(nearby)
+            return
+        chunks = (nearby[start:start + self.chunk_size]
+                  for start in range(0, len(nearby), self.chunk_size))
+        yield from self.stream_results(chunks, with_distances=True)
+
+    def stream_results(self, chunks, with_distances: bool = False):
+        """Sends back chunks of rows, one batch event per chunk unless batching is
+        turned off.  With distances, each row is paired with its distance in km."""
+        found = False
+        try:
+            for rows in chunks:
+                found = True
+                if with_distances:
+                    navaids = [NavigationAid(*navaid) for navaid, _ in rows]
+                    distances = [distance for _, distance in rows]
+                else:
+                    navaids = [NavigationAid(*navaid) for navaid in rows]
+                    distances = None
+                if self.batch_results:
+                    yield NavaidSearchResultBatchEvent(navaids, distances)
+                else:
+                    for index, navaid_obj in enumerate(navaids):
+                        yield NavaidSearchResultEvent(navaid_obj,
+                                                      distances[index] if distances else None)
+        except sqlite3.Error as e:
+            yield ErrorEvent(f'Database error: {e}')
+            return
+        if not found:
+            yield ErrorEvent('No result matches')
+
+    def search_navaids(self, navaid_type: str | None, min_frequency_khz: int | None,
+                       max_frequency_khz: int | None, limit: int | None = None) -> sqlite3.Cursor|str:
+        """Queries the SQLite database for navigation aids of a type and within a band
+        of frequencies, seeking into the (type, frequency_khz) index, and returns the
+        executed cursor ordered by type and frequency"""
+        conditions, parameters = _band_conditions(navaid_type, min_frequency_khz, max_frequency_khz)
+        query = f'SELECT {self.QUALIFIED_COLUMNS} FROM navigation_aid AS t\n'
+        if conditions:
+            query += 'WHERE {}\n'.format(' AND '.join(conditions))
+        query += 'ORDER BY t.type, t.frequency_khz\n'
+        if limit is not None:
+            query += 'LIMIT ?\n'
+            parameters.append(limit)
+        try:
+            self.prepare_index()
+            return self.connect.execute(query, parameters)
+        except sqlite3.Error as e:
+            return f'Database error: {e}'
+
+    def search_navaids_near(self, navaid_type: str | None, min_frequency_khz: int | None,
+                            max_frequency_khz: int | None, latitude: float, longitude: float,
+                            radius_km: float, limit: int | None = None) -> list|str:
+        """Finds the navigation aids of a type and within a band of frequencies that lie
+        within radius_km of a point, returning (row, distance) pairs nearest first.
+        The spatial index narrows the search to the box around the circle, its
+        entries joined back to the table by rowid, and only the aids in that box are
+        measured.  If the index cannot be built, the box is found by scanning the table."""
+        conditions, parameters = _band_conditions(navaid_type, min_frequency_khz, max_frequency_khz)
+        min_latitude, min_longitude, max_latitude, max_longitude = \
+            bounding_box(latitude, longitude, radius_km)
+        try:
+            self.prepare_index()
+            indexed = spatial.build_index(self.connect, 'navigation_aid')
+            query, parameters = spatial.area_query(
+                'navigation_aid', self.QUALIFIED_COLUMNS, min_latitude, min_longitude,
+                max_latitude, max_longitude, conditions=conditions,
+                condition_parameters=tuple(parameters), indexed=indexed)
+            rows = self.connect.execute(query, parameters).fetchall()
+        except sqlite3.Error as e:
+            return f'Database error: {e}'
+        nearby = []
+        for row in rows:
+            distance = great_circle_km(latitude, longitude, row[6], row[7])
+            if distance <= radius_km:
+                nearby.append((row, distance))
+        nearby.sort(key=lambda pair: pair[1])
+        return nearby[:limit] if limit is not None else nearby
+
+    def search_center(self, latitude: float | None, longitude: float | None,
+                      airport_id: int | None) -> tuple|str:
+        """Returns the point a proximity search is centered on: the one given, or the
+        location of the given airport"""
+        if airport_id is None:
+            return latitude, longitude
+        try:
+            location = self.connect.execute(self.AIRPORT_LOCATION_QUERY, (airport_id,)).fetchone()
+        except sqlite3.Error as e:
+            return f'Database error: {e}'
+        if location is None:
+            return f'No airport with id {airport_id}'
+        return location
+
+    def prepare_index(self):
+        """Creates the (type, frequency_khz) index the first time it is needed, unless a
+        transaction is open or the connection may only query the database, in which
+        case the searches scan the table instead"""
+        if self._has_index or self.connect.in_transaction or is_query_only(self.connect):
+            return
+        self.connect.execute(TYPE_FREQUENCY_INDEX)
+        self._has_index = True
+
+def _band_conditions(navaid_type: str | None, min_frequency_khz: int | None,
+                     max_frequency_khz: int | None) -> tuple[list[str], list]:
+    """Builds the conditions matching a type and a band of frequencies, ignoring any
+    that are None"""
+    conditions = []
+    parameters = []
+    if navaid_type is not None:
+        conditions.append('t.type = ?')
+        parameters.append(navaid_type)
+    if min_frequency_khz is not None:
+        conditions.append('t.frequency_khz >= ?')
+        parameters.append(min_frequency_khz)
+    if max_frequency_khz is not None:
+        conditions.append('t.frequency_khz <= ?')
+        parameters.append(max_frequency_khz)
+    return conditions, parameters
+
+def validate_navaid_search(event: StartNavaidSearchEvent) -> str | None:
+    """Checks the criteria of a navigation-aid search, returning the reason they are
+    invalid, or None if they are valid"""
+    min_frequency = event.min_frequency_khz()
+    max_frequency = event.max_frequency_khz()
+    if min_frequency is not None and max_frequency is not None and min_frequency > max_frequency:
+        return 'Invalid search: the lowest frequency is above the highest'
+    has_point = event.latitude() is not None or event.longitude() is not None
+    has_airport = event.airport_id() is not None
+    if event.radius_km() is None:
+        if has_point or has_airport:
+            return 'Invalid search: give a radius to search near a point or airport'
+        return None
+    if not isinstance(event.radius_km(), (int, float)) or event.radius_km() <= 0:
+        return 'Invalid search: the radius must be a positive number of kilometers'
+    if has_point == has_airport:
+        return 'Invalid search: give either a point or an airport to search near'
+    if has_point:
+        if event.latitude() is None or event.longitude() is None:
+            return 'Invalid search: give both a latitude and a longitude'
+        if not (-90 <= event.latitude() <= 90 and -180 <= event.longitude() <= 180):
+            return 'Invalid search: latitude or longitude out of range'
+    return None
@@ -0,0 +1,43 @@
+import sqlite3
+
+DEFAULT_CHUNK_SIZE = 256
+
+
+def search_query(select: str, criteria: dict, id_column: str, limit: int | None = None,
+                 after_id: int | None = None) -> tuple[str, tuple]:
+    """Builds a keyset-paginated search from a SELECT ... FROM clause, matching each
+    column in criteria whose value is not None and returning rows in id order"""
+    conditions = []
+    parameters = []
+    for column, data in criteria.items():
+        if data is not None:
+            conditions.append(f'{column} = ?')
+            parameters.append(data)
+    if after_id is not None:
+        conditions.append(f'{id_column} > ?')
+        parameters.append(after_id)
+    query = select
+    if conditions:
+        query += '\nWHERE {}'.format(' AND '.join(conditions))
+    query += f'\nORDER BY {id_column}'
+    if limit is not None:
+        query += '\nLIMIT ?'
+        parameters.append(limit)
+    return query, tuple(parameters)
+
+
+def fetch_chunks(cursor: sqlite3.Cursor, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Yields the rows of an executed cursor as lists of at most chunk_size rows, so
+    that a broad query is never materialized all at once"""
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield rows
+
+
+def fetch_in_chunks(cursor: sqlite3.Cursor, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Yields the rows of an executed cursor one at a time, fetching them from SQLite
+    chunk_size rows at a time"""
+    for rows in fetch_chunks(cursor, chunk_size):
+        yield from rows
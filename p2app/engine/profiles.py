@@ -0,0 +1,58 @@
+import sqlite3
+
+# Each profile is applied once, right after the database is opened, so that the
+# individual queries never have to issue PRAGMA statements of their own.  Negative
+# cache sizes are in KiB, as documented for PRAGMA cache_size.  A setting of None
+# is only read back, never changed; the read-only profile leaves the journal mode
+# alone, since switching it would rewrite the database header and create -wal and
+# -shm files beside a database that is meant not to be written at all.
+PROFILES = {
+    'interactive': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -16384,
+        'mmap_size': 67108864,
+        'temp_store': 'MEMORY',
+        'foreign_keys': 'ON'
+    },
+    'bulk-load': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'cache_size': -262144,
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+        'foreign_keys': 'ON'
+    },
+    'read-only analytics': {
+        'journal_mode': None,
+        'cache_size': -524288,
+        'mmap_size': 1073741824,
+        'temp_store': 'MEMORY',
+        'foreign_keys': 'OFF',
+        'query_only': 'ON'
+    }
+}
+
+DEFAULT_PROFILE = 'interactive'
+
+
+def apply_profile(connection: sqlite3.Connection, profile: str) -> dict:
+    """Applies the named PRAGMA profile to an open connection and returns the
+    settings that are actually in effect afterward"""
+    cursor = connection.cursor()
+    effective = {}
+    for pragma, value in PROFILES[profile].items():
+        if value is not None:
+            cursor.execute(f'PRAGMA {pragma} = {value}')
+        cursor.execute(f'PRAGMA {pragma}')
+        row = cursor.fetchone()
+        effective[pragma] = row[0] if row else None
+    cursor.close()
+    return effective
+
+
+def is_query_only(connection: sqlite3.Connection) -> bool:
+    """Checks whether the connection may only query the database, as under the
+    read-only analytics profile, in which case no index, summary, or temporary table
+    can be built on it"""
+    return bool(connection.execute('PRAGMA query_only').fetchone()[0])
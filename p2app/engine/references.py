@@ -0,0 +1,52 @@
+import sqlite3
+
+
+class ReferenceIds:
+    """The sets of continent and country ids that records may refer to, kept in memory
+    so that a save with a dangling reference is rejected before any write starts.
+    The engine's own inserts are added as they happen; changes committed by other
+    connections are noticed through PRAGMA data_version and cause a reload."""
+    def __init__(self, connection):
+        """Initializes the sets and loads them from the database"""
+        self.connect = connection
+        self.continent_ids = set()
+        self.country_ids = set()
+        self._data_version = None
+        self.reload()
+
+    def reload(self):
+        """Reloads both sets from the database"""
+        self._data_version = self._current_data_version()
+        self.continent_ids = {row[0] for row in self.connect.execute(
+            'SELECT continent_id FROM continent')}
+        self.country_ids = {row[0] for row in self.connect.execute(
+            'SELECT country_id FROM country')}
+
+    def refresh(self):
+        """Reloads the sets if another connection has committed since they were loaded"""
+        if self._current_data_version() != self._data_version:
+            self.reload()
+
+    def add(self, table: str, record_id: int):
+        """Records an id that the engine itself has just inserted"""
+        if table == 'continent':
+            self.continent_ids.add(record_id)
+        elif table == 'country':
+            self.country_ids.add(record_id)
+
+    def missing(self, continent_id: int | None = None, country_id: int | None = None) -> str | None:
+        """Checks the given references, ignoring any that are None, and returns a
+        description of the first one that does not exist, or None if they all do"""
+        try:
+            self.refresh()
+        except sqlite3.Error:
+            return None
+        if continent_id is not None and continent_id not in self.continent_ids:
+            return f'No continent with id {continent_id}'
+        if country_id is not None and country_id not in self.country_ids:
+            return f'No country with id {country_id}'
+        return None
+
+    def _current_data_version(self) -> int:
+        """Returns the counter SQLite bumps whenever another connection commits"""
+        return self.connect.execute('PRAGMA data_version').fetchone()[0]
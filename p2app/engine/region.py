@@ -1,145 +1,225 @@
 from p2app.events import *
 import sqlite3
+from . import fulltext
+from .cache import DEFAULT_CACHE_SIZE, RecordCache
+from .paging import DEFAULT_CHUNK_SIZE, search_query, fetch_chunks
+from .references import ReferenceIds
+from .saving import insert_query, update_query
+from .session import EditSession
 
 class RegionsEvents:
     """The processing of region-related events by the engine"""
-    def __init__(self, connection):
-        """Initializes the processor"""
+
+    TABLE = 'region'
+    ID_COLUMN = 'region_id'
+    RECORD_COLUMNS = ['region_id', 'region_code', 'local_code', 'name', 'continent_id', 'country_id',
+                      'wikipedia_link', 'keywords']
+    SEARCH_COLUMNS = ['region_code', 'local_code', 'name']
+    SEARCH_SELECT = """
+    SELECT region_id, region_code, local_code, name, continent_id, country_id, wikipedia_link,
+    keywords
+    FROM region
+    """
+    LOAD_QUERY = """
+    SELECT region_id, region_code, local_code, name, continent_id, country_id, wikipedia_link,
+    keywords
+    FROM region
+    WHERE region_id = ?
+    """
+
+    def __init__(self, connection, chunk_size: int = DEFAULT_CHUNK_SIZE, batch_results: bool = True,
+                 cache_size: int = DEFAULT_CACHE_SIZE, session: EditSession | None = None,
+                 references: ReferenceIds | None = None):
+        """Initializes the processor, whose saves join the given edit session and check
+        their continent and country ids against the given reference sets"""
         self.connect = connection
+        self.chunk_size = chunk_size
+        self.batch_results = batch_results
+        self.cache = RecordCache(cache_size)
+        self.session = session or EditSession(connection)
+        self.references = references or ReferenceIds(connection)
+
+    def event_handlers(self) -> dict:
+        """Maps each region-related event type to the method that handles it"""
+        return {
+            StartRegionSearchEvent: self.process_search,
+            StartRegionTextSearchEvent: self.process_text_search,
+            LoadRegionEvent: self.process_load,
+            SaveNewRegionEvent: self.process_save_new,
+            SaveRegionEvent: self.process_save
+        }
+
+    def process_search(self, event: StartRegionSearchEvent):
+        """Handles a region search sent by the region view, streaming the matches
+        as they are fetched, one batch event per chunk unless batching is turned off"""
+        regions_get = self.search_regions(event.region_code(), event.local_code(), event.name(),
+                                          event.limit(), event.after_id())
+        if isinstance(regions_get, str):
+            yield ErrorEvent(regions_get)
+            return
+        found = False
+        try:
+            for rows in fetch_chunks(regions_get, self.chunk_size):
+                found = True
+                regions = [Region(*region) for region in rows]
+                if self.batch_results:
+                    yield RegionSearchResultBatchEvent(regions)
+                else:
+                    for region_obj in regions:
+                        yield RegionSearchResultEvent(region_obj)
+        except sqlite3.Error as e:
+            yield ErrorEvent(f'Database error: {e}')
+            return
+        if not found and event.after_id() is None:
+            yield ErrorEvent('No result matches')
 
-    def process_regions_event(self, event):
-        """Handles the events that will be sent in the region view
-        when receiving particular event call"""
-        if isinstance(event, StartRegionSearchEvent):
-            regions_get = self.search_regions(event.region_code(), event.local_code(), event.name())
-            if isinstance(regions_get, list):
-                for region in regions_get:
-                    region_obj = Region(*region)
-                    yield RegionSearchResultEvent(region_obj)
-            else:
-                yield ErrorEvent(regions_get)
-        elif isinstance(event, LoadRegionEvent):
-            region_loaded = self.load_region(event.region_id())
-            if isinstance(region_loaded, tuple):
-                region_load_obj = Region(*region_loaded)
-                yield RegionLoadedEvent(region_load_obj)
-            else:
-                yield ErrorEvent(region_loaded)
-        elif isinstance(event, SaveNewRegionEvent):
-            region_added = self.save_new_region(event.region().region_code, event.region().local_code,
-                                                event.region().name, event.region().continent_id,
-                                                event.region().country_id, event.region().wikipedia_link,
-                                                event.region().keywords)
-            if isinstance(region_added, tuple):
-                region_added_obj = Region(*region_added)
-                yield RegionSavedEvent(region_added_obj)
-            else:
-                yield SaveRegionFailedEvent(region_added)
-        elif isinstance(event, SaveRegionEvent):
-            loaded_region = self.load_region(event.region().region_id)
-            loaded_region_obj = Region(*loaded_region)
-            region_edit = self.edit_region(loaded_region_obj.region_code, event.region().region_code,
-                                           event.region().local_code,event.region().name,
-                                           event.region().continent_id,event.region().country_id,
-                                           event.region().wikipedia_link,event.region().keywords)
-            if isinstance(region_edit, tuple):
-                region_edit_obj = Region(*region_edit)
-                yield RegionSavedEvent(region_edit_obj)
-            else:
-                yield SaveRegionFailedEvent(region_edit)
+    def process_text_search(self, event: StartRegionTextSearchEvent):
+        """Handles a search by words or word prefixes in the names and keywords, with
+        the best matches sent first"""
+        regions_get = self.text_search_regions(event.text(), event.limit())
+        if isinstance(regions_get, str):
+            yield ErrorEvent(regions_get)
+            return
+        found = False
+        try:
+            for rows in fetch_chunks(regions_get, self.chunk_size):
+                found = True
+                regions = [Region(*region) for region in rows]
+                if self.batch_results:
+                    yield RegionSearchResultBatchEvent(regions)
+                else:
+                    for region_obj in regions:
+                        yield RegionSearchResultEvent(region_obj)
+        except sqlite3.Error as e:
+            yield ErrorEvent(f'Database error: {e}')
+            return
+        if not found:
+            yield ErrorEvent('No result matches')
+
+    def process_load(self, event: LoadRegionEvent):
+        """Handles a request to load one region for editing"""
+        region_loaded = self.load_region(event.region_id())
+        if isinstance(region_loaded, tuple):
+            region_load_obj = Region(*region_loaded)
+            yield RegionLoadedEvent(region_load_obj)
+        else:
+            yield ErrorEvent(region_loaded)
 
-    def search_regions(self, region_code: str, local_code: str, name: str) ->list|str:
-        """Queries the SQLite database for regions based on code, local code, and name"""
+    def process_save_new(self, event: SaveNewRegionEvent):
+        """Handles a request to save a newly created region"""
+        region_added = self.save_new_region(event.region().region_code, event.region().local_code,
+                                            event.region().name, event.region().continent_id,
+                                            event.region().country_id, event.region().wikipedia_link,
+                                            event.region().keywords)
+        if isinstance(region_added, tuple):
+            self.cache.put(region_added[0], region_added)
+            region_added_obj = Region(*region_added)
+            yield RegionSavedEvent(region_added_obj)
+        else:
+            yield SaveRegionFailedEvent(region_added)
+
+    def process_save(self, event: SaveRegionEvent):
+        """Handles a request to save changes to an existing region"""
+        region_edit = self.edit_region(event.region().region_id, event.region().region_code,
+                                       event.region().local_code,event.region().name,
+                                       event.region().continent_id,event.region().country_id,
+                                       event.region().wikipedia_link,event.region().keywords)
+        if isinstance(region_edit, tuple):
+            self.cache.put(region_edit[0], region_edit)
+            region_edit_obj = Region(*region_edit)
+            yield RegionSavedEvent(region_edit_obj)
+        else:
+            self.cache.invalidate(event.region().region_id)
+            yield SaveRegionFailedEvent(region_edit)
+
+    def search_regions(self, region_code: str, local_code: str, name: str, limit: int | None = None,
+                       after_id: int | None = None) ->sqlite3.Cursor|str:
+        """Queries the SQLite database for regions based on code, local code, and name,
+        returning the executed cursor so the rows can be streamed"""
         cursor = self.connect.cursor()
-        # cursor.execute("PRAGMA foreign_keys = ON;")
         try:
-            data_searched = []
-            columns = []
-            data_combination = {
+            criteria = {
                 'region_code': region_code,
                 'local_code': local_code,
                 'name': name
             }
-            for column, data in data_combination.items():
-                if data is not None:
-                    data_searched.append(data)
-                    columns.append(f'{column} = ?')
-            query = """
-            SELECT region_id, region_code, local_code, name, continent_id, country_id, wikipedia_link, 
-            keywords 
-            FROM region 
-            WHERE {}
-            """.format(" AND ".join(columns))
-            cursor.execute(query, tuple(data_searched))
-            result = cursor.fetchall()
-            if not result:
-                return 'No result matches'
-            return result
+            query, parameters = search_query(self.SEARCH_SELECT, criteria, self.ID_COLUMN, limit,
+                                             after_id)
+            cursor.execute(query, parameters)
+            return cursor
+        except sqlite3.Error as e:
+            return f'Database error: {e}'
+
+    def text_search_regions(self, text: str, limit: int | None = None) -> sqlite3.Cursor|str:
+        """Queries the full-text index for regions whose name or keywords contain every
+        word of the text (or words beginning with them), building the index first if
+        it does not exist yet, and returns the executed cursor ordered by rank.  When the
+        index cannot be built, every row is scanned instead and the rows come in id
+        order."""
+        if fulltext.prefix_query(text or '') is None:
+            return 'No result matches'
+        try:
+            query, parameters = fulltext.text_query(self.connect, 'region', """
+            t.region_id, t.region_code, t.local_code, t.name, t.continent_id, t.country_id,
+            t.wikipedia_link, t.keywords
+            """, text, limit)
+            return self.connect.execute(query, parameters)
         except sqlite3.Error as e:
             return f'Database error: {e}'
 
     def load_region(self, region_id: int) ->tuple|str:
+        cached = self.cache.get(region_id)
+        if cached is not None:
+            return cached
         try:
             cursor = self.connect.cursor()
-            cursor.execute("PRAGMA foreign_keys = ON;")
-            query = """
-            SELECT region_id, region_code, local_code, name, continent_id, country_id, wikipedia_link, 
-            keywords
-            FROM region
-            WHERE region_id = ?
-            """
-            cursor.execute(query, (region_id, ))
+            cursor.execute(self.LOAD_QUERY, (region_id, ))
             result = cursor.fetchone()
+            if result is not None:
+                self.cache.put(region_id, result)
             return result
         except sqlite3.Error as e:
             return f'Database error: {e}'
 
     def save_new_region(self, region_code: str, local_code: str, name: str, continent_id: int,
                         country_id: int, wikipedia_link: str, keywords: str) ->tuple|str:
-        cursor = self.connect.cursor()
-        cursor.execute("PRAGMA foreign_keys = ON;")
         try:
-            if not (region_code[:2].isupper() and region_code[2] == "-"):
-                return 'Failed to save the new region information: Invalid region code'
-            if  region_code[3:] != local_code:
-                return ('Failed to save the new region information: Invalid local code(should match'
-                        ' the second part of the region code')
-            query  = """
-            INSERT INTO region (region_code, local_code, name, continent_id, 
-            country_id, wikipedia_link, keywords)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """
-            cursor.execute(query, (region_code, local_code, name, continent_id, country_id,
-                                   wikipedia_link, keywords))
-            self.connect.commit()
-            new_id = cursor.lastrowid
-            select_new = """
-            SELECT region_id, region_code, local_code, name, continent_id, country_id, wikipedia_link, 
-            keywords
-            FROM region
-            WHERE region_id = ?
-            """
-            cursor.execute(select_new, (new_id, ))
-            result = cursor.fetchone()
+            invalid = validate_new_region(region_code, local_code)
+            if invalid:
+                return invalid
+            missing = self.references.missing(continent_id, country_id)
+            if missing:
+                return f'Failed to save the new region information: {missing}'
+            query, parameters = insert_query(self.TABLE, {
+                'region_code': region_code,
+                'local_code': local_code,
+                'name': name,
+                'continent_id': continent_id,
+                'country_id': country_id,
+                'wikipedia_link': wikipedia_link,
+                'keywords': keywords
+            }, self.RECORD_COLUMNS)
+            with self.session.saving():
+                result = self.connect.execute(query, parameters).fetchone()
             return result
         except sqlite3.Error as e:
             return f'Database error: {e}'
 
-    def edit_region(self, region_code, new_region_code, new_local_code, new_name, new_continent_id,
+    def edit_region(self, region_id, new_region_code, new_local_code, new_name, new_continent_id,
                    new_country_id, new_wikipedia_link, new_keywords) ->tuple|str:
-        cursor = self.connect.cursor()
-        cursor.execute("PRAGMA foreign_keys = ON;")
         try:
             if new_region_code:
-                if not (new_region_code[:2].isupper() and new_region_code[2] == "-"):
+                if len(new_region_code) < 3 \
+                        or not (new_region_code[:2].isupper() and new_region_code[2] == "-"):
                     return 'Failed to update the region information: Invalid region code'
-            if new_local_code:
+            if new_local_code and new_region_code:
                 if new_local_code != new_region_code[3:]:
                     return ('Failed to update the local code: Invalid local code(should match the second'
                             'part of the region code')
-            data_changed = []
-            columns = []
-            changed_pair = {
+            missing = self.references.missing(new_continent_id, new_country_id)
+            if missing:
+                return f'Failed to update the region information: {missing}'
+            query, parameters = update_query(self.TABLE, self.ID_COLUMN, region_id, {
                 'region_code': new_region_code,
                 'local_code': new_local_code,
                 'name': new_name,
@@ -147,27 +227,22 @@ class RegionsEvents:
                 'country_id': new_country_id,
                 'wikipedia_link': new_wikipedia_link,
                 'keywords': new_keywords
-            }
-            for column, data in changed_pair.items():
-                if data is not None:
-                    columns.append(f'{column} = ?')
-                    data_changed.append(data)
-            data_changed.append(region_code)
-            query = """
-            UPDATE region
-            SET {}
-            WHERE region_code = ?  
-            """.format(",".join(columns))
-            cursor.execute(query, tuple(data_changed))
-            self.connect.commit()
-            select_new_query = """
-            SELECT region_id, region_code, local_code, name, continent_id, country_id, wikipedia_link, 
-            keywords 
-            FROM region
-            where region_code = ?
-            """
-            cursor.execute(select_new_query, (new_region_code or region_code,))
-            change = cursor.fetchone()
+            }, self.RECORD_COLUMNS)
+            with self.session.saving():
+                change = self.connect.execute(query, parameters).fetchone()
+            if change is None:
+                return f'Failed to update the region information: No region with id {region_id}'
             return change
-        except  sqlite3.Error as e:
+        except sqlite3.Error as e:
             return f'Database error: {e}'
+
+def validate_new_region(region_code: str, local_code: str) -> str | None:
+    """Checks a new region against the engine's rules, returning the reason it is
+    invalid, or None if it is valid"""
+    if not region_code or len(region_code) < 3 \
+            or not (region_code[:2].isupper() and region_code[2] == "-"):
+        return 'Failed to save the new region information: Invalid region code'
+    if region_code[3:] != local_code:
+        return ('Failed to save the new region information: Invalid local code(should match'
+                ' the second part of the region code')
+    return None
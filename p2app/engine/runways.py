@@ -0,0 +1,116 @@
+import json
+import sqlite3
+from .profiles import is_query_only
+from .scripts import run_script
+
+SUMMARY_TABLE = 'runway_summary'
+
+# One airport's summary, computed from its runways.  The surfaces are kept as a
+# sorted JSON array of the distinct surfaces named.  No row is produced for an
+# airport without runways.
+_SUMMARIZE = """
+SELECT airport_id, count(*), max(length_ft), max(width_ft), sum(lighted != 0), sum(closed = 0),
+       (SELECT json_group_array(surface) FROM (
+            SELECT DISTINCT surface FROM runway AS r
+            WHERE r.airport_id = runway.airport_id AND surface IS NOT NULL
+            ORDER BY surface))
+FROM runway
+{condition}
+GROUP BY airport_id
+"""
+
+
+def has_summary(connection: sqlite3.Connection) -> bool:
+    """Checks whether the runway summary table has been built"""
+    cursor = connection.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+                                (SUMMARY_TABLE,))
+    return cursor.fetchone() is not None
+
+
+def build_summary(connection: sqlite3.Connection) -> bool:
+    """Creates the table summarizing each airport's runways, fills it from the
+    existing runways, and adds triggers that keep it current as runways are
+    inserted, updated, and deleted, returning whether the table can be read.  It
+    cannot be built while a transaction is open or on a connection that may only
+    query the database; load_summary then computes each summary when it is asked for.
+
+    An insert updates its airport's row in place; an update or delete, which may
+    lower a maximum or remove a surface, recomputes the rows of the airports it
+    touches from their runways, which the index on runway.airport_id finds
+    directly."""
+    if has_summary(connection):
+        return True
+    if connection.in_transaction or is_query_only(connection):
+        return False
+    recompute_old = f"""
+        DELETE FROM {SUMMARY_TABLE} WHERE airport_id = old.airport_id;
+        INSERT INTO {SUMMARY_TABLE} {_SUMMARIZE.format(condition='WHERE airport_id = old.airport_id')};
+    """
+    recompute_new = f"""
+        DELETE FROM {SUMMARY_TABLE} WHERE airport_id = new.airport_id;
+        INSERT INTO {SUMMARY_TABLE} {_SUMMARIZE.format(condition='WHERE airport_id = new.airport_id')};
+    """
+    run_script(connection, f"""
+    BEGIN;
+    CREATE INDEX IF NOT EXISTS runway_airport_id_idx ON runway (airport_id);
+    CREATE TABLE {SUMMARY_TABLE} (
+        airport_id INTEGER NOT NULL PRIMARY KEY,
+        runway_count INTEGER NOT NULL,
+        longest_length_ft INTEGER NULL,
+        widest_width_ft INTEGER NULL,
+        lighted_count INTEGER NOT NULL,
+        open_count INTEGER NOT NULL,
+        surfaces TEXT NOT NULL
+    ) STRICT;
+    CREATE TRIGGER {SUMMARY_TABLE}_after_insert AFTER INSERT ON runway BEGIN
+        INSERT INTO {SUMMARY_TABLE}
+        VALUES (new.airport_id, 1, new.length_ft, new.width_ft, new.lighted != 0, new.closed = 0,
+                CASE WHEN new.surface IS NULL THEN '[]' ELSE json_array(new.surface) END)
+        ON CONFLICT (airport_id) DO UPDATE SET
+            runway_count = runway_count + 1,
+            longest_length_ft = max(coalesce(longest_length_ft, new.length_ft),
+                                    coalesce(new.length_ft, longest_length_ft)),
+            widest_width_ft = max(coalesce(widest_width_ft, new.width_ft),
+                                  coalesce(new.width_ft, widest_width_ft)),
+            lighted_count = lighted_count + (new.lighted != 0),
+            open_count = open_count + (new.closed = 0),
+            surfaces = CASE
+                WHEN new.surface IS NULL
+                     OR EXISTS (SELECT 1 FROM json_each(surfaces) WHERE value = new.surface)
+                THEN surfaces
+                ELSE (SELECT json_group_array(value) FROM (
+                          SELECT value FROM json_each(surfaces) UNION SELECT new.surface
+                          ORDER BY 1))
+            END;
+    END;
+    CREATE TRIGGER {SUMMARY_TABLE}_after_delete AFTER DELETE ON runway BEGIN
+        {recompute_old}
+    END;
+    CREATE TRIGGER {SUMMARY_TABLE}_after_update
+    AFTER UPDATE OF airport_id, length_ft, width_ft, surface, lighted, closed ON runway BEGIN
+        {recompute_old}
+        {recompute_new}
+    END;
+    INSERT INTO {SUMMARY_TABLE} {_SUMMARIZE.format(condition='')};
+    COMMIT;
+    """)
+    return True
+
+
+def load_summary(connection: sqlite3.Connection, airport_id: int) -> tuple:
+    """Returns an airport's runway count, longest length, widest width, lighted count,
+    open count, and list of surfaces, read from the summary table if it has been
+    built or computed from the airport's runways otherwise"""
+    if has_summary(connection):
+        row = connection.execute(f"""
+        SELECT runway_count, longest_length_ft, widest_width_ft, lighted_count, open_count, surfaces
+        FROM {SUMMARY_TABLE}
+        WHERE airport_id = ?
+        """, (airport_id,)).fetchone()
+    else:
+        row = connection.execute(_SUMMARIZE.format(condition='WHERE airport_id = ?'),
+                                 (airport_id,)).fetchone()
+        row = row[1:] if row is not None else None
+    if row is None:
+        return 0, None, None, 0, 0, []
+    return *row[:5], json.loads(row[5])
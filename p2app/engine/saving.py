@@ -0,0 +1,23 @@
+def insert_query(table: str, values: dict, returning: list) -> tuple[str, tuple]:
+    """Builds an INSERT of one row that returns the stored record, so a new record is
+    saved and read back in a single statement"""
+    columns = ', '.join(values)
+    placeholders = ', '.join('?' for _ in values)
+    query = f'INSERT INTO {table} ({columns})\nVALUES ({placeholders})\n' \
+            f'RETURNING {", ".join(returning)}'
+    return query, tuple(values.values())
+
+
+def update_query(table: str, id_column: str, record_id: int, changes: dict,
+                 returning: list) -> tuple[str, tuple]:
+    """Builds an UPDATE of the row with the given primary key that returns the stored
+    record, changing each column in changes whose value is not None.  If nothing
+    changes, the row is touched without modifying it so the record is still
+    returned by the one statement."""
+    columns = [f'{column} = ?' for column, data in changes.items() if data is not None]
+    parameters = [data for data in changes.values() if data is not None]
+    if not columns:
+        columns = [f'{id_column} = {id_column}']
+    query = f'UPDATE {table}\nSET {", ".join(columns)}\nWHERE {id_column} = ?\n' \
+            f'RETURNING {", ".join(returning)}'
+    return query, (*parameters, record_id)
@@ -0,0 +1,12 @@
+import sqlite3
+
+
+def run_script(connection: sqlite3.Connection, script: str):
+    """Runs a script that manages its own transaction, rolling it back if any of its
+    statements fail"""
+    try:
+        connection.executescript(script)
+    except sqlite3.Error:
+        if connection.in_transaction:
+            connection.rollback()
+        raise
@@ -0,0 +1,122 @@
+from p2app.events import *
+import sqlite3
+from contextlib import contextmanager
+
+_SAVEPOINT = 'edit_save'
+
+class EditSession:
+    """An edit session, a long-running transaction during which each save runs under
+    its own savepoint and nothing is committed until the session is"""
+    def __init__(self, connection):
+        """Initializes the session state for a connection, with no session open"""
+        self.connect = connection
+        self.is_open = False
+        self._changes = 0
+
+    def begin(self):
+        """Opens a session, committing anything that is still pending first"""
+        self.connect.commit()
+        self.connect.execute('BEGIN')
+        self.is_open = True
+        self._changes = 0
+
+    def commit(self) -> int:
+        """Commits every save made during the session at once, returning the number of
+        rows that were changed"""
+        changes = self.changes()
+        self.connect.commit()
+        self.is_open = False
+        return changes
+
+    def rollback(self) -> int:
+        """Undoes every save made during the session, returning the number of rows
+        whose changes were discarded"""
+        changes = self.changes()
+        self.connect.rollback()
+        self.is_open = False
+        return changes
+
+    def changes(self) -> int:
+        """Returns the number of rows the session's saves have changed, not counting the
+        rows changed by triggers, such as those keeping the indexes in sync"""
+        return self._changes if self.is_open else 0
+
+    @contextmanager
+    def saving(self):
+        """Runs the statements of one save.  Inside a session they run under a
+        savepoint, so a failure undoes only this save; otherwise they run in a
+        transaction of their own that is committed as soon as they succeed."""
+        if not self.is_open:
+            try:
+                yield
+            except sqlite3.Error:
+                self.connect.rollback()
+                raise
+            self.connect.commit()
+            return
+        self.connect.execute(f'SAVEPOINT {_SAVEPOINT}')
+        try:
+            yield
+        except sqlite3.Error:
+            self.connect.execute(f'ROLLBACK TO {_SAVEPOINT}')
+            self.connect.execute(f'RELEASE {_SAVEPOINT}')
+            raise
+        # changes() counts only the rows changed by the last statement itself.
+        self._changes += self.connect.execute('SELECT changes()').fetchone()[0]
+        self.connect.execute(f'RELEASE {_SAVEPOINT}')
+
+
+class SessionEvents:
+    """The processing of edit session events by the engine"""
+    def __init__(self, session: EditSession, processors: list, references=None):
+        """Initializes the processor.  When a session is rolled back, the processors'
+        caches are cleared and the reference id sets, if given, are reloaded."""
+        self.session = session
+        self.processors = processors
+        self.references = references
+
+    def event_handlers(self) -> dict:
+        """Maps each edit session event type to the method that handles it"""
+        return {
+            BeginEditSessionEvent: self.process_begin,
+            CommitEditSessionEvent: self.process_commit,
+            RollbackEditSessionEvent: self.process_rollback
+        }
+
+    def process_begin(self, event: BeginEditSessionEvent):
+        """Handles a request to open an edit session"""
+        if self.session.is_open:
+            yield ErrorEvent('Failed to begin an edit session: a session is already open')
+            return
+        try:
+            self.session.begin()
+            yield EditSessionStartedEvent()
+        except sqlite3.Error as e:
+            yield ErrorEvent(f'Database error: {e}')
+
+    def process_commit(self, event: CommitEditSessionEvent):
+        """Handles a request to commit the open edit session"""
+        if not self.session.is_open:
+            yield ErrorEvent('Failed to commit: no edit session is open')
+            return
+        try:
+            yield EditSessionCommittedEvent(self.session.commit())
+        except sqlite3.Error as e:
+            yield ErrorEvent(f'Database error: {e}')
+
+    def process_rollback(self, event: RollbackEditSessionEvent):
+        """Handles a request to discard the open edit session, along with any records
+        cached while it was open"""
+        if not self.session.is_open:
+            yield ErrorEvent('Failed to roll back: no edit session is open')
+            return
+        try:
+            changes = self.session.rollback()
+            if self.references:
+                self.references.reload()
+        except sqlite3.Error as e:
+            yield ErrorEvent(f'Database error: {e}')
+            return
+        for processor in self.processors:
+            processor.cache.clear()
+        yield EditSessionRolledBackEvent(changes)
@@ -0,0 +1,116 @@
+import sqlite3
+from .profiles import is_query_only
+from .scripts import run_script
+
+# The tables whose rows can be found by where they lie on the map, each mapped to
+# the column identifying a row and its latitude and longitude columns.  Each index
+# is an R*Tree holding one point (a box whose corners coincide) per row.  Nothing
+# makes navigation_aid_id unique, so navigation aids are identified by rowid.
+INDEXED_TABLES = {
+    'airport': ('airport_id', 'latitude_deg', 'longitude_deg'),
+    'navigation_aid': ('rowid', 'latitude_deg', 'longitude_deg')
+}
+
+
+def index_name(table: str) -> str:
+    """Returns the name of the spatial index over the given table"""
+    return f'{table}_rtree'
+
+
+def has_index(connection: sqlite3.Connection, table: str) -> bool:
+    """Checks whether the spatial index over the given table has been built"""
+    cursor = connection.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+                                (index_name(table),))
+    return cursor.fetchone() is not None
+
+
+def build_index(connection: sqlite3.Connection, table: str) -> bool:
+    """Creates the spatial index over the given table, fills it from the existing
+    rows, and adds triggers that keep it in sync with later inserts, updates, and
+    deletes, returning whether the index can be searched.  It cannot be built while
+    a transaction is open or on a connection that may only query the database."""
+    if has_index(connection, table):
+        return True
+    if connection.in_transaction or is_query_only(connection):
+        return False
+    key, latitude, longitude = INDEXED_TABLES[table]
+    rtree = index_name(table)
+    run_script(connection, f"""
+    BEGIN;
+    CREATE VIRTUAL TABLE {rtree} USING rtree(
+        id, min_latitude, max_latitude, min_longitude, max_longitude
+    );
+    CREATE TRIGGER {rtree}_after_insert AFTER INSERT ON {table} BEGIN
+        INSERT INTO {rtree} VALUES (new.{key}, new.{latitude}, new.{latitude},
+                                    new.{longitude}, new.{longitude});
+    END;
+    CREATE TRIGGER {rtree}_after_delete AFTER DELETE ON {table} BEGIN
+        DELETE FROM {rtree} WHERE id = old.{key};
+    END;
+    CREATE TRIGGER {rtree}_after_update AFTER UPDATE OF {key}, {latitude}, {longitude}
+    ON {table} BEGIN
+        DELETE FROM {rtree} WHERE id = old.{key};
+        INSERT INTO {rtree} VALUES (new.{key}, new.{latitude}, new.{latitude},
+                                    new.{longitude}, new.{longitude});
+    END;
+    INSERT INTO {rtree}
+    SELECT {key}, {latitude}, {latitude}, {longitude}, {longitude} FROM {table};
+    COMMIT;
+    """)
+    return True
+
+
+def longitude_ranges(min_longitude: float, max_longitude: float) -> list[tuple[float, float]]:
+    """Splits a span of longitudes that crosses the antimeridian (its west edge lying
+    east of its east edge) into the two ranges on either side of it"""
+    if min_longitude <= max_longitude:
+        return [(min_longitude, max_longitude)]
+    return [(min_longitude, 180.0), (-180.0, max_longitude)]
+
+
+def area_query(table: str, select_columns: str, min_latitude: float, min_longitude: float,
+               max_latitude: float, max_longitude: float, limit: int | None = None,
+               after_id: int | None = None, conditions: list[str] | None = None,
+               condition_parameters: tuple = (), indexed: bool = True) -> tuple[str, tuple]:
+    """Builds a search for the rows lying within a box on the map, returned in id
+    order, along with its parameters.  select_columns and any further conditions
+    the rows must meet are qualified with the alias t, which stands for the
+    original table.  Unless indexed is False, in which case the whole table is
+    scanned, the R*Tree finds the candidate rows.
+
+    The R*Tree stores its coordinates as 32-bit floats, rounded outward, so the rows
+    it finds are checked again against their exact coordinates."""
+    key, latitude, longitude = INDEXED_TABLES[table]
+    rtree = index_name(table)
+    ranges = longitude_ranges(min_longitude, max_longitude)
+    parameters = [min_latitude, max_latitude]
+    exact = []
+    for west, east in ranges:
+        exact.append(f't.{longitude} BETWEEN ? AND ?')
+        parameters.extend((west, east))
+    query = f"""
+    SELECT {select_columns}
+    FROM {table} AS t
+    WHERE t.{latitude} BETWEEN ? AND ?
+    AND ({' OR '.join(exact)})
+    """
+    if indexed:
+        candidates = []
+        for west, east in ranges:
+            candidates.append(f"""
+            SELECT id FROM {rtree}
+            WHERE max_latitude >= ? AND min_latitude <= ? AND max_longitude >= ? AND min_longitude <= ?
+            """)
+            parameters.extend((min_latitude, max_latitude, west, east))
+        query += f"AND t.{key} IN ({' UNION ALL '.join(candidates)})\n"
+    for condition in conditions or []:
+        query += f'AND {condition}\n'
+    parameters.extend(condition_parameters)
+    if after_id is not None:
+        query += f'AND t.{key} > ?\n'
+        parameters.append(after_id)
+    query += f'ORDER BY t.{key}\n'
+    if limit is not None:
+        query += 'LIMIT ?\n'
+        parameters.append(limit)
+    return query, tuple(parameters)
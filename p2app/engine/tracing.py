@@ -0,0 +1,239 @@
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+DEFAULT_SLOW_QUERY_MS = 50.0
+
+
+class SqlTracer:
+    """Logs every statement the engine runs, with how long it took and how many rows
+    it returned or changed, and writes the statements slower than a threshold to a
+    slow-query log along with their query plans.
+
+    Statements are seen in two ways.  SQLite's trace callback reports the text of
+    every statement as it starts, with its parameters filled in, including those run
+    by scripts and triggers.  The engine's connections also use TracingCursor, which
+    times each statement from its execution until its last row is fetched, so the
+    statements run through a cursor are logged with their durations."""
+    def __init__(self, connection: sqlite3.Connection, threshold_ms: float = DEFAULT_SLOW_QUERY_MS,
+                 slow_log_path: Path | None = None, output=None):
+        """Initializes a tracer for a connection without turning it on.  The trace is
+        written to output (standard output by default), and slow queries are also
+        appended to slow_log_path, if given."""
+        self.connect = connection
+        self.threshold_ms = threshold_ms
+        self.slow_log_path = slow_log_path
+        self.output = output
+        self.enabled = False
+        self._captured = None
+
+    def enable(self):
+        """Starts tracing the connection's statements"""
+        self.enabled = True
+        self.connect.start_tracing(self)
+        self.connect.set_trace_callback(self._on_statement)
+
+    def disable(self):
+        """Stops tracing the connection's statements"""
+        self.enabled = False
+        self.connect.stop_tracing()
+        self.connect.set_trace_callback(None)
+
+    def start_capture(self):
+        """Collects the statement texts SQLite reports while a cursor executes, rather
+        than logging them straight away"""
+        self._captured = []
+
+    def finish_capture(self) -> list[str]:
+        """Returns the statement texts reported since start_capture"""
+        captured, self._captured = self._captured or [], None
+        return captured
+
+    def record(self, sql: str, expanded: list[str], parameters, seconds: float, rows: int):
+        """Logs a statement run through a cursor, along with any statements its
+        triggers ran, and writes it to the slow-query log if it was slow"""
+        # Besides the statement itself, SQLite may report an implicit BEGIN issued by
+        # the sqlite3 module and the statements of any triggers that fired.
+        milliseconds = seconds * 1000
+        keyword = _first_word(sql)
+        statement = next((text for text in expanded if _first_word(text) == keyword),
+                         _one_line(sql))
+        self._write(f'SQL {milliseconds:9.3f} ms {rows:7} rows  {statement}')
+        for other in expanded:
+            if other is not statement:
+                self._write(f'SQL {"":>9}    {"":>7}       {other}')
+        if milliseconds >= self.threshold_ms:
+            self._write_slow_query(sql, statement, parameters, milliseconds, rows)
+
+    def _on_statement(self, statement: str):
+        if self._captured is not None:
+            self._captured.append(_one_line(statement))
+        else:
+            self._write(f'SQL {"":>9}    {"":>7}       {_one_line(statement)}')
+
+    def _write_slow_query(self, sql: str, statement: str, parameters, milliseconds: float,
+                          rows: int):
+        lines = [f'SLOW {milliseconds:.3f} ms, {rows} rows: {statement}']
+        lines.extend(f'    {detail}' for detail in self._query_plan(sql, parameters))
+        for line in lines:
+            self._write(line)
+        if self.slow_log_path:
+            with open(self.slow_log_path, 'a', encoding='utf-8') as slow_log:
+                slow_log.write(f'{time.strftime("%Y-%m-%d %H:%M:%S")} ' + '\n'.join(lines) + '\n')
+
+    def _query_plan(self, sql: str, parameters) -> list[str]:
+        # The plan is read through a plain cursor with the trace callback removed, so
+        # that explaining a statement is never itself traced.
+        self.connect.set_trace_callback(None)
+        try:
+            cursor = sqlite3.Cursor(self.connect)
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', parameters)
+            return [row[3] for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            return [f'(no query plan: {e})']
+        finally:
+            if self.enabled:
+                self.connect.set_trace_callback(self._on_statement)
+
+    def _write(self, line: str):
+        print(line, file=self.output or sys.stdout)
+
+
+class TracingCursor(sqlite3.Cursor):
+    """A cursor that, while its connection is being traced, times each statement from
+    its execution until its rows run out, and reports it to the tracer"""
+
+    def execute(self, sql, parameters=()):
+        tracer = getattr(self.connection, 'tracer', None)
+        if tracer is None or not tracer.enabled:
+            return super().execute(sql, parameters)
+        self._finish_trace()
+        tracer.start_capture()
+        start = time.perf_counter()
+        try:
+            super().execute(sql, parameters)
+        finally:
+            self._trace = [tracer, sql, parameters, tracer.finish_capture(),
+                           time.perf_counter() - start, 0]
+        if self.description is None:
+            self._finish_trace()
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        tracer = getattr(self.connection, 'tracer', None)
+        if tracer is None or not tracer.enabled:
+            return super().executemany(sql, seq_of_parameters)
+        self._finish_trace()
+        tracer.start_capture()
+        start = time.perf_counter()
+        try:
+            super().executemany(sql, seq_of_parameters)
+        finally:
+            seconds = time.perf_counter() - start
+            captured = tracer.finish_capture()
+            tracer.record(sql, captured, (), seconds, max(self.rowcount, 0))
+        return self
+
+    def __next__(self):
+        if getattr(self, '_trace', None) is None:
+            return super().__next__()
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._add_fetched(time.perf_counter() - start, 0, True)
+            raise
+        self._add_fetched(time.perf_counter() - start, 1, False)
+        return row
+
+    def fetchone(self):
+        if getattr(self, '_trace', None) is None:
+            return super().fetchone()
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._add_fetched(time.perf_counter() - start, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        if getattr(self, '_trace', None) is None:
+            return super().fetchmany(size)
+        start = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._add_fetched(time.perf_counter() - start, len(rows), len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        if getattr(self, '_trace', None) is None:
+            return super().fetchall()
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._add_fetched(time.perf_counter() - start, len(rows), True)
+        return rows
+
+    def close(self):
+        self._finish_trace()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish_trace()
+        except Exception:
+            pass
+
+    def _add_fetched(self, seconds: float, rows: int, exhausted: bool):
+        self._trace[4] += seconds
+        self._trace[5] += rows
+        if exhausted:
+            self._finish_trace()
+
+    def _finish_trace(self):
+        trace = getattr(self, '_trace', None)
+        if trace is None:
+            return
+        self._trace = None
+        tracer, sql, parameters, expanded, seconds, rows = trace
+        if self.description is None:
+            rows = max(self.rowcount, 0)
+        tracer.record(sql, expanded, parameters, seconds, rows)
+
+
+class TracingConnection(sqlite3.Connection):
+    """A connection whose cursors can be traced by a SqlTracer.  Until a tracer is
+    enabled, it overrides nothing, so its statements and rows cost no more than those
+    of a plain connection; while one is, its cursor, execute, and executemany are
+    replaced on the instance by ones that use TracingCursor."""
+    tracer = None
+
+    def start_tracing(self, tracer: SqlTracer):
+        """Makes the connection's cursors report their statements to the tracer"""
+        self.tracer = tracer
+        self.cursor = self._tracing_cursor
+        self.execute = self._tracing_execute
+        self.executemany = self._tracing_executemany
+
+    def stop_tracing(self):
+        """Puts back the connection's own cursor, execute, and executemany"""
+        for name in ('tracer', 'cursor', 'execute', 'executemany'):
+            self.__dict__.pop(name, None)
+
+    def _tracing_cursor(self, factory=TracingCursor):
+        return sqlite3.Connection.cursor(self, factory)
+
+    def _tracing_execute(self, sql, parameters=()):
+        return self._tracing_cursor().execute(sql, parameters)
+
+    def _tracing_executemany(self, sql, seq_of_parameters):
+        return self._tracing_cursor().executemany(sql, seq_of_parameters)
+
+
+def _one_line(sql: str) -> str:
+    """Collapses the whitespace of a statement onto one line"""
+    return ' '.join(sql.split())
+
+
+def _first_word(sql: str) -> str:
+    """Returns the keyword a statement begins with"""
+    words = sql.split(None, 1)
+    return words[0].upper() if words else ''
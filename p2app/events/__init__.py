@@ -13,3 +13,9 @@ from .continents import *
 from .countries import *
 from .database import *
 from .regions import *
+from .airports import *
+from .distances import *
+from .navaids import *
+from .maintenance import *
+from .transfer import *
+from .sessions import *
@@ -0,0 +1,329 @@
+# p2app/events/airports.py
+#
+# ICS 33 Fall 2023
+# Project 2: Learning to Fly
+#
+# Events that are related to searching for and loading airports in the database,
+# either by their codes and names, by words in their names and keywords, by the
+# area of the map they lie in, or by how near they are to given points, and to
+# loading an airport along with a summary of its runways.
+
+from collections import namedtuple
+
+
+
+Airport = namedtuple(
+    'Airport',
+    ['airport_id', 'airport_ident', 'type', 'name', 'latitude_deg', 'longitude_deg',
+     'elevation_ft', 'continent_id', 'country_id', 'region_id', 'municipality',
+     'scheduled_service', 'gps_code', 'iata_code', 'local_code', 'home_link',
+     'wikipedia_link', 'keywords'])
+
+Airport.__annotations__ = {
+    'airport_id': int | None,
+    'airport_ident': str | None,
+    'type': str | None,
+    'name': str | None,
+    'latitude_deg': float | None,
+    'longitude_deg': float | None,
+    'elevation_ft': int | None,
+    'continent_id': int | None,
+    'country_id': int | None,
+    'region_id': int | None,
+    'municipality': str | None,
+    'scheduled_service': int | None,
+    'gps_code': str | None,
+    'iata_code': str | None,
+    'local_code': str | None,
+    'home_link': str | None,
+    'wikipedia_link': str | None,
+    'keywords': str | None
+}
+
+
+
+RunwaySummary = namedtuple(
+    'RunwaySummary',
+    ['runway_count', 'longest_length_ft', 'widest_width_ft', 'lighted_count', 'open_count',
+     'surfaces'])
+
+RunwaySummary.__annotations__ = {
+    'runway_count': int,
+    'longest_length_ft': int | None,
+    'widest_width_ft': int | None,
+    'lighted_count': int,
+    'open_count': int,
+    'surfaces': list[str]
+}
+
+
+
+class StartAirportSearchEvent:
+    def __init__(self, airport_ident: str, iata_code: str, gps_code: str, name: str,
+                 limit: int | None = None, after_id: int | None = None):
+        self._airport_ident = airport_ident
+        self._iata_code = iata_code
+        self._gps_code = gps_code
+        self._name = name
+        self._limit = limit
+        self._after_id = after_id
+
+
+    def airport_ident(self) -> str:
+        return self._airport_ident
+
+
+    def iata_code(self) -> str:
+        return self._iata_code
+
+
+    def gps_code(self) -> str:
+        return self._gps_code
+
+
+    def name(self) -> str:
+        return self._name
+
+
+    def limit(self) -> int | None:
+        return self._limit
+
+
+    def after_id(self) -> int | None:
+        return self._after_id
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: airport_ident = {repr(self._airport_ident)}, ' + \
+               f'iata_code = {repr(self._iata_code)}, gps_code = {repr(self._gps_code)}, ' + \
+               f'name = {repr(self._name)}, limit = {repr(self._limit)}, ' + \
+               f'after_id = {repr(self._after_id)}'
+
+
+
+class StartAirportTextSearchEvent:
+    def __init__(self, text: str, limit: int | None = None):
+        self._text = text
+        self._limit = limit
+
+
+    def text(self) -> str:
+        return self._text
+
+
+    def limit(self) -> int | None:
+        return self._limit
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: text = {repr(self._text)}, limit = {repr(self._limit)}'
+
+
+
+class StartAirportAreaSearchEvent:
+    def __init__(self, min_latitude: float, min_longitude: float, max_latitude: float,
+                 max_longitude: float, limit: int | None = None, after_id: int | None = None):
+        self._min_latitude = min_latitude
+        self._min_longitude = min_longitude
+        self._max_latitude = max_latitude
+        self._max_longitude = max_longitude
+        self._limit = limit
+        self._after_id = after_id
+
+
+    def min_latitude(self) -> float:
+        return self._min_latitude
+
+
+    def min_longitude(self) -> float:
+        return self._min_longitude
+
+
+    def max_latitude(self) -> float:
+        return self._max_latitude
+
+
+    def max_longitude(self) -> float:
+        return self._max_longitude
+
+
+    def limit(self) -> int | None:
+        return self._limit
+
+
+    def after_id(self) -> int | None:
+        return self._after_id
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: min_latitude = {repr(self._min_latitude)}, ' + \
+               f'min_longitude = {repr(self._min_longitude)}, ' + \
+               f'max_latitude = {repr(self._max_latitude)}, ' + \
+               f'max_longitude = {repr(self._max_longitude)}, limit = {repr(self._limit)}, ' + \
+               f'after_id = {repr(self._after_id)}'
+
+
+
+class StartNearestAirportSearchEvent:
+    def __init__(self, latitude: float, longitude: float, count: int = 10):
+        self._latitude = latitude
+        self._longitude = longitude
+        self._count = count
+
+
+    def latitude(self) -> float:
+        return self._latitude
+
+
+    def longitude(self) -> float:
+        return self._longitude
+
+
+    def count(self) -> int:
+        return self._count
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: latitude = {repr(self._latitude)}, ' + \
+               f'longitude = {repr(self._longitude)}, count = {repr(self._count)}'
+
+
+
+class StartNearestAirportBatchSearchEvent:
+    def __init__(self, points: list[tuple[float, float]], count: int = 10):
+        self._points = points
+        self._count = count
+
+
+    def points(self) -> list[tuple[float, float]]:
+        return self._points
+
+
+    def count(self) -> int:
+        return self._count
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: points = {repr(self._points)}, count = {repr(self._count)}'
+
+
+
+class NearestAirportsEvent:
+    def __init__(self, latitude: float, longitude: float, airports: list[Airport],
+                 distances_km: list[float]):
+        self._latitude = latitude
+        self._longitude = longitude
+        self._airports = airports
+        self._distances_km = distances_km
+
+
+    def latitude(self) -> float:
+        return self._latitude
+
+
+    def longitude(self) -> float:
+        return self._longitude
+
+
+    def airports(self) -> list[Airport]:
+        return self._airports
+
+
+    def distances_km(self) -> list[float]:
+        return self._distances_km
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: latitude = {repr(self._latitude)}, ' + \
+               f'longitude = {repr(self._longitude)}, airports = {repr(self._airports)}, ' + \
+               f'distances_km = {repr(self._distances_km)}'
+
+
+
+class AirportSearchResultEvent:
+    def __init__(self, airport: Airport):
+        self._airport = airport
+
+
+    def airport(self) -> Airport:
+        return self._airport
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: airport = {repr(self._airport)}'
+
+
+
+class AirportSearchResultBatchEvent:
+    def __init__(self, airports: list[Airport]):
+        self._airports = airports
+
+
+    def airports(self) -> list[Airport]:
+        return self._airports
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: airports = {repr(self._airports)}'
+
+
+
+class LoadAirportEvent:
+    def __init__(self, airport_id: int):
+        self._airport_id = airport_id
+
+
+    def airport_id(self) -> int:
+        return self._airport_id
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: airport_id = {repr(self._airport_id)}'
+
+
+
+class AirportLoadedEvent:
+    def __init__(self, airport: Airport):
+        self._airport = airport
+
+
+    def airport(self) -> Airport:
+        return self._airport
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: airport = {repr(self._airport)}'
+
+
+
+class LoadAirportDetailsEvent:
+    def __init__(self, airport_id: int):
+        self._airport_id = airport_id
+
+
+    def airport_id(self) -> int:
+        return self._airport_id
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: airport_id = {repr(self._airport_id)}'
+
+
+
+class AirportDetailsLoadedEvent:
+    def __init__(self, airport: Airport, runways: RunwaySummary):
+        self._airport = airport
+        self._runways = runways
+
+
+    def airport(self) -> Airport:
+        return self._airport
+
+
+    def runways(self) -> RunwaySummary:
+        return self._runways
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: airport = {repr(self._airport)}, ' + \
+               f'runways = {repr(self._runways)}'
@@ -25,9 +25,12 @@ Continent.__annotations__ = {
 
 
 class StartContinentSearchEvent:
-    def __init__(self, continent_code: str, name: str):
+    def __init__(self, continent_code: str, name: str, limit: int | None = None,
+                 after_id: int | None = None):
         self._continent_code = continent_code
         self._name = name
+        self._limit = limit
+        self._after_id = after_id
 
 
     def continent_code(self) -> str:
@@ -38,8 +41,17 @@ class StartContinentSearchEvent:
         return self._name
 
 
+    def limit(self) -> int | None:
+        return self._limit
+
+
+    def after_id(self) -> int | None:
+        return self._after_id
+
+
     def __repr__(self) -> str:
-        return f'{type(self).__name__}: continent_code = {repr(self._continent_code)}, name = {repr(self._name)}'
+        return f'{type(self).__name__}: continent_code = {repr(self._continent_code)}, name = {repr(self._name)}, ' + \
+               f'limit = {repr(self._limit)}, after_id = {repr(self._after_id)}'
 
 
 
@@ -57,6 +69,20 @@ class ContinentSearchResultEvent:
 
 
 
+class ContinentSearchResultBatchEvent:
+    def __init__(self, continents: list[Continent]):
+        self._continents = continents
+
+
+    def continents(self) -> list[Continent]:
+        return self._continents
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: continents = {repr(self._continents)}'
+
+
+
 class LoadContinentEvent:
     def __init__(self, continent_id: int):
         self._continent_id = continent_id
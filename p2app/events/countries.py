@@ -30,9 +30,12 @@ Country.__annotations__ = {
 
 
 class StartCountrySearchEvent:
-    def __init__(self, country_code: str, name: str):
+    def __init__(self, country_code: str, name: str, limit: int | None = None,
+                 after_id: int | None = None):
         self._country_code = country_code
         self._name = name
+        self._limit = limit
+        self._after_id = after_id
 
 
     def country_code(self) -> str:
@@ -43,8 +46,36 @@ class StartCountrySearchEvent:
         return self._name
 
 
+    def limit(self) -> int | None:
+        return self._limit
+
+
+    def after_id(self) -> int | None:
+        return self._after_id
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: country_code = {repr(self._country_code)}, name = {repr(self._name)}, ' + \
+               f'limit = {repr(self._limit)}, after_id = {repr(self._after_id)}'
+
+
+
+class StartCountryTextSearchEvent:
+    def __init__(self, text: str, limit: int | None = None):
+        self._text = text
+        self._limit = limit
+
+
+    def text(self) -> str:
+        return self._text
+
+
+    def limit(self) -> int | None:
+        return self._limit
+
+
     def __repr__(self) -> str:
-        return f'{type(self).__name__}: country_code = {repr(self._country_code)}, name = {repr(self._name)}'
+        return f'{type(self).__name__}: text = {repr(self._text)}, limit = {repr(self._limit)}'
 
 
 
@@ -62,6 +93,20 @@ class CountrySearchResultEvent:
 
 
 
+class CountrySearchResultBatchEvent:
+    def __init__(self, countries: list[Country]):
+        self._countries = countries
+
+
+    def countries(self) -> list[Country]:
+        return self._countries
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: countries = {repr(self._countries)}'
+
+
+
 class LoadCountryEvent:
     def __init__(self, country_id: int):
         self._country_id = country_id
@@ -14,16 +14,27 @@ from pathlib import Path
 
 
 class OpenDatabaseEvent:
-    def __init__(self, path: Path):
+    def __init__(self, path: Path, profile: str | None = None, in_memory: bool = False):
         self._path = path
+        self._profile = profile
+        self._in_memory = in_memory
 
 
     def path(self) -> Path:
         return self._path
 
 
+    def profile(self) -> str | None:
+        return self._profile
+
+
+    def in_memory(self) -> bool:
+        return self._in_memory
+
+
     def __repr__(self) -> str:
-        return f'{type(self).__name__}: path = {repr(self._path)}'
+        return f'{type(self).__name__}: path = {repr(self._path)}, profile = {repr(self._profile)}, ' + \
+               f'in_memory = {repr(self._in_memory)}'
 
 
 
@@ -34,16 +45,21 @@ class CloseDatabaseEvent:
 
 
 class DatabaseOpenedEvent:
-    def __init__(self, path: Path):
+    def __init__(self, path: Path, in_memory: bool = False):
         self._path = path
+        self._in_memory = in_memory
 
 
     def path(self) -> Path:
         return self._path
 
 
+    def in_memory(self) -> bool:
+        return self._in_memory
+
+
     def __repr__(self) -> str:
-        return f'{type(self).__name__}: path = {repr(self._path)}'
+        return f'{type(self).__name__}: path = {repr(self._path)}, in_memory = {repr(self._in_memory)}'
 
 
 
@@ -64,3 +80,42 @@ class DatabaseOpenFailedEvent:
 class DatabaseClosedEvent:
     def __repr__(self) -> str:
         return f'{type(self).__name__}'
+
+
+
+class DatabaseTunedEvent:
+    def __init__(self, profile: str, pragmas: dict):
+        self._profile = profile
+        self._pragmas = pragmas
+
+
+    def profile(self) -> str:
+        return self._profile
+
+
+    def pragmas(self) -> dict:
+        return self._pragmas
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: profile = {repr(self._profile)}, pragmas = {repr(self._pragmas)}'
+
+
+
+class SaveWorkingCopyEvent:
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}'
+
+
+
+class WorkingCopySavedEvent:
+    def __init__(self, path: Path):
+        self._path = path
+
+
+    def path(self) -> Path:
+        return self._path
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: path = {repr(self._path)}'
@@ -0,0 +1,122 @@
+# p2app/events/distances.py
+#
+# ICS 33 Fall 2023
+# Project 2: Learning to Fly
+#
+# Events related to measuring the great-circle distances between every airport in
+# one set and every airport in another, where each set is chosen by region, by
+# country, or by a list of idents.  The distances are either sent back as
+# (from airport id, to airport id, kilometers) triples or written to a file.
+
+from collections import namedtuple
+from pathlib import Path
+
+
+
+AirportSelection = namedtuple(
+    'AirportSelection',
+    ['region_id', 'country_id', 'airport_idents'],
+    defaults = [None, None, None])
+
+AirportSelection.__annotations__ = {
+    'region_id': int | None,
+    'country_id': int | None,
+    'airport_idents': list[str] | None
+}
+
+
+
+class StartAirportDistancesEvent:
+    def __init__(self, from_airports: AirportSelection, to_airports: AirportSelection,
+                 max_km: float | None = None):
+        self._from_airports = from_airports
+        self._to_airports = to_airports
+        self._max_km = max_km
+
+
+    def from_airports(self) -> AirportSelection:
+        return self._from_airports
+
+
+    def to_airports(self) -> AirportSelection:
+        return self._to_airports
+
+
+    def max_km(self) -> float | None:
+        return self._max_km
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: from_airports = {repr(self._from_airports)}, ' + \
+               f'to_airports = {repr(self._to_airports)}, max_km = {repr(self._max_km)}'
+
+
+
+class AirportDistanceBatchEvent:
+    def __init__(self, distances: list[tuple[int, int, float]]):
+        self._distances = distances
+
+
+    def distances(self) -> list[tuple[int, int, float]]:
+        return self._distances
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: distances = {repr(self._distances)}'
+
+
+
+class WriteAirportDistancesEvent:
+    def __init__(self, from_airports: AirportSelection, to_airports: AirportSelection,
+                 path: Path):
+        self._from_airports = from_airports
+        self._to_airports = to_airports
+        self._path = path
+
+
+    def from_airports(self) -> AirportSelection:
+        return self._from_airports
+
+
+    def to_airports(self) -> AirportSelection:
+        return self._to_airports
+
+
+    def path(self) -> Path:
+        return self._path
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: from_airports = {repr(self._from_airports)}, ' + \
+               f'to_airports = {repr(self._to_airports)}, path = {repr(self._path)}'
+
+
+
+class AirportDistancesWrittenEvent:
+    def __init__(self, path: Path, ids_path: Path, rows: int, columns: int):
+        self._path = path
+        self._ids_path = ids_path
+        self._rows = rows
+        self._columns = columns
+
+
+    def path(self) -> Path:
+        return self._path
+
+
+    def ids_path(self) -> Path:
+        return self._ids_path
+
+
+    def rows(self) -> int:
+        return self._rows
+
+
+    def columns(self) -> int:
+        return self._columns
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: path = {repr(self._path)}, ' + \
+               f'ids_path = {repr(self._ids_path)}, rows = {repr(self._rows)}, ' + \
+               f'columns = {repr(self._columns)}'
@@ -0,0 +1,140 @@
+# p2app/events/maintenance.py
+#
+# ICS 33 Fall 2023
+# Project 2: Learning to Fly
+#
+# Events related to inspecting and tuning the engine and its database, such as
+# reporting the query plans of the engine's statements, creating the indexes they
+# need, reporting how well the engine's caches are working, or tracing the SQL
+# statements the engine runs.
+
+from pathlib import Path
+
+
+
+class OptimizeDatabaseEvent:
+    def __init__(self, create_indexes: bool = True):
+        self._create_indexes = create_indexes
+
+
+    def create_indexes(self) -> bool:
+        return self._create_indexes
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: create_indexes = {repr(self._create_indexes)}'
+
+
+
+class QueryPlanEvent:
+    def __init__(self, statement: str, plan: list[str], is_scan: bool):
+        self._statement = statement
+        self._plan = plan
+        self._is_scan = is_scan
+
+
+    def statement(self) -> str:
+        return self._statement
+
+
+    def plan(self) -> list[str]:
+        return self._plan
+
+
+    def is_scan(self) -> bool:
+        return self._is_scan
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: statement = {repr(self._statement)}, ' + \
+               f'plan = {repr(self._plan)}, is_scan = {repr(self._is_scan)}'
+
+
+
+class DatabaseOptimizedEvent:
+    def __init__(self, created_indexes: list[str], scans_before: list[str], scans_after: list[str]):
+        self._created_indexes = created_indexes
+        self._scans_before = scans_before
+        self._scans_after = scans_after
+
+
+    def created_indexes(self) -> list[str]:
+        return self._created_indexes
+
+
+    def scans_before(self) -> list[str]:
+        return self._scans_before
+
+
+    def scans_after(self) -> list[str]:
+        return self._scans_after
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: created_indexes = {repr(self._created_indexes)}, ' + \
+               f'scans_before = {repr(self._scans_before)}, scans_after = {repr(self._scans_after)}'
+
+
+
+class ReportCacheStatsEvent:
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}'
+
+
+
+class CacheStatsEvent:
+    def __init__(self, stats: dict):
+        self._stats = stats
+
+
+    def stats(self) -> dict:
+        return self._stats
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: stats = {repr(self._stats)}'
+
+
+
+class EnableSqlTraceEvent:
+    def __init__(self, threshold_ms: float | None = None):
+        self._threshold_ms = threshold_ms
+
+
+    def threshold_ms(self) -> float | None:
+        return self._threshold_ms
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: threshold_ms = {repr(self._threshold_ms)}'
+
+
+
+class DisableSqlTraceEvent:
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}'
+
+
+
+class SqlTraceChangedEvent:
+    def __init__(self, enabled: bool, threshold_ms: float, slow_log_path: Path | None):
+        self._enabled = enabled
+        self._threshold_ms = threshold_ms
+        self._slow_log_path = slow_log_path
+
+
+    def enabled(self) -> bool:
+        return self._enabled
+
+
+    def threshold_ms(self) -> float:
+        return self._threshold_ms
+
+
+    def slow_log_path(self) -> Path | None:
+        return self._slow_log_path
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: enabled = {repr(self._enabled)}, ' + \
+               f'threshold_ms = {repr(self._threshold_ms)}, slow_log_path = {repr(self._slow_log_path)}'
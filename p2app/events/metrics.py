@@ -0,0 +1,150 @@
+# p2app/events/metrics.py
+#
+# ICS 33 Fall 2023
+# Project 2: Learning to Fly
+#
+# Metrics that the event bus collects about each type of event it sends to the
+# engine: how many were processed, a histogram of how long the engine took to
+# process them, how many events it sent back, how many rows those carried, and how
+# many of them reported errors.  The metrics can be dumped as JSON or in the
+# Prometheus text exposition format.
+#
+# Recording is cheap (a dictionary lookup, a few additions, and a bisection into
+# the histogram's buckets), and is guarded by a lock, since in threaded mode the
+# worker thread records while the user interface may be dumping or resetting.
+
+import bisect
+import json
+import math
+import threading
+
+
+
+# The upper bounds, in seconds, of the latency histogram's buckets.  The last
+# bucket, whose bound is infinite, holds everything slower.
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+
+_PROMETHEUS_PREFIX = 'p2app_engine_events'
+
+
+
+class EventMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_type = {}
+
+
+    def record(self, event_type: str, seconds: float, result_events: int, rows: int, errors: int):
+        with self._lock:
+            metrics = self._by_type.get(event_type)
+
+            if metrics is None:
+                metrics = self._by_type[event_type] = _TypeMetrics()
+
+            metrics.count += 1
+            metrics.seconds += seconds
+            metrics.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            metrics.result_events += result_events
+            metrics.rows += rows
+            metrics.errors += errors
+
+
+    def reset(self):
+        with self._lock:
+            self._by_type = {}
+
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                event_type: metrics.as_dict()
+                for event_type, metrics in sorted(self._by_type.items())
+            }
+
+
+    def to_json(self) -> str:
+        return json.dumps({
+            'latency_bucket_bounds': ['+Inf' if math.isinf(bound) else bound for bound in LATENCY_BUCKETS],
+            'events': self.snapshot()
+        }, indent = 2)
+
+
+    def to_prometheus(self) -> str:
+        snapshot = self.snapshot()
+        lines = []
+
+        def add_counter(name, help_text, key):
+            lines.append(f'# HELP {_PROMETHEUS_PREFIX}_{name} {help_text}')
+            lines.append(f'# TYPE {_PROMETHEUS_PREFIX}_{name} counter')
+
+            for event_type, metrics in snapshot.items():
+                lines.append(f'{_PROMETHEUS_PREFIX}_{name}{{event="{event_type}"}} {metrics[key]}')
+
+        add_counter('total', 'Events processed by the engine.', 'count')
+        add_counter('result_events_total', 'Events sent back by the engine.', 'result_events')
+        add_counter('rows_total', 'Rows carried by the events sent back.', 'rows')
+        add_counter('errors_total', 'Events sent back that reported errors.', 'errors')
+
+        name = f'{_PROMETHEUS_PREFIX}_latency_seconds'
+        lines.append(f'# HELP {name} Time the engine took to process each event.')
+        lines.append(f'# TYPE {name} histogram')
+
+        for event_type, metrics in snapshot.items():
+            cumulative = 0
+
+            for bound, count in zip(LATENCY_BUCKETS, metrics['latency_buckets']):
+                cumulative += count
+                label = '+Inf' if math.isinf(bound) else repr(bound)
+                lines.append(f'{name}_bucket{{event="{event_type}",le="{label}"}} {cumulative}')
+
+            lines.append(f'{name}_sum{{event="{event_type}"}} {metrics["seconds"]}')
+            lines.append(f'{name}_count{{event="{event_type}"}} {metrics["count"]}')
+
+        return '\n'.join(lines) + '\n'
+
+
+
+class _TypeMetrics:
+    __slots__ = ('count', 'seconds', 'buckets', 'result_events', 'rows', 'errors')
+
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.result_events = 0
+        self.rows = 0
+        self.errors = 0
+
+
+    def as_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'seconds': self.seconds,
+            'latency_buckets': list(self.buckets),
+            'result_events': self.result_events,
+            'rows': self.rows,
+            'errors': self.errors
+        }
+
+
+
+def rows_in(event) -> int:
+    """Counts the records an event carries: one for each record in a list, or one
+    for a single record"""
+    rows = 0
+
+    for value in vars(event).values():
+        if isinstance(value, list):
+            rows += len(value) if value and hasattr(value[0], '_fields') else 0
+        elif hasattr(value, '_fields'):
+            rows += 1
+
+    return rows
+
+
+def is_error(event) -> bool:
+    """Checks whether an event reports that something went wrong"""
+    name = type(event).__name__
+    return name == 'ErrorEvent' or name.endswith('FailedEvent')
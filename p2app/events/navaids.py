@@ -0,0 +1,139 @@
+# p2app/events/navaids.py
+#
+# ICS 33 Fall 2023
+# Project 2: Learning to Fly
+#
+# Events that are related to searching for navigation aids in the database by
+# their type, by a band of frequencies, and by how near they are to a point or to
+# an airport.
+
+from collections import namedtuple
+
+
+
+NavigationAid = namedtuple(
+    'NavigationAid',
+    ['navigation_aid_id', 'filename', 'ident', 'name', 'type', 'frequency_khz',
+     'latitude_deg', 'longitude_deg', 'elevation_ft', 'iso_country', 'dme_frequency_khz',
+     'dme_channel', 'dme_latitude_deg', 'dme_longitude_deg', 'dme_elevation_ft',
+     'adjusted_variation_deg', 'magnetic_variation_deg', 'usage_type', 'power', 'airport_id'])
+
+NavigationAid.__annotations__ = {
+    'navigation_aid_id': int | None,
+    'filename': str | None,
+    'ident': str | None,
+    'name': str | None,
+    'type': str | None,
+    'frequency_khz': int | None,
+    'latitude_deg': float | None,
+    'longitude_deg': float | None,
+    'elevation_ft': int | None,
+    'iso_country': str | None,
+    'dme_frequency_khz': int | None,
+    'dme_channel': str | None,
+    'dme_latitude_deg': float | None,
+    'dme_longitude_deg': float | None,
+    'dme_elevation_ft': int | None,
+    'adjusted_variation_deg': float | None,
+    'magnetic_variation_deg': float | None,
+    'usage_type': str | None,
+    'power': str | None,
+    'airport_id': int | None
+}
+
+
+
+class StartNavaidSearchEvent:
+    def __init__(self, navaid_type: str | None = None, min_frequency_khz: int | None = None,
+                 max_frequency_khz: int | None = None, latitude: float | None = None,
+                 longitude: float | None = None, airport_id: int | None = None,
+                 radius_km: float | None = None, limit: int | None = None):
+        self._navaid_type = navaid_type
+        self._min_frequency_khz = min_frequency_khz
+        self._max_frequency_khz = max_frequency_khz
+        self._latitude = latitude
+        self._longitude = longitude
+        self._airport_id = airport_id
+        self._radius_km = radius_km
+        self._limit = limit
+
+
+    def navaid_type(self) -> str | None:
+        return self._navaid_type
+
+
+    def min_frequency_khz(self) -> int | None:
+        return self._min_frequency_khz
+
+
+    def max_frequency_khz(self) -> int | None:
+        return self._max_frequency_khz
+
+
+    def latitude(self) -> float | None:
+        return self._latitude
+
+
+    def longitude(self) -> float | None:
+        return self._longitude
+
+
+    def airport_id(self) -> int | None:
+        return self._airport_id
+
+
+    def radius_km(self) -> float | None:
+        return self._radius_km
+
+
+    def limit(self) -> int | None:
+        return self._limit
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: navaid_type = {repr(self._navaid_type)}, ' + \
+               f'min_frequency_khz = {repr(self._min_frequency_khz)}, ' + \
+               f'max_frequency_khz = {repr(self._max_frequency_khz)}, ' + \
+               f'latitude = {repr(self._latitude)}, longitude = {repr(self._longitude)}, ' + \
+               f'airport_id = {repr(self._airport_id)}, radius_km = {repr(self._radius_km)}, ' + \
+               f'limit = {repr(self._limit)}'
+
+
+
+class NavaidSearchResultEvent:
+    def __init__(self, navaid: NavigationAid, distance_km: float | None = None):
+        self._navaid = navaid
+        self._distance_km = distance_km
+
+
+    def navaid(self) -> NavigationAid:
+        return self._navaid
+
+
+    def distance_km(self) -> float | None:
+        return self._distance_km
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: navaid = {repr(self._navaid)}, ' + \
+               f'distance_km = {repr(self._distance_km)}'
+
+
+
+class NavaidSearchResultBatchEvent:
+    def __init__(self, navaids: list[NavigationAid], distances_km: list[float] | None = None):
+        self._navaids = navaids
+        self._distances_km = distances_km
+
+
+    def navaids(self) -> list[NavigationAid]:
+        return self._navaids
+
+
+    def distances_km(self) -> list[float] | None:
+        return self._distances_km
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: navaids = {repr(self._navaids)}, ' + \
+               f'distances_km = {repr(self._distances_km)}'
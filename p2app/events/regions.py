@@ -33,10 +33,13 @@ Region.__annotations__ = {
 
 
 class StartRegionSearchEvent:
-    def __init__(self, region_code: str, local_code: str, name: str):
+    def __init__(self, region_code: str, local_code: str, name: str, limit: int | None = None,
+                 after_id: int | None = None):
         self._region_code = region_code
         self._local_code = local_code
         self._name = name
+        self._limit = limit
+        self._after_id = after_id
 
 
     def region_code(self) -> str:
@@ -51,9 +54,37 @@ class StartRegionSearchEvent:
         return self._name
 
 
+    def limit(self) -> int | None:
+        return self._limit
+
+
+    def after_id(self) -> int | None:
+        return self._after_id
+
+
     def __repr__(self) -> str:
         return f'{type(self).__name__}: region_code = {repr(self._region_code)}, ' + \
-               f'local_name = {repr(self._local_code)}, name = {repr(self._name)}'
+               f'local_name = {repr(self._local_code)}, name = {repr(self._name)}, ' + \
+               f'limit = {repr(self._limit)}, after_id = {repr(self._after_id)}'
+
+
+
+class StartRegionTextSearchEvent:
+    def __init__(self, text: str, limit: int | None = None):
+        self._text = text
+        self._limit = limit
+
+
+    def text(self) -> str:
+        return self._text
+
+
+    def limit(self) -> int | None:
+        return self._limit
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: text = {repr(self._text)}, limit = {repr(self._limit)}'
 
 
 
@@ -71,6 +102,20 @@ class RegionSearchResultEvent:
 
 
 
+class RegionSearchResultBatchEvent:
+    def __init__(self, regions: list[Region]):
+        self._regions = regions
+
+
+    def regions(self) -> list[Region]:
+        return self._regions
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: regions = {repr(self._regions)}'
+
+
+
 class LoadRegionEvent:
     def __init__(self, region_id: int):
         self._region_id = region_id
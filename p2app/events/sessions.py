@@ -0,0 +1,59 @@
+# p2app/events/sessions.py
+#
+# ICS 33 Fall 2023
+# Project 2: Learning to Fly
+#
+# Events related to edit sessions, during which saves are collected into a single
+# transaction that is committed or rolled back as a whole.
+
+
+
+class BeginEditSessionEvent:
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}'
+
+
+
+class CommitEditSessionEvent:
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}'
+
+
+
+class RollbackEditSessionEvent:
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}'
+
+
+
+class EditSessionStartedEvent:
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}'
+
+
+
+class EditSessionCommittedEvent:
+    def __init__(self, changes: int):
+        self._changes = changes
+
+
+    def changes(self) -> int:
+        return self._changes
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: changes = {repr(self._changes)}'
+
+
+
+class EditSessionRolledBackEvent:
+    def __init__(self, changes: int):
+        self._changes = changes
+
+
+    def changes(self) -> int:
+        return self._changes
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: changes = {repr(self._changes)}'
@@ -0,0 +1,163 @@
+# p2app/events/transfer.py
+#
+# ICS 33 Fall 2023
+# Project 2: Learning to Fly
+#
+# Events related to moving data in bulk between the database and files, such as
+# importing OurAirports-format CSV files and exporting tables or search results.
+
+from pathlib import Path
+
+
+
+class ImportCsvEvent:
+    def __init__(self, table: str, path: Path, reject_path: Path | None = None):
+        self._table = table
+        self._path = path
+        self._reject_path = reject_path
+
+
+    def table(self) -> str:
+        return self._table
+
+
+    def path(self) -> Path:
+        return self._path
+
+
+    def reject_path(self) -> Path | None:
+        return self._reject_path
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: table = {repr(self._table)}, path = {repr(self._path)}, ' + \
+               f'reject_path = {repr(self._reject_path)}'
+
+
+
+class ImportProgressEvent:
+    def __init__(self, table: str, rows_read: int, imported: int, rejected: int):
+        self._table = table
+        self._rows_read = rows_read
+        self._imported = imported
+        self._rejected = rejected
+
+
+    def table(self) -> str:
+        return self._table
+
+
+    def rows_read(self) -> int:
+        return self._rows_read
+
+
+    def imported(self) -> int:
+        return self._imported
+
+
+    def rejected(self) -> int:
+        return self._rejected
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: table = {repr(self._table)}, rows_read = {repr(self._rows_read)}, ' + \
+               f'imported = {repr(self._imported)}, rejected = {repr(self._rejected)}'
+
+
+
+class CsvImportedEvent:
+    def __init__(self, table: str, imported: int, rejected: int, reject_path: Path | None):
+        self._table = table
+        self._imported = imported
+        self._rejected = rejected
+        self._reject_path = reject_path
+
+
+    def table(self) -> str:
+        return self._table
+
+
+    def imported(self) -> int:
+        return self._imported
+
+
+    def rejected(self) -> int:
+        return self._rejected
+
+
+    def reject_path(self) -> Path | None:
+        return self._reject_path
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: table = {repr(self._table)}, imported = {repr(self._imported)}, ' + \
+               f'rejected = {repr(self._rejected)}, reject_path = {repr(self._reject_path)}'
+
+
+
+class ExportTableEvent:
+    def __init__(self, table: str, path: Path, file_format: str | None = None):
+        self._table = table
+        self._path = path
+        self._file_format = file_format
+
+
+    def table(self) -> str:
+        return self._table
+
+
+    def path(self) -> Path:
+        return self._path
+
+
+    def file_format(self) -> str | None:
+        return self._file_format
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: table = {repr(self._table)}, path = {repr(self._path)}, ' + \
+               f'file_format = {repr(self._file_format)}'
+
+
+
+class ExportSearchEvent:
+    def __init__(self, search, path: Path, file_format: str | None = None):
+        self._search = search
+        self._path = path
+        self._file_format = file_format
+
+
+    def search(self):
+        return self._search
+
+
+    def path(self) -> Path:
+        return self._path
+
+
+    def file_format(self) -> str | None:
+        return self._file_format
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: search = {repr(self._search)}, path = {repr(self._path)}, ' + \
+               f'file_format = {repr(self._file_format)}'
+
+
+
+class DataExportedEvent:
+    def __init__(self, path: Path, rows: int):
+        self._path = path
+        self._rows = rows
+
+
+    def path(self) -> Path:
+        return self._path
+
+
+    def rows(self) -> int:
+        return self._rows
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: path = {repr(self._path)}, rows = {repr(self._rows)}'
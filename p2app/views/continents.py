@@ -29,6 +29,10 @@ class ContinentsView(tkinter.Frame, EventHandler):
         self.rowconfigure(1, weight = 1)
         self.columnconfigure(0, weight = 1)
 
+        self.subscribe(
+            SaveContinentFailedEvent, DiscardContinentEvent, NewContinentEvent, StartEditingContinentEvent,
+            ContinentLoadedEvent, ContinentSavedEvent)
+
 
     def on_event(self, event):
         if isinstance(event, SaveContinentFailedEvent):
@@ -124,6 +128,9 @@ class _ContinentsSearchView(tkinter.LabelFrame, EventHandler):
         self.columnconfigure(1, weight = 1)
         self.columnconfigure(2, weight = 2)
 
+        self.subscribe(
+            ClearContinentsSearchListEvent, ContinentSearchResultEvent, ContinentSearchResultBatchEvent)
+
 
     def _on_search_button_clicked(self):
         self.initiate_event(ClearContinentsSearchListEvent())
@@ -184,6 +191,12 @@ class _ContinentsSearchView(tkinter.LabelFrame, EventHandler):
             display_name = f'{event.continent().continent_code} - {event.continent().name}'
             self._search_list.insert(tkinter.END, display_name)
             self._search_continent_ids.append(event.continent().continent_id)
+        elif isinstance(event, ContinentSearchResultBatchEvent):
+            display_names = [
+                f'{continent.continent_code} - {continent.name}' for continent in event.continents()]
+
+            self._search_list.insert(tkinter.END, *display_names)
+            self._search_continent_ids.extend(continent.continent_id for continent in event.continents())
 
 
 
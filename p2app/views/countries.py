@@ -29,6 +29,10 @@ class CountriesView(tkinter.Frame, EventHandler):
         self.rowconfigure(1, weight = 1)
         self.columnconfigure(0, weight = 1)
 
+        self.subscribe(
+            SaveCountryFailedEvent, DiscardCountryEvent, NewCountryEvent, StartEditingCountryEvent,
+            CountryLoadedEvent, CountrySavedEvent)
+
 
     def on_event(self, event):
         if isinstance(event, SaveCountryFailedEvent):
@@ -87,6 +91,13 @@ class _CountriesSearchView(tkinter.LabelFrame, EventHandler):
 
         self._search_button.grid(row = 2, column = 1, sticky = tkinter.E, padx = 5, pady = 5)
 
+        self._match_words = tkinter.IntVar(self, 0)
+
+        match_words_check = tkinter.Checkbutton(
+            self, text = 'Match words', variable = self._match_words)
+
+        match_words_check.grid(row = 2, column = 0, sticky = tkinter.W, padx = 5, pady = 5)
+
         empty_area = tkinter.Label(self, text = '')
         empty_area.grid(row = 3, column = 1, sticky = tkinter.NSEW, padx = 5, pady = 5)
 
@@ -125,10 +136,17 @@ class _CountriesSearchView(tkinter.LabelFrame, EventHandler):
         self.columnconfigure(1, weight = 1)
         self.columnconfigure(2, weight = 2)
 
+        self.subscribe(
+            ClearCountriesSearchListEvent, CountrySearchResultEvent, CountrySearchResultBatchEvent)
+
 
     def _on_search_button_clicked(self):
         self.initiate_event(ClearCountriesSearchListEvent())
-        self.initiate_event(StartCountrySearchEvent(self._get_search_code(), self._get_search_name()))
+
+        if self._match_words.get():
+            self.initiate_event(StartCountryTextSearchEvent(self._get_search_name() or ''))
+        else:
+            self.initiate_event(StartCountrySearchEvent(self._get_search_code(), self._get_search_name()))
 
 
     def _get_search_code(self):
@@ -185,6 +203,12 @@ class _CountriesSearchView(tkinter.LabelFrame, EventHandler):
             display_name = f'{event.country().country_code} - {event.country().name}'
             self._search_list.insert(tkinter.END, display_name)
             self._search_country_ids.append(event.country().country_id)
+        elif isinstance(event, CountrySearchResultBatchEvent):
+            display_names = [
+                f'{country.country_code} - {country.name}' for country in event.countries()]
+
+            self._search_list.insert(tkinter.END, *display_names)
+            self._search_country_ids.extend(country.country_id for country in event.countries())
 
 
 
@@ -7,12 +7,22 @@
 # (e.g., the events returned from the p2app.engine package, or events that are
 # internal to the user interface).
 #
-# YOU WILL NOT NEED TO MODIFY THIS FILE AT ALL
-
+# Components receive only the types of events they've subscribed to, using a
+# registry kept by the outermost component, so the cost of handling an event
+# depends on how many components are interested in it, rather than on the size
+# of the whole tree of widgets.  As before, on_event is called on ancestors
+# before their descendants, and on_event_post is called on descendants before
+# their ancestors.
+
+import itertools
 import tkinter
 
 
 
+_subscription_order = itertools.count()
+
+
+
 class EventHandler:
     def initiate_event(self, event):
         widget = self
@@ -27,18 +37,34 @@ class EventHandler:
             widget.initiate_event(event)
 
 
-    def handle_event(self, event):
-        self.on_event(event)
+    def subscribe(self, *event_types):
+        registry = self._subscription_registry()
+        subscription = (self._tree_depth(), next(_subscription_order), self)
+
+        for event_type in event_types:
+            registry.setdefault(event_type, []).append(subscription)
+
+        if isinstance(self, tkinter.Widget):
+            self.bind('<Destroy>', self._unsubscribe_on_destroy, add = '+')
+
 
-        if isinstance(self, tkinter.Tk) or isinstance(self, tkinter.Widget):
-            for child in self.winfo_children():
-                if not child.winfo_exists():
-                    continue
+    def unsubscribe(self):
+        registry = self._subscription_registry()
 
-                if isinstance(child, EventHandler):
-                    child.handle_event(event)
+        for event_type, subscriptions in registry.items():
+            registry[event_type] = [s for s in subscriptions if s[2] is not self]
 
-        self.on_event_post(event)
+
+    def handle_event(self, event):
+        subscriptions = self._subscriptions_for(event)
+
+        for _, _, handler in subscriptions:
+            if handler._is_alive():
+                handler.on_event(event)
+
+        for _, _, handler in sorted(subscriptions, key = lambda s: (-s[0], s[1])):
+            if handler._is_alive():
+                handler.on_event_post(event)
 
 
     def on_event(self, event):
@@ -47,3 +73,51 @@ class EventHandler:
 
     def on_event_post(self, event):
         pass
+
+
+    def _subscriptions_for(self, event):
+        registry = self._subscription_registry()
+        subscriptions = set()
+
+        for event_type in type(event).__mro__:
+            subscriptions.update(registry.get(event_type, ()))
+
+        return sorted(subscriptions, key = lambda s: (s[0], s[1]))
+
+
+    def _subscription_registry(self):
+        root = self
+
+        while getattr(root, 'master', None) is not None:
+            root = root.master
+
+        if not hasattr(root, '_event_subscriptions'):
+            root._event_subscriptions = {}
+
+        return root._event_subscriptions
+
+
+    def _tree_depth(self):
+        depth = 0
+        widget = self
+
+        while getattr(widget, 'master', None) is not None:
+            widget = widget.master
+            depth += 1
+
+        return depth
+
+
+    def _is_alive(self):
+        if not isinstance(self, (tkinter.Tk, tkinter.Widget)):
+            return True
+
+        try:
+            return bool(self.winfo_exists())
+        except tkinter.TclError:
+            return False
+
+
+    def _unsubscribe_on_destroy(self, event):
+        if event.widget is self:
+            self.unsubscribe()
@@ -122,3 +122,20 @@ class EnableDebugModeEvent(_InternalEvent):
 class DisableDebugModeEvent(_InternalEvent):
     def __init__(self):
         super().__init__()
+
+
+
+class DumpMetricsEvent(_InternalEvent):
+    def __init__(self, file_format):
+        super().__init__()
+        self._file_format = file_format
+
+
+    def file_format(self):
+        return self._file_format
+
+
+
+class ResetMetricsEvent(_InternalEvent):
+    def __init__(self):
+        super().__init__()
@@ -24,6 +24,7 @@ _INITIAL_WINDOW_WIDTH = 800
 _INITIAL_WINDOW_HEIGHT = 600
 _PROJECT_NAME = 'ICS 33 - Project 2'
 _MISSING_DATABASE_NAME = '[no database open]'
+_EDIT_SESSION_MARKER = '[edit session open]'
 
 
 
@@ -34,9 +35,18 @@ class MainView(tkinter.Tk, EventHandler):
         self.config(menu = MainMenu(self))
         self._event_bus = event_bus
         self._current_view = None
+        self._database_path = None
+        self._is_session_open = False
         self.rowconfigure(0, weight = 1)
         self.columnconfigure(0, weight = 1)
 
+        self.subscribe(
+            ShowEditContinentsViewEvent, ShowEditCountriesViewEvent, ShowEditRegionsViewEvent,
+            DatabaseOpenedEvent, DatabaseClosedEvent, DatabaseOpenFailedEvent,
+            EnableDebugModeEvent, DisableDebugModeEvent, DumpMetricsEvent, ResetMetricsEvent,
+            DatabaseOptimizedEvent, DataExportedEvent, EditSessionStartedEvent,
+            EditSessionCommittedEvent, EditSessionRolledBackEvent, EndApplicationEvent, ErrorEvent)
+
 
     def initiate_event(self, event):
         if is_internal_event(event):
@@ -61,6 +71,7 @@ class MainView(tkinter.Tk, EventHandler):
         elif isinstance(event, DatabaseOpenedEvent):
             self._update_database_path(event.path())
         elif isinstance(event, DatabaseClosedEvent):
+            self._is_session_open = False
             self._update_database_path(None)
             self._switch_view(EmptyView(self))
         elif isinstance(event, DatabaseOpenFailedEvent):
@@ -71,6 +82,21 @@ class MainView(tkinter.Tk, EventHandler):
             self._event_bus.enable_debug_mode()
         elif isinstance(event, DisableDebugModeEvent):
             self._event_bus.disable_debug_mode()
+        elif isinstance(event, DumpMetricsEvent):
+            self._dump_metrics(event.file_format())
+        elif isinstance(event, ResetMetricsEvent):
+            self._event_bus.reset_metrics()
+        elif isinstance(event, DatabaseOptimizedEvent):
+            tkinter.messagebox.showinfo('Database Optimized', _describe_optimization(event))
+        elif isinstance(event, EditSessionStartedEvent):
+            self._is_session_open = True
+            self._update_database_path(self._database_path)
+        elif isinstance(event, (EditSessionCommittedEvent, EditSessionRolledBackEvent)):
+            self._is_session_open = False
+            self._update_database_path(self._database_path)
+        elif isinstance(event, DataExportedEvent):
+            tkinter.messagebox.showinfo(
+                'Export Complete', f'{event.rows()} rows written to {event.path()}')
 
 
     def on_event_post(self, event):
@@ -80,6 +106,15 @@ class MainView(tkinter.Tk, EventHandler):
             tkinter.messagebox.showerror('Error', event.message())
 
 
+    def _dump_metrics(self, file_format):
+        metrics = self._event_bus.metrics()
+
+        if file_format == 'prometheus':
+            print(metrics.to_prometheus(), end = '')
+        else:
+            print(metrics.to_json())
+
+
     def _switch_view(self, view):
         if self._current_view:
             self._current_view.destroy()
@@ -89,9 +124,21 @@ class MainView(tkinter.Tk, EventHandler):
 
 
     def _update_database_path(self, path):
+        self._database_path = path
+
         if path:
             visible_name = path.name
         else:
             visible_name = _MISSING_DATABASE_NAME
 
+        if self._is_session_open:
+            visible_name = f'{visible_name} {_EDIT_SESSION_MARKER}'
+
         self.title(f'{_PROJECT_NAME} - {visible_name}')
+
+
+
+def _describe_optimization(event):
+    created = ', '.join(event.created_indexes()) or 'none'
+    scans = ', '.join(event.scans_after()) or 'none'
+    return f'Indexes created: {created}\n\nSearches still scanning a whole table: {scans}'
@@ -16,6 +16,10 @@ from .event_handling import EventHandler
 
 
 _OPEN_DATABASE_DIALOG_TITLE = 'Open Database'
+_EXPORT_DIALOG_TITLE = 'Export Table'
+_EXPORT_FILE_TYPES = [('CSV files', '*.csv'), ('JSON Lines files', '*.jsonl')]
+_EXPORTABLE_TABLES = [
+    'continent', 'country', 'region', 'airport', 'airport_frequency', 'runway', 'navigation_aid']
 
 
 
@@ -30,13 +34,19 @@ class MainMenu(BaseMenu):
         super().__init__(parent)
         self.add_cascade(label = 'File', menu = FileMenu(self))
         self.add_cascade(label = 'Debug', menu = DebugMenu(self))
+        self._edit_menu = None
+        self.subscribe(DatabaseOpenedEvent, DatabaseClosedEvent)
 
 
     def on_event(self, event):
         if isinstance(event, DatabaseOpenedEvent):
-            self.insert_cascade(index = 1, label = 'Edit', menu = EditMenu(self))
-        elif isinstance(event, DatabaseClosedEvent):
+            self._edit_menu = EditMenu(self)
+            self.insert_cascade(index = 1, label = 'Edit', menu = self._edit_menu)
+        elif isinstance(event, DatabaseClosedEvent) and self._edit_menu is not None:
             self.delete('Edit')
+            self._edit_menu.unsubscribe()
+            self._edit_menu.destroy()
+            self._edit_menu = None
 
 
 
@@ -44,8 +54,20 @@ class FileMenu(BaseMenu):
     def __init__(self, parent):
         super().__init__(parent)
         self.add_command(label = 'Open', state = tkinter.NORMAL, command = self._on_open)
+        self.add_command(
+            label = 'Open in Memory', state = tkinter.NORMAL, command = self._on_open_in_memory)
+
+        self.add_command(
+            label = 'Save Working Copy', state = tkinter.DISABLED,
+            command = self._on_save_working_copy)
+
         self.add_command(label = 'Close', state = tkinter.DISABLED, command = self._on_close)
+        self.add_command(
+            label = 'Optimize Database', state = tkinter.DISABLED, command = self._on_optimize)
+
+        self.add_cascade(label = 'Export', state = tkinter.DISABLED, menu = ExportMenu(self))
         self.add_command(label = 'Exit', command = self._on_exit)
+        self.subscribe(DatabaseOpenedEvent, DatabaseClosedEvent)
 
 
     def _on_open(self):
@@ -57,10 +79,27 @@ class FileMenu(BaseMenu):
             self.initiate_event(OpenDatabaseEvent(Path(open_path)))
 
 
+    def _on_open_in_memory(self):
+        open_path = tkinter.filedialog.askopenfilename(
+            title = _OPEN_DATABASE_DIALOG_TITLE,
+            initialdir = Path.cwd())
+
+        if open_path:
+            self.initiate_event(OpenDatabaseEvent(Path(open_path), in_memory = True))
+
+
+    def _on_save_working_copy(self):
+        self.initiate_event(SaveWorkingCopyEvent())
+
+
     def _on_close(self):
         self.initiate_event(CloseDatabaseEvent())
 
 
+    def _on_optimize(self):
+        self.initiate_event(OptimizeDatabaseEvent())
+
+
     def _on_exit(self):
         self.initiate_event(QuitInitiatedEvent())
 
@@ -68,10 +107,41 @@ class FileMenu(BaseMenu):
     def on_event(self, event):
         if isinstance(event, DatabaseOpenedEvent):
             self.entryconfig('Open', state = tkinter.DISABLED)
+            self.entryconfig('Open in Memory', state = tkinter.DISABLED)
             self.entryconfig('Close', state = tkinter.NORMAL)
+
+            if event.in_memory():
+                self.entryconfig('Save Working Copy', state = tkinter.NORMAL)
+
+            self.entryconfig('Optimize Database', state = tkinter.NORMAL)
+            self.entryconfig('Export', state = tkinter.NORMAL)
         elif isinstance(event, DatabaseClosedEvent):
             self.entryconfig('Open', state = tkinter.NORMAL)
+            self.entryconfig('Open in Memory', state = tkinter.NORMAL)
+            self.entryconfig('Save Working Copy', state = tkinter.DISABLED)
             self.entryconfig('Close', state = tkinter.DISABLED)
+            self.entryconfig('Optimize Database', state = tkinter.DISABLED)
+            self.entryconfig('Export', state = tkinter.DISABLED)
+
+
+
+class ExportMenu(BaseMenu):
+    def __init__(self, parent):
+        super().__init__(parent)
+
+        for table in _EXPORTABLE_TABLES:
+            self.add_command(label = table, command = lambda table = table: self._on_export(table))
+
+
+    def _on_export(self, table):
+        export_path = tkinter.filedialog.asksaveasfilename(
+            title = _EXPORT_DIALOG_TITLE,
+            initialdir = Path.cwd(),
+            initialfile = f'{table}.csv',
+            filetypes = _EXPORT_FILE_TYPES)
+
+        if export_path:
+            self.initiate_event(ExportTableEvent(table, Path(export_path)))
 
 
 
@@ -81,6 +151,17 @@ class EditMenu(BaseMenu):
         self.add_command(label = 'Continents', command = self._on_edit_continents)
         self.add_command(label = 'Countries', command = self._on_edit_countries)
         self.add_command(label = 'Regions', command = self._on_edit_regions)
+        self.add_separator()
+        self.add_command(label = 'Begin Session', command = self._on_begin_session)
+        self.add_command(
+            label = 'Commit Session', state = tkinter.DISABLED, command = self._on_commit_session)
+
+        self.add_command(
+            label = 'Roll Back Session', state = tkinter.DISABLED,
+            command = self._on_rollback_session)
+
+        self.subscribe(
+            EditSessionStartedEvent, EditSessionCommittedEvent, EditSessionRolledBackEvent)
 
 
     def _on_edit_continents(self):
@@ -95,20 +176,84 @@ class EditMenu(BaseMenu):
         self.initiate_event(ShowEditRegionsViewEvent())
 
 
+    def _on_begin_session(self):
+        self.initiate_event(BeginEditSessionEvent())
+
+
+    def _on_commit_session(self):
+        self.initiate_event(CommitEditSessionEvent())
+
+
+    def _on_rollback_session(self):
+        self.initiate_event(RollbackEditSessionEvent())
+
+
+    def on_event(self, event):
+        if isinstance(event, EditSessionStartedEvent):
+            self.entryconfig('Begin Session', state = tkinter.DISABLED)
+            self.entryconfig('Commit Session', state = tkinter.NORMAL)
+            self.entryconfig('Roll Back Session', state = tkinter.NORMAL)
+        else:
+            self.entryconfig('Begin Session', state = tkinter.NORMAL)
+            self.entryconfig('Commit Session', state = tkinter.DISABLED)
+            self.entryconfig('Roll Back Session', state = tkinter.DISABLED)
+
+
 
 class DebugMenu(BaseMenu):
     def __init__(self, parent):
         super().__init__(parent)
 
         self._is_debug_mode = tkinter.IntVar(self, 0)
+        self._is_tracing_sql = tkinter.IntVar(self, 0)
 
         self.add_checkbutton(
             label = 'Show Events', variable = self._is_debug_mode,
             command = self._on_change_show_events)
 
+        self.add_checkbutton(
+            label = 'Trace SQL', variable = self._is_tracing_sql,
+            command = self._on_change_trace_sql)
+
+        self.add_command(
+            label = 'Show Cache Statistics', state = tkinter.DISABLED,
+            command = self._on_show_cache_stats)
+
+        self.add_separator()
+        self.add_command(label = 'Dump Metrics as JSON', command = self._on_dump_metrics_json)
+        self.add_command(
+            label = 'Dump Metrics as Prometheus Text', command = self._on_dump_metrics_prometheus)
+
+        self.add_command(label = 'Reset Metrics', command = self._on_reset_metrics)
+
 
     def _on_change_show_events(self):
         if self._is_debug_mode.get():
             self.initiate_event(EnableDebugModeEvent())
+            self.entryconfig('Show Cache Statistics', state = tkinter.NORMAL)
         else:
             self.initiate_event(DisableDebugModeEvent())
+            self.entryconfig('Show Cache Statistics', state = tkinter.DISABLED)
+
+
+    def _on_change_trace_sql(self):
+        if self._is_tracing_sql.get():
+            self.initiate_event(EnableSqlTraceEvent())
+        else:
+            self.initiate_event(DisableSqlTraceEvent())
+
+
+    def _on_show_cache_stats(self):
+        self.initiate_event(ReportCacheStatsEvent())
+
+
+    def _on_dump_metrics_json(self):
+        self.initiate_event(DumpMetricsEvent('json'))
+
+
+    def _on_dump_metrics_prometheus(self):
+        self.initiate_event(DumpMetricsEvent('prometheus'))
+
+
+    def _on_reset_metrics(self):
+        self.initiate_event(ResetMetricsEvent())
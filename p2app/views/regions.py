@@ -29,6 +29,10 @@ class RegionsView(tkinter.Frame, EventHandler):
         self.rowconfigure(1, weight = 1)
         self.columnconfigure(0, weight = 1)
 
+        self.subscribe(
+            SaveRegionFailedEvent, DiscardRegionEvent, NewRegionEvent, StartEditingRegionEvent,
+            RegionLoadedEvent, RegionSavedEvent)
+
 
     def on_event(self, event):
         if isinstance(event, SaveRegionFailedEvent):
@@ -96,6 +100,13 @@ class _RegionsSearchView(tkinter.LabelFrame, EventHandler):
 
         self._search_button.grid(row = 3, column = 1, sticky = tkinter.E, padx = 5, pady = 5)
 
+        self._match_words = tkinter.IntVar(self, 0)
+
+        match_words_check = tkinter.Checkbutton(
+            self, text = 'Match words', variable = self._match_words)
+
+        match_words_check.grid(row = 3, column = 0, sticky = tkinter.W, padx = 5, pady = 5)
+
         empty_area = tkinter.Label(self, text = '')
         empty_area.grid(row = 4, column = 1, sticky = tkinter.NSEW, padx = 5, pady = 5)
 
@@ -135,12 +146,19 @@ class _RegionsSearchView(tkinter.LabelFrame, EventHandler):
         self.columnconfigure(1, weight = 1)
         self.columnconfigure(2, weight = 2)
 
+        self.subscribe(
+            ClearRegionsSearchListEvent, RegionSearchResultEvent, RegionSearchResultBatchEvent)
+
 
     def _on_search_button_clicked(self):
         self.initiate_event(ClearRegionsSearchListEvent())
-        self.initiate_event(StartRegionSearchEvent(
-            self._get_search_region_code(), self._get_search_local_code(),
-            self._get_search_name()))
+
+        if self._match_words.get():
+            self.initiate_event(StartRegionTextSearchEvent(self._get_search_name() or ''))
+        else:
+            self.initiate_event(StartRegionSearchEvent(
+                self._get_search_region_code(), self._get_search_local_code(),
+                self._get_search_name()))
 
 
     def _get_search_region_code(self):
@@ -204,6 +222,12 @@ class _RegionsSearchView(tkinter.LabelFrame, EventHandler):
             display_name = f'{event.region().region_code} - {event.region().name}'
             self._search_list.insert(tkinter.END, display_name)
             self._search_region_ids.append(event.region().region_id)
+        elif isinstance(event, RegionSearchResultBatchEvent):
+            display_names = [
+                f'{region.region_code} - {region.name}' for region in event.regions()]
+
+            self._search_list.insert(tkinter.END, *display_names)
+            self._search_region_ids.extend(region.region_id for region in event.regions())
 
 
 
@@ -5,15 +5,19 @@
 #
 # This is the main module that runs the entire program.
 #
-# YOU WILL NOT NEED TO MODIFY THIS FILE AT ALL
+# Run it with --threaded to process the engine's events on a background worker
+# thread, so that the window keeps responding while a slow operation runs (see
+# p2app/events/event_bus.py).  Without it, events are processed on the same thread
+# as the user interface, as they always have been.
 
+import sys
 from p2app import EventBus
 from p2app import Engine
 from p2app import MainView
 
 
 def main():
-    event_bus = EventBus()
+    event_bus = EventBus(threaded = '--threaded' in sys.argv[1:])
     engine = Engine()
     main_view = MainView(event_bus)
 